@@ -0,0 +1,179 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import chart_data
+from downsample import downsample, bin_columns
+from odds_math import american_to_probability, devig, overround
+
+# Times the dashboard's chart data preparation for one game and market, chart_data.prepare
+# against the per chart pandas code it replaced (outcome merge, per operator .loc lookups,
+# iterrows and nested comprehensions), on a synthetic selection with many operators and
+# captures, and checks that both produce the same arrays.
+#
+#   python benchmarks/chart_prep.py --books 32 --captures 5000
+
+def synthetic_selection(n_books, n_captures, market_type, seed):
+    rng = np.random.default_rng(seed)
+    books = [f"book_{i:02d}" for i in range(n_books)]
+    captured_at = pd.date_range("2025-09-01", periods=n_captures, freq="5min")
+    outcomes = ["Kansas City Chiefs", "Buffalo Bills"] if market_type != "totals" else ["Over", "Under"]
+
+    frames = []
+    summary = []
+    for book in books:
+        # Lines move in half points and prices in 5 cent steps, each at random captures
+        line = -3.0 + np.cumsum(rng.random(n_captures) < 0.002) * rng.choice([-0.5, 0.5])
+        juice = -110 + 5 * np.cumsum(rng.choice([-1, 0, 0, 0, 0, 0, 0, 0, 0, 1], n_captures)).clip(-6, 6)
+        # Some operators skip some captures
+        posted = rng.random(n_captures) > 0.05
+        for side, sign in zip(outcomes, [1, -1]):
+            price = np.where(sign > 0, juice, -220 - juice) if market_type != "h2h" else np.where(sign > 0, juice - 100, 100 - juice)
+            frames.append(pd.DataFrame({
+                "captured_at": captured_at[posted],
+                "sportsbook": book,
+                "line": (line * sign)[posted] if market_type != "h2h" else np.nan,
+                "price": price[posted].astype(float),
+                "outcome": side,
+                "implied_prob": american_to_probability(price[posted].astype(float)),
+            }))
+            summary.append({
+                "sportsbook": book, "outcome": side,
+                "opening_line": line[posted][0] * sign, "closing_line": line[posted][-1] * sign,
+                "total_line_movement": (line[posted][-1] - line[posted][0]) * sign,
+                "closing_implied_prob_pct": american_to_probability(float(price[posted][-1])),
+            })
+
+    movements = pd.concat(frames).sort_values("captured_at", kind="stable").reset_index(drop=True)
+    return movements, pd.DataFrame(summary).sort_values(["sportsbook", "outcome"]).reset_index(drop=True), books, outcomes[0]
+
+
+def legacy_prepare(movements, summary, selected_operators, market_type, selected_outcome):
+    # The preparation dashboard.py did inline before chart_data, without the Plotly calls
+    outcomes = movements["outcome"].unique().tolist()
+    filtered = movements[movements["outcome"] == selected_outcome]
+    outcome_summary = summary[summary["outcome"] == selected_outcome]
+    other_outcome = [o for o in outcomes if o != selected_outcome]
+    if other_outcome:
+        other_filtered = movements[movements["outcome"] == other_outcome[0]][["captured_at", "sportsbook", "price"]].rename(
+            columns={"price": "other_price"}
+        )
+        filtered = filtered.merge(other_filtered, on=["captured_at", "sportsbook"], how="left")
+    charts = {}
+
+    y_col = "price" if market_type == "h2h" else "line"
+    line_data = downsample(
+        filtered, "captured_at", y_col, "sportsbook",
+        change_columns=[c for c in ["line", "price", "other_price"] if c in filtered.columns],
+        force_columns=["line"],
+    )
+    charts["line_movement"] = {book: line_data[line_data["sportsbook"] == book][y_col].to_numpy() for book in selected_operators}
+
+    prob_data = summary.copy()
+    prob_data["closing_pct"] = prob_data["closing_implied_prob_pct"] * 100
+    prob_data["margin_pct"] = overround(prob_data["closing_implied_prob_pct"], prob_data["sportsbook"]) * 100
+    prob_data["fair_pct"] = devig(prob_data["closing_implied_prob_pct"], prob_data["sportsbook"]) * 100
+    side_selected = prob_data[prob_data["outcome"] == selected_outcome].set_index("sportsbook")
+    side_other = prob_data[prob_data["outcome"] == other_outcome[0]].set_index("sportsbook")
+    books = [s for s in selected_operators if s in side_selected.index and s in side_other.index]
+    charts["closing_probability"] = {
+        "selected_pct": [side_selected.loc[b, "closing_pct"] for b in books],
+        "other_pct": [side_other.loc[b, "closing_pct"] for b in books],
+        "text": [f"{side_selected.loc[b, 'closing_pct']:.1f}%" for b in books],
+        "selected_fair_pct": [side_selected.loc[b, "fair_pct"] for b in books],
+        "margin_pct": [side_selected.loc[b, "margin_pct"] for b in books],
+    }
+
+    if market_type != "h2h":
+        moved = outcome_summary[outcome_summary["total_line_movement"] != 0]
+        charts["opening_closing"] = [
+            ([row["opening_line"], row["closing_line"]], f"  {row['total_line_movement']:+.1f}")
+            for _, row in moved.iterrows()
+        ]
+
+    pivot = filtered.pivot_table(index="sportsbook", columns="captured_at", values="price", aggfunc="first")
+    pivot = pivot.loc[[s for s in selected_operators if s in pivot.index]]
+    pivot = bin_columns(pivot, max_columns=chart_data.HEATMAP_COLUMNS)
+    charts["pricing_heatmap"] = {
+        "z": pivot.values,
+        "text": [[f"{int(v)}" if not pd.isna(v) else "" for v in row] for row in pivot.values],
+        "time_labels": [t.strftime("%b %d %Hh") for t in pivot.columns],
+    }
+
+    prob_over_time = downsample(
+        filtered[["captured_at", "sportsbook", "implied_prob"]],
+        "captured_at", "implied_prob", "sportsbook",
+        include_run_ends=True,
+    )
+    prob_over_time["implied_prob"] = prob_over_time["implied_prob"] * 100
+    charts["probability_over_time"] = {
+        book: prob_over_time[prob_over_time["sportsbook"] == book]["implied_prob"].to_numpy() for book in selected_operators
+    }
+    return charts
+
+
+def compare(legacy, charts, market_type):
+    # Largest difference between the two, per chart
+    differences = {}
+    line = {s["sportsbook"]: s[charts["line_movement"]["y_col"]] for s in charts["line_movement"]["series"]}
+    differences["line_movement"] = max(np.nanmax(np.abs(line[b] - v), initial=0) for b, v in legacy["line_movement"].items())
+
+    bars = charts["closing_probability"]
+    differences["closing_probability"] = max(
+        np.abs(bars[key] - np.asarray(legacy["closing_probability"][key])).max()
+        for key in ["selected_pct", "other_pct", "selected_fair_pct", "margin_pct"]
+    ) + (list(np.char.mod("%.1f%%", bars["selected_pct"])) != legacy["closing_probability"]["text"])
+
+    if market_type != "h2h":
+        dumbbell = charts["opening_closing"]
+        moved = [(o, c, f"  {m:+.1f}") for o, c, m in zip(
+            dumbbell["opening"][dumbbell["moved"]], dumbbell["closing"][dumbbell["moved"]], dumbbell["movement"][dumbbell["moved"]]
+        )]
+        differences["opening_closing"] = float(moved != [(*x, text) for x, text in legacy["opening_closing"]])
+
+    heatmap = charts["pricing_heatmap"]
+    differences["pricing_heatmap"] = np.nanmax(np.abs(heatmap["z"] - legacy["pricing_heatmap"]["z"])) + (
+        heatmap["text"].tolist() != legacy["pricing_heatmap"]["text"]
+    ) + (heatmap["time_labels"] != legacy["pricing_heatmap"]["time_labels"])
+
+    prob = {s["sportsbook"]: s["implied_prob"] for s in charts["probability_over_time"]["series"]}
+    differences["probability_over_time"] = max(np.abs(prob[b] - v).max() for b, v in legacy["probability_over_time"].items())
+    return differences
+
+
+def timed(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def benchmark(n_books, n_captures, market_types, repeats, seed):
+    for market_type in market_types:
+        movements, summary, books, outcome = synthetic_selection(n_books, n_captures, market_type, seed)
+        print(f"\n{market_type}: {n_books} operators x {n_captures:,} captures, {len(movements):,} rows, best of {repeats}")
+
+        legacy, legacy_seconds = timed(lambda: legacy_prepare(movements, summary, books, market_type, outcome), repeats)
+        charts, seconds = timed(lambda: chart_data.prepare(movements, summary, books, market_type, outcome), repeats)
+        print(f"  {'inline pandas (before)':<26} {legacy_seconds * 1000:9.1f} ms")
+        print(f"  {'chart_data.prepare':<26} {seconds * 1000:9.1f} ms  {legacy_seconds / seconds:5.1f}x")
+        for chart, difference in compare(legacy, charts, market_type).items():
+            print(f"  {chart:<26} max difference {difference:.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's chart data preparation on a synthetic selection")
+    parser.add_argument("--books", type=int, default=32, help="Operators selected")
+    parser.add_argument("--captures", type=int, default=5000, help="Captures per operator and outcome")
+    parser.add_argument("--markets", default="spreads,h2h", help="Comma separated market types")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement, the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    benchmark(args.books, args.captures, args.markets.split(","), args.repeats, args.seed)
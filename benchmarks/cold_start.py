@@ -0,0 +1,157 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# Serves a load/export_marts.py export (or any directory) over HTTP with Range support,
+# standing in for the static host the dashboard fetches partitions from, and times a
+# cold start against it: the manifest and game list, then opening games. --drop-after
+# cuts every file's first response short to exercise resumed downloads.
+#
+#   python benchmarks/cold_start.py --export-dir data/marts --db-path data/nfl_odds.duckdb
+#   python benchmarks/cold_start.py --export-dir data/marts --serve --port 8001
+#   DASHBOARD_PARTITIONS_URL=http://127.0.0.1:8001 streamlit run dashboard.py
+
+export_dir = os.path.join(os.path.dirname(__file__), "..", "data", "marts")
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    drop_after = None
+    dropped = set()
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        range_header = self.headers.get("Range")
+        if os.path.isdir(path) or not os.path.exists(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        start = 0
+        if range_header and range_header.startswith("bytes=") and range_header.endswith("-"):
+            start = int(range_header[len("bytes="):-1])
+            if start >= size:
+                self.send_error(416)
+                return None
+
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(size - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        with self.lock:
+            drop = self.drop_after is not None and self.path not in self.dropped
+            self.dropped.add(self.path)
+        if not drop:
+            return super().copyfile(source, outputfile)
+        # Sends part of the body and hangs up, like a dropped connection
+        outputfile.write(source.read(self.drop_after))
+        self.close_connection = True
+
+
+def serve(directory, port=0, drop_after=None):
+    handler = type("Handler", (RangeRequestHandler,), {"drop_after": drop_after, "dropped": set()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def cold_start(base_url, cache_dir, games, seed):
+    # dashboard_data reads its configuration on import
+    os.environ["DASHBOARD_PARTITIONS_URL"] = base_url
+    os.environ["DASHBOARD_PARTITIONS_DIR"] = cache_dir
+    # Outside `streamlit run` every cached function warns about the missing runtime
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+
+    import telemetry
+    started = time.perf_counter()
+    import dashboard_data
+    version = dashboard_data.db_version()
+    index = dashboard_data.get_game_index(version)
+    first_paint = time.perf_counter() - started
+    index_bytes = telemetry._counters["dashboard.fetch_bytes"]
+    print(f"game index: {len(index['games'])} games in {first_paint * 1000:.0f} ms, {index_bytes / 1e3:,.1f} KB fetched")
+
+    event_ids = random.Random(seed).sample(sorted(index["games"]), min(games, len(index["games"])))
+    for label in ["cold", "cached"]:
+        timings = []
+        for event_id in event_ids:
+            dashboard_data.get_event_bundle.clear()
+            start = time.perf_counter()
+            dashboard_data.get_event_bundle(event_id, version)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(
+            f"open game ({label}): p50 {timings[len(timings) // 2] * 1000:.0f} ms, "
+            f"max {timings[-1] * 1000:.0f} ms over {len(timings)} games"
+        )
+
+    fetched = telemetry._counters["dashboard.fetch_bytes"]
+    retries = telemetry._counters["dashboard.fetch_retries"]
+    print(f"fetched {fetched / 1e6:,.2f} MB in total, {retries:.0f} resumed downloads")
+
+
+def full_download(base_url, db_path):
+    import partition_cache
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        partition_cache.download(f"{base_url}/{os.path.basename(db_path)}", os.path.join(tmp_dir, "nfl_odds.duckdb"))
+        seconds = time.perf_counter() - start
+    print(f"whole database: {os.path.getsize(db_path) / 1e6:,.1f} MB in {seconds * 1000:.0f} ms before the first paint")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time a dashboard cold start against a local stand-in for the partition host")
+    parser.add_argument("--export-dir", default=export_dir, help="Output of load/export_marts.py")
+    parser.add_argument("--db-path", help="Also time downloading this database whole, the default dashboard start")
+    parser.add_argument("--games", type=int, default=20, help="Games opened after the game index loads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop-after", type=int, help="Cut each file's first response after this many bytes")
+    parser.add_argument("--serve", action="store_true", help="Only serve --export-dir until interrupted")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.export_dir, "manifest.json")):
+        parser.error(f"No manifest.json in {args.export_dir}, run load/export_marts.py first")
+
+    server = serve(args.export_dir, args.port, args.drop_after)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    if args.serve:
+        print(f"Serving {args.export_dir} on {base_url}")
+        threading.Event().wait()
+
+    print(f"export: {directory_bytes(args.export_dir) / 1e6:,.1f} MB served from {base_url}")
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cold_start(base_url, cache_dir, args.games, args.seed)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        server.shutdown()
+
+    if args.db_path:
+        db_server = serve(os.path.dirname(os.path.abspath(args.db_path)))
+        full_download(f"http://127.0.0.1:{db_server.server_address[1]}", args.db_path)
+        db_server.shutdown()
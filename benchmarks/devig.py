@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import time
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from odds_math import DEVIG_METHODS, american_to_probability, devig
+
+# Times the odds_math conversions and de-vig methods over every price in
+# fct_odds_snapshots, against the SQL implied_probability expression and a pandas
+# groupby, and checks that each de-vigged market sums to 1.
+
+duckdb_path = os.path.join(os.path.dirname(__file__), "..", "data", "nfl_odds.duckdb")
+
+prices_sql = """
+    select price, event_id, sportsbook, market_type, captured_at
+    from fct_odds_snapshots
+    where price is not null
+"""
+
+# implied_probability macro without its rounding
+sql_probability = """
+    select case when price < 0 then abs(price) / (abs(price) + 100) else 100.0 / (price + 100) end as p
+    from fct_odds_snapshots
+    where price is not null
+"""
+
+def arrow_udf(func):
+    # Only used here, to compare a vectorized UDF against NumPy and the SQL expression.
+    # The pipeline computes implied probability with the SQL macro.
+    def udf(column):
+        return pa.array(func(column.to_numpy(zero_copy_only=False)), from_pandas=True)
+    return udf
+
+def timed(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+def report(name, seconds, rows):
+    print(f"  {name:<34} {seconds * 1000:9.1f} ms  {rows / seconds / 1e6:8.1f}M rows/s")
+
+def benchmark(db_path, repeats):
+    conn = duckdb.connect(db_path, read_only=True)
+    df = conn.execute(prices_sql).fetchdf()
+    keys = ["event_id", "sportsbook", "market_type", "captured_at"]
+    rows = len(df)
+    prices = df["price"].to_numpy(dtype=float)
+    print(f"{db_path}: {rows:,} prices in {len(df.drop_duplicates(keys)):,} markets, best of {repeats}")
+
+    print("\nImplied probability")
+    probabilities, seconds = timed(lambda: american_to_probability(prices), repeats)
+    report("odds_math (NumPy)", seconds, rows)
+    expected, seconds = timed(lambda: conn.execute(sql_probability).fetchnumpy()["p"], repeats)
+    report("SQL expression (DuckDB)", seconds, rows)
+
+    conn.create_function("american_to_probability", arrow_udf(american_to_probability), ["DOUBLE"], "DOUBLE", type="arrow")
+    udf_sql = "select american_to_probability(price) as p from fct_odds_snapshots where price is not null"
+    from_udf, seconds = timed(lambda: conn.execute(udf_sql).fetchnumpy()["p"], repeats)
+    report("american_to_probability UDF", seconds, rows)
+    print(f"  max difference from SQL: {max(np.abs(probabilities - expected).max(), np.abs(from_udf - expected).max()):.2e}")
+
+    print("\nDe-vig")
+    df["p"] = probabilities
+    _, seconds = timed(lambda: df["p"] / df.groupby(keys)["p"].transform("sum"), repeats)
+    report("pandas groupby (multiplicative)", seconds, rows)
+    for method in DEVIG_METHODS:
+        fair, seconds = timed(lambda: devig(probabilities, df[keys], method), repeats)
+        sums = df.assign(fair=fair).groupby(keys)["fair"].sum()
+        report(f"odds_math {method}", seconds, rows)
+        print(f"  {'':<34} max |market sum - 1| {np.abs(sums - 1).max():.2e}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark odds conversions and de-vig methods on fct_odds_snapshots")
+    parser.add_argument("--db", default=duckdb_path, help="DuckDB database with the marts built")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement, the fastest is reported")
+    args = parser.parse_args()
+
+    benchmark(args.db, args.repeats)
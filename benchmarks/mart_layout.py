@@ -0,0 +1,98 @@
+import argparse
+import os
+import random
+import re
+import time
+import duckdb
+import numpy as np
+
+# Replays the dashboard's per-game queries against the marts and reports how many row
+# groups survive DuckDB's min/max zone maps for each lookup, along with query latency.
+# Pass --db more than once to compare databases, e.g. before and after a full refresh.
+
+duckdb_path = os.path.join(os.path.dirname(__file__), "..", "data", "nfl_odds.duckdb")
+
+# Keyed by the table whose zone maps prune the lookup. fct_odds_snapshots is a view that
+# expands fct_odds_intervals, so its lookups are pruned on the intervals.
+queries = {
+    "fct_odds_intervals": """
+        select captured_at, sportsbook, market_type, line, price, outcome, implied_prob
+        from fct_odds_snapshots
+        where event_id = ?
+        order by captured_at
+    """,
+    "fct_game_summary": """
+        select sportsbook, market_type, outcome, opening_line, closing_line, total_line_movement,
+               opening_price, closing_price, opening_implied_prob_pct,
+               closing_implied_prob_pct, implied_prob_pct_change, capture_count
+        from fct_game_summary
+        where event_id = ?
+        order by sportsbook, outcome
+    """,
+}
+
+stats_pattern = re.compile(r"\[Min: (.*?), Max: (.*?)[,\]]")
+
+def zone_maps(conn, table, column):
+    rows = conn.execute("""
+        select row_group_id, stats
+        from pragma_storage_info(?)
+        where column_name = ? and segment_type != 'VALIDITY'
+    """, [table, column]).fetchall()
+
+    zones = []
+    for row_group_id, stats in rows:
+        match = stats_pattern.match(stats)
+        if match:
+            zones.append((row_group_id, match.group(1), match.group(2)))
+    return zones
+
+def candidate_row_groups(zones, value):
+    # String stats only keep a short prefix, so the max is compared against the same prefix
+    return {row_group_id for row_group_id, low, high in zones if low <= value and value[:len(high)] <= high}
+
+def benchmark_db(db_path, sample_size, repeats, seed):
+    conn = duckdb.connect(db_path, read_only=True)
+    event_ids = sorted(row[0] for row in conn.execute("select distinct event_id from fct_game_summary").fetchall())
+    sample = random.Random(seed).sample(event_ids, min(sample_size, len(event_ids)))
+    print(f"\n{db_path} ({len(sample)} games, {repeats} runs each)")
+
+    for table, sql in queries.items():
+        total_row_groups = conn.execute(
+            "select count(distinct row_group_id) from pragma_storage_info(?)", [table]
+        ).fetchone()[0]
+        indexes = [row[0] for row in conn.execute(
+            "select index_name from duckdb_indexes() where table_name = ?", [table]
+        ).fetchall()]
+        zones = zone_maps(conn, table, "event_id")
+
+        scanned = []
+        latencies = []
+        for event_id in sample:
+            scanned.append(len(candidate_row_groups(zones, event_id)))
+            for _ in range(repeats):
+                start = time.perf_counter()
+                conn.execute(sql, [event_id]).fetchdf()
+                latencies.append(time.perf_counter() - start)
+
+        print(
+            f"  {table}: {total_row_groups} row groups, "
+            f"scanned avg {np.mean(scanned):.1f} max {max(scanned)}, "
+            f"p50 {np.percentile(latencies, 50) * 1000:.1f} ms, "
+            f"p95 {np.percentile(latencies, 95) * 1000:.1f} ms, "
+            f"indexes: {', '.join(indexes) or 'none'}"
+        )
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dashboard lookups against the mart layout")
+    parser.add_argument("--db", action="append", dest="db_paths", help="DuckDB database, repeat to compare several")
+    parser.add_argument("--sample", type=int, default=50, help="Number of games to look up")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per lookup")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for db_path in args.db_paths or [duckdb_path]:
+        benchmark_db(db_path, args.sample, args.repeats, args.seed)
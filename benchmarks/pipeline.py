@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import duckdb
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "load"))
+from synthetic_odds import generate
+from load_to_duckdb import load_all_odds
+
+# End to end benchmark on a synthetic season: writes the snapshots the way the extract
+# does, loads them with load_all_odds, runs dbt build and times every model, then times
+# the dashboard's query functions. Results are saved as JSON, and --compare flags any
+# timing that regressed against an earlier run, e.g. one from the previous commit.
+
+repo_dir = os.path.join(os.path.dirname(__file__), "..")
+transform_dir = os.path.join(repo_dir, "transform")
+work_root = os.path.join(repo_dir, "data", "benchmark")
+results_dir = os.path.join(os.path.dirname(__file__), "results")
+
+# Differences smaller than these are never reported as regressions
+noise_floor_seconds = 0.5
+noise_floor_ms = 2.0
+
+profiles_yml = """transform:
+  target: dev
+  outputs:
+    dev:
+      type: duckdb
+      path: {db_path}
+      threads: {threads}
+"""
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo_dir, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir, capture_output=True, text=True).stdout.strip()
+    except FileNotFoundError:
+        return None
+    return f"{commit}-dirty" if dirty else commit or None
+
+def percentiles_ms(values):
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)) * 1000, 2),
+        "p95_ms": round(float(np.percentile(values, 95)) * 1000, 2),
+    }
+
+def bench_extract(raw_dir, scale, seed, workers):
+    shutil.rmtree(raw_dir, ignore_errors=True)
+    stats = generate(raw_dir, scale=scale, seed=seed, workers=workers)
+    print(
+        f"extract: {stats['snapshots']:,} snapshots, {stats['rows']:,} rows, {stats['bytes'] / 1e6:,.1f} MB, "
+        f"write {stats['write_seconds']:.1f}s"
+    )
+    return {
+        "snapshots": stats["snapshots"],
+        "rows": stats["rows"],
+        "mb": round(stats["bytes"] / 1e6, 1),
+        "generate_seconds": round(stats["generate_seconds"], 3),
+        "write_seconds": round(stats["write_seconds"], 3),
+    }
+
+def bench_load(raw_dir, db_path, workers):
+    started = time.perf_counter()
+    load_all_odds(raw_dir, db_path, full_refresh=True, workers=workers, parquet_dir=os.path.join(raw_dir, "parquet"))
+    seconds = time.perf_counter() - started
+
+    conn = duckdb.connect(db_path, read_only=True)
+    rows = conn.execute("select count(*) from raw_odds").fetchone()[0]
+    conn.close()
+    print(f"load: {rows:,} rows in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
+    return {"rows": rows, "seconds": round(seconds, 3)}
+
+def bench_dbt(db_path, project_dir, profiles_dir, threads):
+    from dbt.cli.main import dbtRunner
+
+    os.makedirs(profiles_dir, exist_ok=True)
+    with open(os.path.join(profiles_dir, "profiles.yml"), "w") as f:
+        f.write(profiles_yml.format(db_path=os.path.abspath(db_path), threads=threads))
+
+    started = time.perf_counter()
+    result = dbtRunner().invoke([
+        "build", "--full-refresh", "--project-dir", project_dir, "--profiles-dir", profiles_dir, "--quiet",
+    ])
+    seconds = time.perf_counter() - started
+    if result.exception:
+        raise result.exception
+
+    models, tests = {}, 0.0
+    for node_result in result.result.results:
+        node = node_result.node
+        if node.resource_type == "model":
+            models[node.name] = round(node_result.execution_time, 3)
+        elif node.resource_type == "test":
+            tests += node_result.execution_time
+
+    failed = [r.node.name for r in result.result.results if r.status not in ("success", "pass")]
+    print(f"dbt build: {seconds:.1f}s, " + ", ".join(f"{name} {t:.1f}s" for name, t in models.items()))
+    if failed:
+        print(f"  failed: {', '.join(failed)}")
+    return {"seconds": round(seconds, 3), "tests_seconds": round(tests, 3), "models": models, "failed": failed}
+
+def bench_dashboard(db_path, sample_size, seed):
+    # dashboard_data reads its database path on import
+    os.environ["DASHBOARD_DB_PATH"] = os.path.abspath(db_path)
+    # Outside `streamlit run` every cached function warns about the missing runtime
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import dashboard_data
+
+    timings = {
+        "get_games": [], "get_game_index": [], "get_event_bundle": [], "get_line_movements": [], "get_game_summary": [],
+        "get_price_scan": [],
+    }
+    version = dashboard_data.db_version()
+
+    for _ in range(5):
+        start = time.perf_counter()
+        dashboard_data.get_games()
+        timings["get_games"].append(time.perf_counter() - start)
+
+        dashboard_data.get_game_index.clear()
+        start = time.perf_counter()
+        index = dashboard_data.get_game_index(version)
+        timings["get_game_index"].append(time.perf_counter() - start)
+
+    event_ids = sorted(index["games"])
+    conn = duckdb.connect(db_path, read_only=True)
+    books = [b for (b,) in conn.execute("select distinct sportsbook from fct_game_summary order by 1").fetchall()]
+    conn.close()
+
+    for event_id in random.Random(seed).sample(event_ids, min(sample_size, len(event_ids))):
+        # Opening a game queries DuckDB, switching markets afterwards filters the cached bundle
+        dashboard_data.get_event_bundle.clear()
+        start = time.perf_counter()
+        dashboard_data.get_event_bundle(event_id, version)
+        timings["get_event_bundle"].append(time.perf_counter() - start)
+
+        dashboard_data.get_price_scan.clear()
+        start = time.perf_counter()
+        dashboard_data.get_price_scan(event_id, version)
+        timings["get_price_scan"].append(time.perf_counter() - start)
+
+        for market_type in ["spreads", "totals", "h2h"]:
+            start = time.perf_counter()
+            dashboard_data.get_line_movements(event_id, books[:8], market_type)
+            timings["get_line_movements"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            dashboard_data.get_game_summary(event_id, books[:8], market_type)
+            timings["get_game_summary"].append(time.perf_counter() - start)
+
+    results = {name: percentiles_ms(values) for name, values in timings.items()}
+    print("dashboard: " + ", ".join(f"{name} p50 {r['p50_ms']:.1f} ms" for name, r in results.items()))
+    return results
+
+def flatten_timings(results):
+    # Lower is better for every value kept here, so runs compare key by key
+    flat = {
+        "extract.write_seconds": results["extract"]["write_seconds"],
+        "load.seconds": results["load"]["seconds"],
+        "dbt.seconds": results["dbt"]["seconds"],
+    }
+    flat.update({f"dbt.models.{name}": t for name, t in results["dbt"]["models"].items()})
+    # p95 over a few dozen calls is close to the max and too noisy to compare
+    flat.update({f"dashboard.{name}.p50_ms": r["p50_ms"] for name, r in results["dashboard"].items()})
+    return flat
+
+def compare(current, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    if baseline["config"]["scale"] != current["config"]["scale"]:
+        print(f"Warning: baseline ran at scale {baseline['config']['scale']}, this run at {current['config']['scale']}")
+
+    print(f"\nCompared with {baseline.get('commit')} ({baseline_path}), tolerance {tolerance:.0%}")
+    regressions = []
+    for key, value in current["timings"].items():
+        before = baseline["timings"].get(key)
+        if not before:
+            continue
+        change = value / before - 1
+        # Sub-second models and millisecond queries jitter by more than the tolerance
+        noise = noise_floor_ms if key.endswith("_ms") else noise_floor_seconds
+        flag = ""
+        if abs(value - before) < noise:
+            pass
+        elif change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif change < -tolerance:
+            flag = "  faster"
+        print(f"  {key:<45} {before:>10.3f} -> {value:>10.3f} ({change:+.0%}){flag}")
+    return regressions
+
+def run(scale, seed, workers, threads, sample_size, project_dir, work_dir, reuse_raw):
+    raw_dir = os.path.join(work_dir, "raw")
+    db_path = os.path.join(work_dir, "nfl_odds.duckdb")
+
+    results = {}
+    if reuse_raw and os.path.isdir(raw_dir):
+        print(f"extract: reusing {raw_dir}")
+        results["extract"] = {"reused": True, "write_seconds": None}
+    else:
+        results["extract"] = bench_extract(raw_dir, scale, seed, workers)
+    results["load"] = bench_load(raw_dir, db_path, workers)
+    results["dbt"] = bench_dbt(db_path, project_dir, os.path.join(work_dir, "profiles"), threads)
+    results["dashboard"] = bench_dashboard(db_path, sample_size, seed)
+
+    timings = flatten_timings(results)
+    return {
+        "commit": git_commit(),
+        "run_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "config": {"scale": scale, "seed": seed, "workers": workers, "dbt_threads": threads, "dashboard_sample": sample_size},
+        "machine": {
+            "python": platform.python_version(),
+            "duckdb": duckdb.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+        "timings": {key: value for key, value in timings.items() if value is not None},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark extract, load, dbt and dashboard queries on a synthetic season")
+    parser.add_argument("--scale", type=float, default=1.0, help="Synthetic season size, 1 = about 1.8M rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for generating and loading snapshots")
+    parser.add_argument("--dbt-threads", type=int, default=4)
+    parser.add_argument("--sample", type=int, default=30, help="Games opened when timing the dashboard queries")
+    parser.add_argument("--project-dir", default=transform_dir, help="dbt project to build")
+    parser.add_argument("--work-dir", help="Where snapshots and the database go, defaults to data/benchmark/scale_<scale>")
+    parser.add_argument("--reuse-raw", action="store_true", help="Keep snapshots from an earlier run at this scale instead of regenerating")
+    parser.add_argument("--results-dir", default=results_dir, help="Directory the JSON results are written to")
+    parser.add_argument("--compare", help="Earlier results JSON to compare timings against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Slowdown reported as a regression, 0.1 = 10%%")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or os.path.join(work_root, f"scale_{args.scale:g}")
+    if args.compare and not os.path.exists(args.compare):
+        parser.error(f"{args.compare} not found")
+    current = run(args.scale, args.seed, args.workers, args.dbt_threads, args.sample, args.project_dir, work_dir, args.reuse_raw)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    results_path = os.path.join(args.results_dir, f"{current['run_at'].replace(':', '')}_{current['commit'] or 'nogit'}_scale{args.scale:g}.json")
+    with open(results_path, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {results_path}")
+
+    if args.compare and compare(current, args.compare, args.tolerance):
+        sys.exit(1)
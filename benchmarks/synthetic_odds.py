@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "extract"))
+from odds_math import probability_to_american
+from historical_extract import SnapshotDeltas, save_odds
+
+# Generates a season of historical Odds API snapshots shaped like the real extract's
+# output, for benchmarking and testing without API credits. Every game gets a fixed
+# odds path up front: consensus lines move at random times and each sportsbook follows
+# after its own lag, with its own juice changes in between. A snapshot is just that
+# path read at the capture time, so snapshots can be built in parallel, and raising
+# --scale (captures per day) samples the same season more finely.
+#
+# At --scale 1 (4 captures a day, 26 sportsbooks) a season is about 1.8M rows, the
+# size of the real 2025 extract.
+
+synthetic_dir = os.path.join(os.path.dirname(__file__), "..", "data", "synthetic")
+
+season_start = datetime(2025, 9, 4, tzinfo=timezone.utc)
+regular_season_weeks = 18
+# Wild Card, Divisional, Conference Championships, Super Bowl (played two weeks later)
+playoff_games = [(19, 6), (20, 4), (21, 2), (23, 1)]
+
+base_captures_per_day = 4
+
+teams = [
+    "Arizona Cardinals", "Atlanta Falcons", "Baltimore Ravens", "Buffalo Bills", "Carolina Panthers",
+    "Chicago Bears", "Cincinnati Bengals", "Cleveland Browns", "Dallas Cowboys", "Denver Broncos",
+    "Detroit Lions", "Green Bay Packers", "Houston Texans", "Indianapolis Colts", "Jacksonville Jaguars",
+    "Kansas City Chiefs", "Las Vegas Raiders", "Los Angeles Chargers", "Los Angeles Rams", "Miami Dolphins",
+    "Minnesota Vikings", "New England Patriots", "New Orleans Saints", "New York Giants", "New York Jets",
+    "Philadelphia Eagles", "Pittsburgh Steelers", "San Francisco 49ers", "Seattle Seahawks",
+    "Tampa Bay Buccaneers", "Tennessee Titans", "Washington Commanders",
+]
+
+sportsbooks = [
+    ("draftkings", "DraftKings"), ("fanduel", "FanDuel"), ("betmgm", "BetMGM"), ("williamhill_us", "Caesars"),
+    ("fanatics", "Fanatics"), ("betrivers", "BetRivers"), ("bovada", "Bovada"), ("mybookieag", "MyBookie.ag"),
+    ("betonlineag", "BetOnline.ag"), ("betus", "BetUS"), ("lowvig", "LowVig.ag"), ("espnbet", "ESPN BET"),
+    ("hardrockbet", "Hard Rock Bet"), ("ballybet", "Bally Bet"), ("betparx", "betPARX"), ("fliff", "Fliff"),
+    ("pinnacle", "Pinnacle"), ("betfair_ex_eu", "Betfair"), ("unibet_eu", "Unibet"), ("williamhill", "William Hill"),
+    ("marathonbet", "Marathon Bet"), ("betsson", "Betsson"), ("nordicbet", "Nordic Bet"), ("coolbet", "Coolbet"),
+    ("everygame", "Everygame"), ("sport888", "888sport"), ("matchbook", "Matchbook"), ("onexbet", "1xBet"),
+]
+
+# Spread and total price pairs a book cycles through while its line holds
+juice_pairs = np.array([(-110, -110), (-105, -115), (-115, -105), (-120, 100), (100, -120), (-108, -112), (-112, -108)])
+
+def iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def kickoff_slots(week, n_games):
+    # Thursday night, the Sunday windows and Sunday/Monday night, in UTC
+    thursday = season_start + timedelta(weeks=week - 1)
+    if week > regular_season_weeks:
+        saturday = thursday + timedelta(days=2)
+        return [saturday + timedelta(hours=h) for h in (21.5, 25, 42, 45.5, 49, 73.25)][:n_games]
+
+    sunday = thursday + timedelta(days=3)
+    slots = [thursday + timedelta(days=1, minutes=15)]
+    slots += [sunday + timedelta(hours=21, minutes=25)] * 3
+    slots += [sunday + timedelta(days=1, minutes=20), sunday + timedelta(days=2, minutes=15)]
+    early = [sunday + timedelta(hours=17)] * max(n_games - len(slots), 0)
+    return sorted(slots[:1] + early + slots[1:])[:n_games]
+
+def market_path(rng, base_line, open_at, kickoff, n_books, moves_per_game, follow_rate, lag_hours):
+    n_moves = max(rng.poisson(moves_per_game), 1)
+    move_times = rng.uniform(open_at, kickoff, n_moves)
+    steps = rng.choice([-1.0, -0.5, 0.5, 1.0], n_moves, p=[0.1, 0.4, 0.4, 0.1])
+    # Each book takes a consensus move after its own lag, or never (inf)
+    lags = rng.exponential(lag_hours * 3600, (n_books, n_moves))
+    book_move_times = np.where(rng.random((n_books, n_moves)) < follow_rate, move_times + lags, np.inf)
+    n_juice = max(rng.poisson(moves_per_game * 1.5), 1)
+    return {
+        "base": base_line + rng.choice([-0.5, 0, 0, 0, 0.5], n_books),
+        "steps": steps,
+        "move_times": book_move_times,
+        "juice_times": np.sort(rng.uniform(open_at, kickoff, (n_books, n_juice)), axis=1),
+        "juice": rng.integers(0, len(juice_pairs), (n_books, n_juice + 1)),
+    }
+
+def build_season(seed=0, games_per_week=16, n_books=26, lookahead_days=10, moves_per_game=12,
+                 follow_rate=0.85, lag_hours=2.0):
+    rng = np.random.default_rng(seed)
+    schedule = [(week, games_per_week) for week in range(1, regular_season_weeks + 1)] + playoff_games
+    games = []
+
+    for week, n_games in schedule:
+        order = rng.permutation(len(teams))
+        for i, kickoff in enumerate(kickoff_slots(week, n_games)):
+            kickoff_ts = kickoff.timestamp()
+            open_ts = kickoff_ts - lookahead_days * 86400
+            # Home spread from a home win probability, total around the league average
+            home_win = rng.uniform(0.15, 0.85)
+            spread = np.round(np.log(1 / home_win - 1) / 0.155 * 2) / 2
+            total = np.round(rng.normal(44.5, 3.5) * 2) / 2
+            games.append({
+                "id": hashlib.md5(f"{seed}-{week}-{i}".encode()).hexdigest(),
+                "home_team": teams[order[2 * i]],
+                "away_team": teams[order[2 * i + 1]],
+                "commence_time": iso(kickoff_ts),
+                "kickoff": kickoff_ts,
+                "open_at": open_ts,
+                "margin": rng.uniform(0.03, 0.06, n_books),
+                "spreads": market_path(rng, spread, open_ts, kickoff_ts, n_books, moves_per_game, follow_rate, lag_hours),
+                "totals": market_path(rng, total, open_ts, kickoff_ts, n_books, moves_per_game, follow_rate, lag_hours),
+            })
+
+    return games
+
+def market_at(path, ts):
+    moved = path["move_times"] <= ts
+    lines = path["base"] + moved @ path["steps"]
+    juice_index = (path["juice_times"] <= ts).sum(axis=1)
+    prices = juice_pairs[path["juice"][np.arange(len(lines)), juice_index]]
+    # Time of each book's latest move, for last_update
+    changes = np.concatenate([np.where(moved, path["move_times"], -np.inf), np.where(path["juice_times"] <= ts, path["juice_times"], -np.inf)], axis=1)
+    return lines, prices, changes.max(axis=1)
+
+def event_at(game, ts, markets):
+    spreads = market_at(game["spreads"], ts)
+    totals = market_at(game["totals"], ts)
+    home_lines = spreads[0]
+    # Moneylines follow each book's spread, with the book's margin spread across both sides
+    home_win = 1 / (1 + np.exp(0.155 * home_lines))
+    home_ml = np.round(probability_to_american(home_win * (1 + game["margin"] / 2)) / 5) * 5
+    away_ml = np.round(probability_to_american((1 - home_win) * (1 + game["margin"] / 2)) / 5) * 5
+    last_update = np.maximum(np.maximum(spreads[2], totals[2]), game["open_at"])
+
+    bookmakers = []
+    for b, (key, title) in enumerate(sportsbooks[:len(home_lines)]):
+        updated = iso(last_update[b])
+        book_markets = {
+            "h2h": [
+                {"name": game["away_team"], "price": int(away_ml[b])},
+                {"name": game["home_team"], "price": int(home_ml[b])},
+            ],
+            "spreads": [
+                {"name": game["away_team"], "price": int(spreads[1][b][0]), "point": float(-home_lines[b])},
+                {"name": game["home_team"], "price": int(spreads[1][b][1]), "point": float(home_lines[b])},
+            ],
+            "totals": [
+                {"name": "Over", "price": int(totals[1][b][0]), "point": float(totals[0][b])},
+                {"name": "Under", "price": int(totals[1][b][1]), "point": float(totals[0][b])},
+            ],
+        }
+        bookmakers.append({
+            "key": key,
+            "title": title,
+            "last_update": updated,
+            "markets": [{"key": m, "last_update": updated, "outcomes": book_markets[m]} for m in markets],
+        })
+
+    return {
+        "id": game["id"],
+        "sport_key": "americanfootball_nfl",
+        "sport_title": "NFL",
+        "commence_time": game["commence_time"],
+        "home_team": game["home_team"],
+        "away_team": game["away_team"],
+        "bookmakers": bookmakers,
+    }
+
+def capture_timestamps(scale=1.0, end=None):
+    interval = 86400 / (base_captures_per_day * scale)
+    start = (season_start + timedelta(hours=2)).timestamp()
+    end = end or (season_start + timedelta(weeks=23, days=4)).timestamp()
+    return np.arange(start, end, interval).round().astype(int)
+
+season = None
+season_markets = None
+
+def init_worker(seed, games_per_week, n_books, lookahead_days, markets):
+    global season, season_markets
+    season = build_season(seed, games_per_week, n_books, lookahead_days)
+    season_markets = markets
+
+def make_snapshot(ts):
+    # Like the historical endpoint, only games that have been posted and not yet kicked off
+    events = [event_at(g, ts, season_markets) for g in season if g["open_at"] <= ts < g["kickoff"]]
+    return {"timestamp": iso(ts), "data": events}
+
+def generate(
+    out_dir=synthetic_dir,
+    scale=1.0,
+    seed=0,
+    games_per_week=16,
+    n_books=26,
+    lookahead_days=10,
+    markets=("spreads", "totals", "h2h"),
+    workers=os.cpu_count() or 1,
+    weeks=None,
+    storage_format="json.gz",
+    deltas=True,
+):
+    if n_books > len(sportsbooks):
+        raise ValueError(f"At most {len(sportsbooks)} sportsbooks are available")
+
+    end = (season_start + timedelta(weeks=weeks)).timestamp() if weeks else None
+    timestamps = capture_timestamps(scale, end)
+    encoder = SnapshotDeltas() if deltas else None
+    stats = {"snapshots": len(timestamps), "rows": 0, "generate_seconds": 0.0, "write_seconds": 0.0, "bytes": 0}
+
+    started = time.perf_counter()
+    args = (seed, games_per_week, n_books, lookahead_days, list(markets))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=args) as pool:
+        # Built in parallel but saved in capture order, since delta snapshots reference earlier ones
+        for snapshot in pool.map(make_snapshot, timestamps, chunksize=8):
+            stats["rows"] += sum(len(b["markets"]) * 2 for e in snapshot["data"] for b in e["bookmakers"])
+            step = time.perf_counter()
+            filepath = save_odds(snapshot, snapshot["timestamp"], storage_format, encoder, out_dir)
+            stats["write_seconds"] += time.perf_counter() - step
+            stats["bytes"] += os.path.getsize(filepath)
+
+    stats["generate_seconds"] = time.perf_counter() - started - stats["write_seconds"]
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic season of historical Odds API snapshots")
+    parser.add_argument("--out-dir", default=synthetic_dir, help="Directory the nfl_odds_*.json.gz snapshots are written to")
+    parser.add_argument("--scale", type=float, default=1.0, help=f"Capture cadence, 1 = {base_captures_per_day} captures a day (about 1.8M rows)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--games-per-week", type=int, default=16, help="Regular season games per week, at most 16")
+    parser.add_argument("--books", type=int, default=26, help=f"Sportsbooks quoting every game, at most {len(sportsbooks)}")
+    parser.add_argument("--lookahead-days", type=float, default=10, help="Days before kickoff a game's lines are posted")
+    parser.add_argument("--markets", default="spreads,totals,h2h", help="Comma separated market keys")
+    parser.add_argument("--weeks", type=int, help="Only generate the first N weeks of captures")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes building snapshots")
+    parser.add_argument("--format", choices=["json.gz", "json"], default="json.gz", help="Snapshot file format")
+    parser.add_argument("--no-deltas", action="store_true", help="Write every snapshot in full")
+    args = parser.parse_args()
+
+    stats = generate(
+        args.out_dir, args.scale, args.seed, min(args.games_per_week, len(teams) // 2), args.books,
+        args.lookahead_days, args.markets.split(","), args.workers, args.weeks, args.format, not args.no_deltas,
+    )
+    print(
+        f"Wrote {stats['snapshots']:,} snapshots ({stats['rows']:,} rows, {stats['bytes'] / 1e6:,.1f} MB) to {args.out_dir} "
+        f"in {stats['generate_seconds'] + stats['write_seconds']:.1f}s ({stats['write_seconds']:.1f}s writing)"
+    )
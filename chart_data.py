@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+from downsample import downsample, bin_columns
+from odds_math import devig, overround
+
+# Builds the arrays behind each dashboard chart for one selection (game, operators,
+# market and outcome), so dashboard.py only hands them to Plotly. The selected outcome
+# is sorted by operator and capture once, with the other side's price matched in by key
+# rather than merged, and each operator's series is a slice of that sorted array rather
+# than a filter per operator. Operators are returned in the order they were selected.
+
+HEATMAP_COLUMNS = 20
+
+
+def book_slices(books):
+    # Start and end of each operator's run in an array sorted by operator
+    bounds = np.concatenate([[0], np.flatnonzero(books[1:] != books[:-1]) + 1, [len(books)]])
+    return {books[start]: slice(start, end) for start, end in zip(bounds[:-1], bounds[1:])}
+
+
+def both_sides(movements, outcome, other):
+    # Selected outcome's captures sorted by operator then time, with the other side's
+    # price at the same capture alongside, matched on one integer key per row
+    book_codes, _ = pd.factorize(movements["sportsbook"], sort=True)
+    time_codes, times = pd.factorize(movements["captured_at"], sort=True)
+    keys = book_codes.astype(np.int64) * len(times) + time_codes
+    outcomes = movements["outcome"]
+
+    selected = np.flatnonzero((outcomes == outcome).to_numpy())
+    selected = selected[np.argsort(keys[selected], kind="stable")]
+    side = movements[["captured_at", "sportsbook", "line", "price", "implied_prob"]].take(selected).reset_index(drop=True)
+    if other is not None:
+        others = np.flatnonzero((outcomes == other).to_numpy())
+        others = others[np.argsort(keys[others], kind="stable")]
+        position = np.searchsorted(keys[others], keys[selected]).clip(max=len(others) - 1)
+        matched = keys[others][position] == keys[selected]
+        side["other_price"] = np.where(matched, movements["price"].to_numpy(dtype=float)[others][position], np.nan)
+    return side[side["price"].notna().to_numpy()].reset_index(drop=True)
+
+
+def series(df, x_col, columns, sportsbooks):
+    # df sorted by operator then time, as downsample returns it
+    slices = book_slices(df["sportsbook"].to_numpy())
+    arrays = {c: df[c].to_numpy() for c in [x_col, *columns]}
+    return [
+        {"sportsbook": book, **{c: values[slices[book]] for c, values in arrays.items()}}
+        for book in sportsbooks if book in slices
+    ]
+
+
+def line_movement(side, market_type, sportsbooks):
+    y_col = "price" if market_type == "h2h" else "line"
+    hover_columns = [c for c in ["price", "other_price"] if c in side.columns]
+    # Drawn as steps, so only captures where something moved are needed. Every line move
+    # is kept, price only moves are thinned once a book passes the point budget.
+    chart = downsample(
+        side, "captured_at", y_col, "sportsbook",
+        change_columns=[c for c in ["line", "price", "other_price"] if c in side.columns],
+        force_columns=["line"],
+    )
+    padding = 5 if market_type == "h2h" else 1
+    return {
+        "y_col": y_col,
+        "series": series(chart, "captured_at", list(dict.fromkeys([y_col, *hover_columns])), sportsbooks),
+        "y_range": [side[y_col].min() - padding, side[y_col].max() + padding],
+    }
+
+
+def closing_probability(summary, sportsbooks, outcome, other):
+    # Both outcomes per operator side by side, for operators pricing both
+    closing = summary["closing_implied_prob_pct"].to_numpy()
+    prices = summary.assign(
+        closing_pct=closing * 100,
+        fair_pct=devig(closing, summary["sportsbook"]) * 100,
+        margin_pct=overround(closing, summary["sportsbook"]) * 100,
+    ).pivot(index="sportsbook", columns="outcome", values=["closing_pct", "fair_pct", "margin_pct"])
+    prices = prices.reindex(sportsbooks)
+    both = prices[("closing_pct", outcome)].notna() & prices[("closing_pct", other)].notna()
+    prices = prices[both.to_numpy()]
+    return {
+        "sportsbooks": prices.index.tolist(),
+        "selected_pct": prices[("closing_pct", outcome)].to_numpy(),
+        "other_pct": prices[("closing_pct", other)].to_numpy(),
+        "selected_fair_pct": prices[("fair_pct", outcome)].to_numpy(),
+        "other_fair_pct": prices[("fair_pct", other)].to_numpy(),
+        "margin_pct": prices[("margin_pct", outcome)].to_numpy(),
+    }
+
+
+def opening_closing(outcome_summary, sportsbooks):
+    books = outcome_summary.set_index("sportsbook")
+    books = books.loc[[b for b in sportsbooks if b in books.index]]
+    opening = books["opening_line"].to_numpy(dtype=float)
+    closing = books["closing_line"].to_numpy(dtype=float)
+    movement = books["total_line_movement"].to_numpy(dtype=float)
+    lines = np.concatenate([opening, closing])
+    return {
+        "sportsbooks": np.asarray(books.index),
+        "opening": opening,
+        "closing": closing,
+        "movement": movement,
+        "moved": movement != 0,
+        "x_range": [np.nanmin(lines) - 1, np.nanmax(lines) + 1.5] if len(books) else [0, 1],
+    }
+
+
+def line_segments(x0, x1, y):
+    # Many two point segments as one trace, separated by gaps
+    gap = np.full(len(y), None)
+    return np.column_stack([x0, x1, gap]).ravel(), np.column_stack([y, y, gap]).ravel()
+
+
+def pricing_heatmap(side, sportsbooks):
+    # Operators by capture time, filled straight from each row's position
+    codes, present = pd.factorize(side["sportsbook"])
+    books = [b for b in sportsbooks if b in set(present)]
+    rows = pd.Index(books).get_indexer(present)[codes]
+    columns, times = pd.factorize(side["captured_at"], sort=True)
+    grid = np.full((len(books), len(times)), np.nan)
+    grid[rows, columns] = side["price"].to_numpy(dtype=float)
+    pivot = pd.DataFrame(grid, index=books, columns=times)
+    # Each column shows the last price in its time bin
+    pivot = bin_columns(pivot, max_columns=HEATMAP_COLUMNS)
+    z = pivot.to_numpy(dtype=float)
+    return {
+        "sportsbooks": pivot.index.tolist(),
+        "z": z,
+        "text": np.where(np.isnan(z), "", np.char.mod("%d", np.nan_to_num(z))),
+        "time_labels": pd.DatetimeIndex(pivot.columns).strftime("%b %d %Hh").tolist(),
+        "z_range": [np.nanmin(z), np.nanmax(z)],
+    }
+
+
+def probability_over_time(side, sportsbooks):
+    chart = downsample(
+        side[["captured_at", "sportsbook", "implied_prob"]],
+        "captured_at", "implied_prob", "sportsbook",
+        include_run_ends=True,
+    )
+    chart = chart.assign(implied_prob=chart["implied_prob"] * 100)
+    low, high = chart["implied_prob"].min(), chart["implied_prob"].max()
+    padding = max((high - low) * 0.3, 1)
+    return {
+        "series": series(chart, "captured_at", ["implied_prob"], sportsbooks),
+        "y_range": [low - padding, high + padding],
+    }
+
+
+def best_price_totals(best_prices):
+    # One series per line, both sides' best prices added together at each capture, with
+    # each side's price and sportsbooks for the hover. best_prices is one game's market
+    # from fct_best_prices, sorted by line, capture and outcome.
+    quotes = (
+        best_prices["outcome"] + " " + best_prices["best_price"].map("{:+.0f}".format)
+        + " (" + best_prices["best_books"].map(", ".join) + ")"
+    )
+    markets = best_prices.assign(quote=quotes).groupby(["line_key", "captured_at"], sort=False).agg(
+        total_pct=("best_total_implied_prob", "first"),
+        sides=("quote", "count"),
+        quotes=("quote", "<br>".join),
+    ).reset_index()
+    # A market with one side quoted has no total
+    markets = markets[markets["sides"].to_numpy() == 2]
+    totals = markets["total_pct"].to_numpy() * 100
+    captured_at = markets["captured_at"].to_numpy()
+    slices = book_slices(markets["line_key"].to_numpy())
+    return {
+        "series": [
+            {
+                "line_key": line_key,
+                "captured_at": captured_at[rows],
+                "total_pct": totals[rows],
+                "quotes": markets["quotes"].to_numpy()[rows],
+            }
+            for line_key, rows in slices.items()
+        ],
+        "arbitrage": {"captured_at": captured_at[totals < 100], "total_pct": totals[totals < 100]},
+        "y_range": [min(totals.min(), 100) - 1, max(totals.max(), 100) + 1] if len(totals) else [99, 101],
+    }
+
+
+def prepare(movements, summary, sportsbooks, market_type, outcome):
+    # movements and summary are one game's market for the selected operators
+    outcomes = movements["outcome"].unique().tolist()
+    other = next((o for o in outcomes if o != outcome), None)
+    outcome_summary = summary[summary["outcome"] == outcome]
+
+    charts = {"other_outcome": other, "line_movement": None, "closing_probability": None,
+              "opening_closing": None, "pricing_heatmap": None, "probability_over_time": None}
+    side = both_sides(movements, outcome, other) if outcome in outcomes else None
+    if side is not None and not side.empty:
+        charts["line_movement"] = line_movement(side, market_type, sportsbooks)
+        charts["pricing_heatmap"] = pricing_heatmap(side, sportsbooks)
+        charts["probability_over_time"] = probability_over_time(side, sportsbooks)
+    if other is not None and {outcome, other} <= set(summary["outcome"]):
+        charts["closing_probability"] = closing_probability(summary, sportsbooks, outcome, other)
+    if not outcome_summary.empty and market_type != "h2h":
+        charts["opening_closing"] = opening_closing(outcome_summary, sportsbooks)
+    return charts
@@ -1,23 +1,21 @@
 import os
-import urllib.request
 from datetime import timedelta
 import streamlit as st
-import duckdb
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import partition_cache
+import telemetry
+from dashboard_data import (
+    DB_PATH, PARTITIONS_DIR, db_version, get_chart_data, get_game_index, get_line_movements, get_game_summary,
+    get_price_scan, latency_summary,
+)
 
 # Credit to sfc-gh-tteixeira on dashboard template
 # Github: https://github.com/streamlit/demo-stockpeers/blob/main/streamlit_app.py
 # Streamlit: https://demo-stockpeers.streamlit.app/?ref=streamlit-io-gallery-favorites&stocks=AAPL%2CMSFT%2CGOOGL%2CNVDA%2CAMZN%2CTSLA%2CMETA
 
-DB_PATH = "data/nfl_odds.duckdb"
-DB_URL = "https://github.com/bobby-king3/nfl-market-movement-tracker/releases/download/v1.1.1/nfl_odds.duckdb"
-
-if not os.path.exists(DB_PATH):
-    os.makedirs("data", exist_ok=True)
-    with st.spinner("Downloading database"):
-        urllib.request.urlretrieve(DB_URL, DB_PATH)
+DB_URL = os.getenv(
+    "DASHBOARD_DB_URL",
+    "https://github.com/bobby-king3/nfl-market-movement-tracker/releases/download/v1.1.1/nfl_odds.duckdb",
+)
 
 st.set_page_config(
     page_title="NFL Market Tracker",
@@ -25,13 +23,23 @@ st.set_page_config(
     layout="wide",
 )
 
+
+@st.cache_resource
+def start_telemetry():
+    # Once per server process, not on every rerun
+    telemetry.start()
+
+
+start_telemetry()
+
 """
 # NFL Market Tracker
 """
 
-st.subheader("2025-2026 Season")
-
-""
+if not PARTITIONS_DIR and not os.path.exists(DB_PATH):
+    # Resumed from data/nfl_odds.duckdb.part if an earlier start was interrupted
+    with st.spinner("Downloading database"):
+        partition_cache.download(DB_URL, DB_PATH)
 
 OPERATOR_DISPLAY = {
     "ballybet": "Bally Bet",
@@ -64,101 +72,41 @@ OPERATOR_COLORS = {
 DEFAULT_OPERATORS = ["pinnacle", "draftkings", "fanduel", "hardrockbet", "betrivers"]
 
 
-WEEK_LABELS = {
-    **{i: f"Week {i}" for i in range(1, 19)},
-    19: "Wild Card",
-    20: "Divisional",
-    21: "Conference Championships",
-    22: "Super Bowl",
-}
+game_index = get_game_index(db_version())
+games = game_index["games"]
+
+
+def game_label(event_id):
+    _, home, away, start_time, _, _, _ = games[event_id]
+    return f"{home} vs {away} — {start_time.strftime('%b %d')}"
+
+
+def season_label(season):
+    return f"{season}-{season + 1}"
 
-@st.cache_data
-def get_games():
-    conn = duckdb.connect(DB_PATH, read_only=True)
-    games = conn.execute("""
-        select event_id, home_team, away_team,
-               max(game_start_time) as game_start_time,
-               max(nfl_week) as nfl_week
-        from fct_line_movements
-        group by event_id, home_team, away_team
-        order by game_start_time desc
-    """).fetchall()
-    conn.close()
-    return games
-
-@st.cache_data
-def get_line_movements(event_id, sportsbooks, market_type):
-    conn = duckdb.connect(DB_PATH, read_only=True)
-    placeholders = ",".join(["?" for _ in sportsbooks])
-    df = conn.execute(f"""
-        select captured_at, sportsbook, line, price, outcome, implied_prob
-        from fct_line_movements
-        where event_id = ?
-          and sportsbook in ({placeholders})
-          and market_type = ?
-        order by captured_at
-    """, [event_id] + sportsbooks + [market_type]).fetchdf()
-    conn.close()
-    return df
-
-@st.cache_data
-def get_game_summary(event_id, sportsbooks, market_type):
-    conn = duckdb.connect(DB_PATH, read_only=True)
-    placeholders = ",".join(["?" for _ in sportsbooks])
-    df = conn.execute(f"""
-        select sportsbook, outcome, opening_line, closing_line, total_line_movement,
-               opening_price, closing_price, opening_implied_prob_pct,
-               closing_implied_prob_pct, implied_prob_pct_change, capture_count
-        from fct_game_summary
-        where event_id = ?
-          and sportsbook in ({placeholders})
-          and market_type = ?
-        order by sportsbook, outcome
-    """, [event_id] + sportsbooks + [market_type]).fetchdf()
-    conn.close()
-    return df
-
-games = get_games()
-
-games_with_weeks = []
-for g in games:
-    event_id, home, away, start_time, week_num = g
-    week_label = WEEK_LABELS.get(week_num, f"Week {week_num}")
-    game_label = f"{home} vs {away} — {start_time.strftime('%b %d')}"
-    games_with_weeks.append((event_id, home, away, start_time, week_num, week_label, game_label))
-
-all_teams = sorted(set(
-    team for g in games_with_weeks for team in (g[1], g[2])
-))
 
 with st.sidebar:
+    seasons = list(game_index["seasons"])
+    selected_season = st.selectbox("Season", seasons, index=len(seasons) - 1, format_func=season_label)
+    season_index = game_index["seasons"][selected_season]
+
     browse_mode = st.pills("Browse by", ["Week", "Team"], default="Week")
 
     if browse_mode == "Week":
-        # Get available weeks in order
-        available_weeks = sorted(set(g[4] for g in games_with_weeks))
-        week_options = [WEEK_LABELS.get(w, f"Week {w}") for w in available_weeks]
+        available_weeks = list(season_index["weeks"])
+        week_options = list(season_index["weeks"].values())
 
         selected_week_label = st.selectbox("Week", week_options, index=len(week_options) - 1)
         selected_week_num = available_weeks[week_options.index(selected_week_label)]
 
-        # Filter games to selected week, sorted by game date
-        week_games = sorted(
-            [g for g in games_with_weeks if g[4] == selected_week_num],
-            key=lambda g: g[3],
-        )
-        game_options = {g[6]: g[0] for g in week_games}
+        # Games in the selected week, sorted by game date
+        game_options = {game_label(e): e for e in season_index["by_week"][selected_week_num]}
 
     else:
-        selected_team = st.selectbox("Team", all_teams)
+        selected_team = st.selectbox("Team", list(season_index["by_team"]))
 
-        # Filter games involving selected team, most recent first
-        team_games = sorted(
-            [g for g in games_with_weeks if selected_team in (g[1], g[2])],
-            key=lambda g: g[3],
-            reverse=True,
-        )
-        game_options = {f"{g[5]}: {g[6]}": g[0] for g in team_games}
+        # Games involving the selected team, most recent first
+        game_options = {f"{games[e][5]}: {game_label(e)}": e for e in season_index["by_team"][selected_team]}
 
     selected_game_label = st.selectbox("Game", list(game_options.keys()))
     selected_event_id = game_options[selected_game_label]
@@ -177,13 +125,28 @@ with st.sidebar:
         format_func=lambda x: {"h2h": "Head to Head", "spreads": "Spread", "totals": "Total"}[x],
     )
 
+st.subheader(f"{season_label(selected_season)} Season")
+
+""
+
 if not selected_operators:
     st.info("Select at least one operator.", icon=":material/info:")
     st.stop()
 
+# Charting libraries load on the first rerun that draws a chart, after the sidebar
+# has rendered, instead of delaying the first paint
+import numpy as np
+import plotly.graph_objects as go
+from chart_data import best_price_totals, line_segments
+from odds_math import overround
+
 movements = get_line_movements(selected_event_id, selected_operators, market_type)
 summary = get_game_summary(selected_event_id, selected_operators, market_type)
 
+if st.query_params.get("debug"):
+    with st.sidebar.expander("Latency"):
+        st.dataframe(latency_summary(), hide_index=True)
+
 if movements.empty:
     st.info("No data for this selection.", icon=":material/info:")
     st.stop()
@@ -202,24 +165,17 @@ else:
 with st.sidebar:
     selected_outcome = st.pills("Outcome", outcomes, default=selected_outcome)
 
-filtered = movements[movements["outcome"] == selected_outcome]
 outcome_summary = summary[summary["outcome"] == selected_outcome]
+charts = get_chart_data(selected_event_id, selected_operators, market_type, selected_outcome, db_version())
+other_outcome = charts["other_outcome"]
 
-other_outcome = [o for o in outcomes if o != selected_outcome]
-if other_outcome:
-    other_filtered = movements[movements["outcome"] == other_outcome[0]][["captured_at", "sportsbook", "price"]].rename(
-        columns={"price": "other_price"}
-    )
-    filtered = filtered.merge(other_filtered, on=["captured_at", "sportsbook"], how="left")
-
-selected_game_info = next(g for g in games_with_weeks if g[0] == selected_event_id)
-game_start_time = selected_game_info[3]
+game_start_time = games[selected_event_id][3]
 
 if not outcome_summary.empty:
     avg_prob_change = outcome_summary["implied_prob_pct_change"].mean() * 100
     n_books = len(outcome_summary)
-    vig_by_book = summary.groupby("sportsbook")["closing_implied_prob_pct"].sum()
-    avg_margin = (vig_by_book.mean() - 1.0) * 100
+    book_margins = summary.assign(margin=overround(summary["closing_implied_prob_pct"], summary["sportsbook"]))
+    avg_margin = book_margins.drop_duplicates("sportsbook")["margin"].mean() * 100
 
     metric_col, _ = st.columns([1, 1])
     with metric_col:
@@ -246,134 +202,104 @@ if not outcome_summary.empty:
                 m3.metric("Operators Moved", f"{books_moved} of {n_books}")
             st.caption(f"Avg closing odds across {n_books} selected operator(s)")
 
-hover_data = {"price": True}
-if "other_price" in filtered.columns:
-    hover_data["other_price"] = True
-
-chart_data = filtered.copy()
-chart_data["operator"] = chart_data["sportsbook"].map(OPERATOR_DISPLAY)
-display_color_map = {OPERATOR_DISPLAY[k]: v for k, v in OPERATOR_COLORS.items() if k in OPERATOR_COLORS}
-
-if market_type == "h2h":
-    y_col = "price"
-    y_label = "Head to Head Price"
-else:
-    y_col = "line"
-    y_label = "Line"
-
-fig_line = px.line(
-    chart_data,
-    x="captured_at",
-    y=y_col,
-    color="operator",
-    labels={
-        "captured_at": "Date",
-        y_col: y_label,
-        "operator": "Operator",
-        "price": f"{selected_outcome} Price",
-        "other_price": f"{other_outcome[0]} Price" if other_outcome else "Price",
-    },
-    line_shape="hv",
-    hover_data=hover_data,
-    color_discrete_map=display_color_map,
-)
-if market_type == "h2h":
-    price_min = filtered["price"].min() - 5
-    price_max = filtered["price"].max() + 5
-    fig_line.update_yaxes(range=[price_min, price_max])
-else:
-    line_min = filtered["line"].min() - 1
-    line_max = filtered["line"].max() + 1
-    fig_line.update_yaxes(range=[line_min, line_max], dtick=0.5)
-fig_line.update_traces(line=dict(width=2.5))
-fig_line.update_layout(
-    hovermode="x unified",
-    height=450,
-    margin=dict(l=20, r=20, t=30, b=20),
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-    xaxis=dict(
-        range=[game_start_time - timedelta(days=7), game_start_time],
-        rangeselector=dict(
-            buttons=[
-                dict(count=7, label="1W", step="day", stepmode="backward"),
-                dict(count=14, label="2W", step="day", stepmode="backward"),
-                dict(step="all", label="All"),
-            ],
-        ),
-    ),
-)
+line_chart = charts["line_movement"]
+if line_chart:
+    with telemetry.timer("dashboard.figure.line_movement", memory=True):
+        y_col = line_chart["y_col"]
+        y_label = "Head to Head Price" if market_type == "h2h" else "Line"
+
+        # Price columns not already on the y axis are shown on hover
+        hover_columns = [c for c in ["price", "other_price"] if c != y_col and c in line_chart["series"][0]]
+        hover_labels = {"price": f"{selected_outcome} Price", "other_price": f"{other_outcome} Price"}
+        hovertemplate = "%{y}" + "".join(
+            f" · {hover_labels[c]} %{{customdata[{i}]}}" for i, c in enumerate(hover_columns)
+        )
 
-if market_type == "spreads":
-    chart_label = f"Spread — {selected_outcome}"
-elif market_type == "h2h":
-    chart_label = f"Head to Head — {selected_outcome}"
-else:
-    chart_label = f"Total — {selected_outcome}"
-st.caption(chart_label)
-st.plotly_chart(fig_line, use_container_width=True)
+        fig_line = go.Figure()
+        for book_series in line_chart["series"]:
+            book = book_series["sportsbook"]
+            fig_line.add_trace(go.Scatter(
+                x=book_series["captured_at"],
+                y=book_series[y_col],
+                customdata=np.column_stack([book_series[c] for c in hover_columns]) if hover_columns else None,
+                name=OPERATOR_DISPLAY.get(book, book),
+                mode="lines",
+                line=dict(width=2.5, color=OPERATOR_COLORS.get(book), shape="hv"),
+                hovertemplate=hovertemplate + f"<extra>{OPERATOR_DISPLAY.get(book, book)}</extra>",
+            ))
+        if market_type == "h2h":
+            fig_line.update_yaxes(range=line_chart["y_range"])
+        else:
+            fig_line.update_yaxes(range=line_chart["y_range"], dtick=0.5)
+        fig_line.update_layout(
+            hovermode="x unified",
+            height=450,
+            margin=dict(l=20, r=20, t=30, b=20),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, title_text="Operator"),
+            xaxis_title="Date",
+            yaxis_title=y_label,
+            xaxis=dict(
+                range=[game_start_time - timedelta(days=7), game_start_time],
+                rangeselector=dict(
+                    buttons=[
+                        dict(count=7, label="1W", step="day", stepmode="backward"),
+                        dict(count=14, label="2W", step="day", stepmode="backward"),
+                        dict(step="all", label="All"),
+                    ],
+                ),
+            ),
+        )
 
-if not summary.empty:
+        if market_type == "spreads":
+            chart_label = f"Spread — {selected_outcome}"
+        elif market_type == "h2h":
+            chart_label = f"Head to Head — {selected_outcome}"
+        else:
+            chart_label = f"Total — {selected_outcome}"
+        st.caption(chart_label)
+        st.plotly_chart(fig_line, use_container_width=True)
+
+probability_bars = charts["closing_probability"]
+if probability_bars:
     """
     ## Closing Implied Probability by Operator
     """
 
-    # Pivot to get both outcomes side by side per sportsbook
-    prob_data = summary.copy()
-    prob_data["closing_pct"] = prob_data["closing_implied_prob_pct"] * 100
-    prob_data["display_name"] = prob_data["sportsbook"].map(OPERATOR_DISPLAY)
-
-    other_name = other_outcome[0] if other_outcome else None
-
-    if other_name:
-        side_selected = prob_data[prob_data["outcome"] == selected_outcome].set_index("sportsbook")
-        side_other = prob_data[prob_data["outcome"] == other_name].set_index("sportsbook")
-
-        books = [s for s in selected_operators if s in side_selected.index and s in side_other.index]
+    with telemetry.timer("dashboard.figure.closing_probability", memory=True):
+        books = probability_bars["sportsbooks"]
         display_names = [OPERATOR_DISPLAY.get(b, b) for b in books]
+        margins = probability_bars["margin_pct"]
 
         fig = go.Figure()
 
-        fig.add_trace(go.Bar(
-            y=display_names,
-            x=[side_selected.loc[b, "closing_pct"] for b in books],
-            name=selected_outcome,
-            orientation="h",
-            marker_color="#8B5E8B",
-            text=[f"{side_selected.loc[b, 'closing_pct']:.1f}%" for b in books],
-            textposition="inside",
-            hovertemplate="%{y}: %{x:.1f}%<extra>" + selected_outcome + "</extra>",
-        ))
-
-        fig.add_trace(go.Bar(
+        for name, side, color in [(selected_outcome, "selected", "#8B5E8B"), (other_outcome, "other", "#5B8FC9")]:
+            fig.add_trace(go.Bar(
+                y=display_names,
+                x=probability_bars[f"{side}_pct"],
+                name=name,
+                orientation="h",
+                marker_color=color,
+                text=np.char.mod("%.1f%%", probability_bars[f"{side}_pct"]),
+                textposition="inside",
+                customdata=probability_bars[f"{side}_fair_pct"],
+                hovertemplate="%{y}: %{x:.1f}% (no-vig %{customdata:.1f}%)<extra>" + name + "</extra>",
+            ))
+
+        # Margin labels at the end of each bar, as one text trace
+        fig.add_trace(go.Scatter(
+            x=100 + margins,
             y=display_names,
-            x=[side_other.loc[b, "closing_pct"] for b in books],
-            name=other_name,
-            orientation="h",
-            marker_color="#5B8FC9",
-            text=[f"{side_other.loc[b, 'closing_pct']:.1f}%" for b in books],
-            textposition="inside",
-            hovertemplate="%{y}: %{x:.1f}%<extra>" + other_name + "</extra>",
+            mode="text",
+            text=np.char.mod("  %.1f%% margin", margins),
+            textposition="middle right",
+            textfont=dict(size=11, color="#999"),
+            showlegend=False,
+            hoverinfo="skip",
         ))
 
-        # Add margin annotations at end of each bar
-        for j, b in enumerate(books):
-            total = side_selected.loc[b, "closing_pct"] + side_other.loc[b, "closing_pct"]
-            margin = total - 100
-            fig.add_annotation(
-                x=total,
-                y=display_names[j],
-                text=f"  {margin:.1f}% margin",
-                showarrow=False,
-                xanchor="left",
-                font=dict(size=11, color="#999"),
-            )
-
         fig.add_vline(x=50, line_dash="dash", line_color="white", line_width=1, opacity=0.5)
 
-        max_total = max(
-            side_selected.loc[b, "closing_pct"] + side_other.loc[b, "closing_pct"]
-            for b in books
-        )
+        max_total = 100 + margins.max()
 
         fig.update_layout(
             barmode="stack",
@@ -390,210 +316,171 @@ if not summary.empty:
 ""
 ""
 
-if not outcome_summary.empty and market_type != "h2h":
+dumbbell = charts["opening_closing"]
+if dumbbell:
     """
     ## Opening vs Closing Movement
     """
 
-    dumbbell_data = outcome_summary.copy()
-    dumbbell_data["display_name"] = dumbbell_data["sportsbook"].map(OPERATOR_DISPLAY)
-    display_names = dumbbell_data["display_name"].tolist()
-
-    fig_db = go.Figure()
-
-    moved = dumbbell_data[dumbbell_data["total_line_movement"] != 0]
-    no_move = dumbbell_data[dumbbell_data["total_line_movement"] == 0]
-
-    # Connecting lines for moved sportsbooks
-    for _, row in moved.iterrows():
-        book_color = OPERATOR_COLORS.get(row["sportsbook"], "#888")
-        fig_db.add_trace(go.Scatter(
-            x=[row["opening_line"], row["closing_line"]],
-            y=[row["display_name"], row["display_name"]],
-            mode="lines",
-            line=dict(color=book_color, width=3),
-            showlegend=False,
-            hoverinfo="skip",
-        ))
-
-    # Opening dots (only for moved lines)
-    if not moved.empty:
-        fig_db.add_trace(go.Scatter(
-            x=moved["opening_line"],
-            y=moved["display_name"],
-            mode="markers",
-            showlegend=False,
-            marker=dict(size=12, color="white", line=dict(width=2, color="#666")),
-            hovertemplate="%{y}<br>Opening: %{x}<extra></extra>",
-        ))
-
-    # Closing dots (only for moved lines)
-    if not moved.empty:
-        fig_db.add_trace(go.Scatter(
-            x=moved["closing_line"],
-            y=moved["display_name"],
-            mode="markers",
-            showlegend=False,
-            marker=dict(
-                size=12,
-                color=[OPERATOR_COLORS.get(s, "#888") for s in moved["sportsbook"]],
-                line=dict(width=2, color="white"),
-            ),
-            hovertemplate="%{y}<br>Closing: %{x}<extra></extra>",
-        ))
-
-    # No-movement dots — single filled dot
-    if not no_move.empty:
-        fig_db.add_trace(go.Scatter(
-            x=no_move["closing_line"],
-            y=no_move["display_name"],
-            mode="markers",
+    with telemetry.timer("dashboard.figure.opening_closing", memory=True):
+        display_names = np.array([OPERATOR_DISPLAY.get(b, b) for b in dumbbell["sportsbooks"]])
+        book_colors = np.array([OPERATOR_COLORS.get(b, "#888") for b in dumbbell["sportsbooks"]])
+        moved = dumbbell["moved"]
+        no_move = ~moved
+
+        fig_db = go.Figure()
+
+        # Connecting lines for moved sportsbooks, one trace per color
+        for color in np.unique(book_colors[moved]):
+            books = moved & (book_colors == color)
+            x, y = line_segments(dumbbell["opening"][books], dumbbell["closing"][books], display_names[books])
+            fig_db.add_trace(go.Scatter(
+                x=x,
+                y=y,
+                mode="lines",
+                line=dict(color=color, width=3),
+                showlegend=False,
+                hoverinfo="skip",
+            ))
+
+        if moved.any():
+            # Opening dots (only for moved lines)
+            fig_db.add_trace(go.Scatter(
+                x=dumbbell["opening"][moved],
+                y=display_names[moved],
+                mode="markers",
+                showlegend=False,
+                marker=dict(size=12, color="white", line=dict(width=2, color="#666")),
+                hovertemplate="%{y}<br>Opening: %{x}<extra></extra>",
+            ))
+
+            # Closing dots (only for moved lines)
+            fig_db.add_trace(go.Scatter(
+                x=dumbbell["closing"][moved],
+                y=display_names[moved],
+                mode="markers",
+                showlegend=False,
+                marker=dict(size=12, color=book_colors[moved], line=dict(width=2, color="white")),
+                hovertemplate="%{y}<br>Closing: %{x}<extra></extra>",
+            ))
+
+            # Movement labels
+            fig_db.add_trace(go.Scatter(
+                x=np.maximum(dumbbell["opening"][moved], dumbbell["closing"][moved]),
+                y=display_names[moved],
+                mode="text",
+                text=np.char.mod("  %+.1f", dumbbell["movement"][moved]),
+                textposition="middle right",
+                textfont=dict(size=11, color="#999"),
+                showlegend=False,
+                hoverinfo="skip",
+            ))
+
+        # No-movement dots — single filled dot
+        if no_move.any():
+            fig_db.add_trace(go.Scatter(
+                x=dumbbell["closing"][no_move],
+                y=display_names[no_move],
+                mode="markers",
+                showlegend=False,
+                marker=dict(size=12, color=book_colors[no_move], line=dict(width=2, color="white"), symbol="diamond"),
+                hovertemplate="%{y}<br>Line: %{x} (no change)<extra></extra>",
+            ))
+
+        fig_db.update_layout(
+            height=45 * len(display_names) + 80,
+            margin=dict(l=10, r=10, t=10, b=40),
+            xaxis_title="Line",
+            yaxis_title="",
+            xaxis=dict(range=dumbbell["x_range"], dtick=0.5),
+            yaxis=dict(categoryorder="array", categoryarray=display_names),
             showlegend=False,
-            marker=dict(
-                size=12,
-                color=[OPERATOR_COLORS.get(s, "#888") for s in no_move["sportsbook"]],
-                line=dict(width=2, color="white"),
-                symbol="diamond",
-            ),
-            hovertemplate="%{y}<br>Line: %{x} (no change)<extra></extra>",
-        ))
-
-    # Movement annotations
-    for _, row in moved.iterrows():
-        movement = row["total_line_movement"]
-        fig_db.add_annotation(
-            x=max(row["opening_line"], row["closing_line"]),
-            y=row["display_name"],
-            text=f"  {movement:+.1f}",
-            showarrow=False,
-            xanchor="left",
-            font=dict(size=11, color="#999"),
         )
 
-    all_lines = list(dumbbell_data["opening_line"]) + list(dumbbell_data["closing_line"])
-    line_min_db = min(all_lines) - 1
-    line_max_db = max(all_lines) + 1.5
-
-    fig_db.update_layout(
-        height=45 * len(dumbbell_data) + 80,
-        margin=dict(l=10, r=10, t=10, b=40),
-        xaxis_title="Line",
-        yaxis_title="",
-        xaxis=dict(range=[line_min_db, line_max_db], dtick=0.5),
-        showlegend=False,
-    )
-
-    st.plotly_chart(fig_db, use_container_width=True)
+        st.plotly_chart(fig_db, use_container_width=True)
     st.caption("White circle = opening line, colored circle = closing line, diamond = no movement.")
 
 ""
 ""
 
-if not filtered.empty:
+heatmap = charts["pricing_heatmap"]
+if heatmap:
     """
     ## Odds Pricing Heatmap
     """
 
-    heat_data = filtered[["captured_at", "sportsbook", "price"]].copy()
-    heat_data["display_name"] = heat_data["sportsbook"].map(OPERATOR_DISPLAY)
-
-    # Pivot: sportsbooks as rows, capture times as columns
-    pivot = heat_data.pivot_table(index="sportsbook", columns="captured_at", values="price", aggfunc="first")
-    # Maintain selected sportsbook order
-    ordered_books = [s for s in selected_operators if s in pivot.index]
-    pivot = pivot.loc[ordered_books]
-    display_names = [OPERATOR_DISPLAY.get(b, b) for b in ordered_books]
-
-    max_cols = 20
-    if len(pivot.columns) > max_cols:
-        step = len(pivot.columns) // max_cols
-        pivot = pivot.iloc[:, ::step]
-
-    time_labels = [t.strftime("%b %d %Hh") for t in pivot.columns]
-
-    price_min = pivot.min().min()
-    price_max = pivot.max().max()
-
-    fig_heat = go.Figure(data=go.Heatmap(
-        z=pivot.values,
-        x=time_labels,
-        y=display_names,
-        colorscale=[[0, "#1a2a4a"], [0.5, "#4A90D9"], [1, "#FF4444"]],
-        text=[[f"{int(v)}" if not pd.isna(v) else "" for v in row] for row in pivot.values],
-        texttemplate="%{text}",
-        textfont=dict(size=12),
-        hovertemplate="<b>%{y}</b><br>%{x}<br>Price: %{z}<extra></extra>",
-        colorbar=dict(title="Price"),
-        zmin=price_min,
-        zmax=price_max,
-    ))
-
-    fig_heat.update_layout(
-        height=55 * len(ordered_books) + 80,
-        margin=dict(l=10, r=10, t=10, b=40),
-        xaxis_title="",
-        yaxis_title="",
-    )
+    with telemetry.timer("dashboard.figure.pricing_heatmap", memory=True):
+        fig_heat = go.Figure(data=go.Heatmap(
+            z=heatmap["z"],
+            x=heatmap["time_labels"],
+            y=[OPERATOR_DISPLAY.get(b, b) for b in heatmap["sportsbooks"]],
+            colorscale=[[0, "#1a2a4a"], [0.5, "#4A90D9"], [1, "#FF4444"]],
+            text=heatmap["text"],
+            texttemplate="%{text}",
+            textfont=dict(size=12),
+            hovertemplate="<b>%{y}</b><br>%{x}<br>Price: %{z}<extra></extra>",
+            colorbar=dict(title="Price"),
+            zmin=heatmap["z_range"][0],
+            zmax=heatmap["z_range"][1],
+        ))
 
-    st.plotly_chart(fig_heat, use_container_width=True)
+        fig_heat.update_layout(
+            height=55 * len(heatmap["sportsbooks"]) + 80,
+            margin=dict(l=10, r=10, t=10, b=40),
+            xaxis_title="",
+            yaxis_title="",
+        )
+
+        st.plotly_chart(fig_heat, use_container_width=True)
     st.caption(f"Showing {selected_outcome} — color intensity reflects how aggressively each operator is pricing this outcome.")
 
 ""
 ""
 
-if not filtered.empty:
+prob_over_time = charts["probability_over_time"]
+if prob_over_time:
     """
     ## Implied Probability Over Time
     """
 
-    prob_over_time = filtered[["captured_at", "sportsbook", "implied_prob"]].copy()
-    prob_over_time["implied_prob"] = prob_over_time["implied_prob"] * 100
-    prob_over_time["display_name"] = prob_over_time["sportsbook"].map(OPERATOR_DISPLAY)
-
-    fig_prob = go.Figure()
-
-    prob_min = prob_over_time["implied_prob"].min()
-    prob_max = prob_over_time["implied_prob"].max()
-
-    for book in selected_operators:
-        book_data = prob_over_time[prob_over_time["sportsbook"] == book]
-        if book_data.empty:
-            continue
-        color = OPERATOR_COLORS.get(book, "#888888")
-        fig_prob.add_trace(go.Scatter(
-            x=book_data["captured_at"],
-            y=book_data["implied_prob"],
-            name=OPERATOR_DISPLAY.get(book, book),
-            mode="lines",
-            line=dict(width=2.5, color=color),
-            hovertemplate="%{y:.1f}%<extra>" + OPERATOR_DISPLAY.get(book, book) + "</extra>",
-        ))
-
-    y_padding = max((prob_max - prob_min) * 0.3, 1)
-    fig_prob.update_layout(
-        height=400,
-        margin=dict(l=20, r=20, t=30, b=20),
-        yaxis_title="Implied Probability %",
-        yaxis=dict(
-            range=[prob_min - y_padding, prob_max + y_padding],
-            ticksuffix="%",
-        ),
-        xaxis=dict(
-            range=[game_start_time - timedelta(days=7), game_start_time],
-            rangeselector=dict(
-                buttons=[
-                    dict(count=7, label="1W", step="day", stepmode="backward"),
-                    dict(count=14, label="2W", step="day", stepmode="backward"),
-                    dict(step="all", label="All"),
-                ],
+    with telemetry.timer("dashboard.figure.probability_over_time", memory=True):
+        fig_prob = go.Figure()
+
+        for book_series in prob_over_time["series"]:
+            book = book_series["sportsbook"]
+            fig_prob.add_trace(go.Scatter(
+                x=book_series["captured_at"],
+                y=book_series["implied_prob"],
+                name=OPERATOR_DISPLAY.get(book, book),
+                mode="lines",
+                line=dict(width=2.5, color=OPERATOR_COLORS.get(book, "#888888")),
+                hovertemplate="%{y:.1f}%<extra>" + OPERATOR_DISPLAY.get(book, book) + "</extra>",
+            ))
+
+        fig_prob.update_layout(
+            height=400,
+            margin=dict(l=20, r=20, t=30, b=20),
+            yaxis_title="Implied Probability %",
+            yaxis=dict(
+                range=prob_over_time["y_range"],
+                ticksuffix="%",
             ),
-        ),
-        xaxis_title="",
-        hovermode="x unified",
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-    )
+            xaxis=dict(
+                range=[game_start_time - timedelta(days=7), game_start_time],
+                rangeselector=dict(
+                    buttons=[
+                        dict(count=7, label="1W", step="day", stepmode="backward"),
+                        dict(count=14, label="2W", step="day", stepmode="backward"),
+                        dict(step="all", label="All"),
+                    ],
+                ),
+            ),
+            xaxis_title="",
+            hovermode="x unified",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        )
 
-    st.plotly_chart(fig_prob, use_container_width=True)
+        st.plotly_chart(fig_prob, use_container_width=True)
     st.caption(f"Market confidence for {selected_outcome} over time, calculated based on odds pricing.")
 
 ""
@@ -634,3 +521,89 @@ else:
         "closing_price": "Closing Price",
     })
 st.dataframe(summary_display, use_container_width=True, hide_index=True)
+
+best_prices, arbitrage_windows = get_price_scan(selected_event_id, db_version())
+market_best_prices = best_prices[best_prices["market_type"] == market_type] if best_prices is not None else None
+
+if market_best_prices is not None and not market_best_prices.empty:
+    """
+    ## Best Available Price
+    """
+
+    home_team = games[selected_event_id][1]
+
+    def line_label(line_key):
+        if market_type == "spreads":
+            return f"{home_team} {line_key:+g}"
+        if market_type == "totals":
+            return f"Total {line_key:g}"
+        return "Head to Head"
+
+    with telemetry.timer("dashboard.figure.best_price", memory=True):
+        best_totals = best_price_totals(market_best_prices)
+        fig_best = go.Figure()
+
+        for line_series in best_totals["series"]:
+            fig_best.add_trace(go.Scatter(
+                x=line_series["captured_at"],
+                y=line_series["total_pct"],
+                customdata=line_series["quotes"],
+                name=line_label(line_series["line_key"]),
+                mode="lines",
+                line=dict(width=2, shape="hv"),
+                hovertemplate="%{y:.1f}%<br>%{customdata}<extra>" + line_label(line_series["line_key"]) + "</extra>",
+            ))
+
+        # Captures where the best prices on both sides add up to less than 100%
+        arbitrage = best_totals["arbitrage"]
+        if len(arbitrage["captured_at"]):
+            fig_best.add_trace(go.Scatter(
+                x=arbitrage["captured_at"],
+                y=arbitrage["total_pct"],
+                name="Arbitrage",
+                mode="markers",
+                marker=dict(size=7, color="#FF4444"),
+                hoverinfo="skip",
+            ))
+
+        fig_best.add_hline(y=100, line_dash="dash", line_color="white", line_width=1, opacity=0.5)
+        fig_best.update_layout(
+            height=400,
+            margin=dict(l=20, r=20, t=30, b=20),
+            yaxis_title="Best Prices Implied Total %",
+            yaxis=dict(range=best_totals["y_range"], ticksuffix="%"),
+            xaxis=dict(
+                range=[game_start_time - timedelta(days=7), game_start_time],
+                rangeselector=dict(
+                    buttons=[
+                        dict(count=7, label="1W", step="day", stepmode="backward"),
+                        dict(count=14, label="2W", step="day", stepmode="backward"),
+                        dict(step="all", label="All"),
+                    ],
+                ),
+            ),
+            xaxis_title="",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        )
+
+        st.plotly_chart(fig_best, use_container_width=True)
+    st.caption("Best price on each side across every tracked operator, not just the selected ones. Below 100% the two best prices are an arbitrage.")
+
+    if arbitrage_windows is not None:
+        market_windows = arbitrage_windows[arbitrage_windows["market_type"] == market_type]
+        if not market_windows.empty:
+            st.dataframe(
+                {
+                    "Opened": market_windows["opened_at"],
+                    "Last Seen": market_windows["last_seen_at"],
+                    "Line": market_windows["line_key"].map(line_label),
+                    "Captures": market_windows["captures"],
+                    "Max Margin": (market_windows["max_arbitrage_margin"] * 100).map("{:.2f}%".format),
+                    "Peak Prices": market_windows["peak_prices"].map(
+                        lambda sides: " / ".join(
+                            f"{side['outcome']} {side['price']:+.0f} ({', '.join(side['books'])})" for side in sides
+                        )
+                    ),
+                },
+                hide_index=True,
+            )
@@ -0,0 +1,235 @@
+import os
+import queue
+from collections import defaultdict
+from contextlib import contextmanager
+import duckdb
+import streamlit as st
+import partition_cache
+import telemetry
+
+# Data access for dashboard.py. Every Streamlit session shares one read-only DuckDB
+# connection per process and borrows cursors from a small pool, instead of opening
+# and closing the database file on each query. When the file is replaced, e.g. by
+# extract/live_extract.py publishing a refresh, the pool and cached data are rebuilt.
+#
+# With DASHBOARD_PARTITIONS_DIR set, marts are read from the season/week partitioned
+# Parquet written by load/export_marts.py instead, and opening a game reads only the
+# partition for its week. With DASHBOARD_PARTITIONS_URL set, the export is fetched from
+# that URL into DASHBOARD_PARTITIONS_DIR as it's needed: the manifest and game list at
+# startup, and each week's files when a game in it is first opened.
+
+DB_PATH = os.getenv("DASHBOARD_DB_PATH", "data/nfl_odds.duckdb")
+PARTITIONS_URL = os.getenv("DASHBOARD_PARTITIONS_URL")
+PARTITIONS_DIR = os.getenv("DASHBOARD_PARTITIONS_DIR", "data/marts" if PARTITIONS_URL else None)
+
+# How often a hosted export is checked for a new manifest
+MANIFEST_TTL_SECONDS = 300
+
+CURSOR_POOL_SIZE = 4
+
+# Games whose full data bundle is kept in memory, least recently used are evicted first
+EVENT_CACHE_SIZE = 32
+
+# Prepared chart arrays per selection (game, operators, market and outcome)
+CHART_CACHE_SIZE = 64
+
+
+@st.cache_data(ttl=MANIFEST_TTL_SECONDS, show_spinner=False)
+def get_manifest():
+    return partition_cache.fetch_manifest(PARTITIONS_URL, PARTITIONS_DIR)
+
+
+def db_version():
+    if PARTITIONS_URL:
+        return get_manifest()["created_at"]
+    # export_marts.py swaps in dim_games after every other table of a season
+    try:
+        return os.stat(os.path.join(PARTITIONS_DIR, "dim_games") if PARTITIONS_DIR else DB_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def mart_source(table, season=None, week=None):
+    if not PARTITIONS_DIR:
+        return table
+    if PARTITIONS_URL:
+        prefix = "/".join([table, *([f"season={season}"] if season is not None else []), *([f"week={week}"] if week is not None else [])])
+        paths = partition_cache.fetch_files(PARTITIONS_URL, PARTITIONS_DIR, get_manifest(), f"{prefix}/")
+        return f"read_parquet([{', '.join(repr(p) for p in paths)}], hive_partitioning = true)"
+    path = os.path.join(PARTITIONS_DIR, table)
+    if season is not None:
+        path = os.path.join(path, f"season={season}")
+    if week is not None:
+        path = os.path.join(path, f"week={week}")
+    return f"read_parquet('{os.path.join(path, '**', '*.parquet')}', hive_partitioning = true)"
+
+
+@st.cache_resource(max_entries=1)
+def get_cursor_pool(db_path=DB_PATH, size=CURSOR_POOL_SIZE, version=None):
+    # Attached to a new in-memory instance rather than opened directly. DuckDB shares one
+    # instance per file path within a process, which would keep serving a replaced file.
+    conn = duckdb.connect()
+    if not PARTITIONS_DIR:
+        conn.execute(f"ATTACH '{db_path}' AS odds (READ_ONLY)")
+    pool = queue.Queue()
+    for _ in range(size):
+        cursor = conn.cursor()
+        if not PARTITIONS_DIR:
+            cursor.execute("USE odds")
+        pool.put(cursor)
+    return conn, pool
+
+
+@contextmanager
+def pooled_cursor():
+    _, pool = get_cursor_pool(version=db_version())
+    cursor = pool.get()
+    try:
+        yield cursor
+    finally:
+        pool.put(cursor)
+
+
+def latency_summary():
+    # Query and figure timings recorded by telemetry in this process
+    return telemetry.summary("dashboard.")
+
+
+def run_query(name, sql, params=None, fetch="df"):
+    # Parameterized statements are prepared by DuckDB on every execute. The Python API
+    # has no reusable handle, and SQL PREPARE/EXECUTE can't take bound parameters.
+    with telemetry.timer(f"dashboard.query.{name}", memory=True), pooled_cursor() as cursor:
+        result = cursor.execute(sql, params or [])
+        return result.fetchdf() if fetch == "df" else result.fetchall()
+
+
+WEEK_LABELS = {
+    **{i: f"Week {i}" for i in range(1, 19)},
+    19: "Wild Card",
+    20: "Divisional",
+    21: "Conference Championships",
+    22: "Super Bowl",
+}
+
+
+def get_games():
+    try:
+        return run_query("get_games", f"""
+            select event_id, home_team, away_team, game_start_time, nfl_week, week_label, season
+            from {mart_source("dim_games")}
+        """, fetch="rows")
+    except (duckdb.CatalogException, duckdb.BinderException):
+        # Databases built before dim_games (or its season column) existed: aggregate the game summary instead
+        rows = run_query("get_games_fallback", """
+            select event_id, home_team, away_team,
+                   max(game_start_time) as game_start_time,
+                   max(nfl_week) as nfl_week
+            from fct_game_summary
+            group by event_id, home_team, away_team
+        """, fetch="rows")
+        return [(*row, WEEK_LABELS.get(row[4], f"Week {row[4]}"), season_of(row[3])) for row in rows]
+
+
+def season_of(game_start_time):
+    # Same rule as the nfl_season dbt macro
+    return game_start_time.year if game_start_time.month >= 3 else game_start_time.year - 1
+
+
+@st.cache_data
+def get_game_index(version=None):
+    # Loaded once per process. The sidebar looks games up by id, or by week or team
+    # within a season, instead of filtering the full game list on every rerun.
+    games = {}
+    by_week = defaultdict(lambda: defaultdict(list))
+    by_team = defaultdict(lambda: defaultdict(list))
+
+    for event_id, home, away, start_time, week_num, week_label, season in sorted(get_games(), key=lambda g: g[3]):
+        games[event_id] = (event_id, home, away, start_time, week_num, week_label, season)
+        by_week[season][week_num].append(event_id)
+        by_team[season][home].append(event_id)
+        by_team[season][away].append(event_id)
+
+    return {
+        "games": games,
+        "seasons": {
+            season: {
+                "weeks": {week_num: games[event_ids[0]][5] for week_num, event_ids in sorted(weeks.items())},
+                "by_week": dict(weeks),
+                "by_team": {team: event_ids[::-1] for team, event_ids in sorted(by_team[season].items())},
+            }
+            for season, weeks in sorted(by_week.items())
+        },
+    }
+
+
+@st.cache_data(max_entries=EVENT_CACHE_SIZE)
+def get_event_bundle(event_id, version=None):
+    # Every book, market and outcome for one game, fetched once. Operator, market and
+    # outcome changes are then filtered in memory without going back to DuckDB.
+    *_, week_num, _, season = get_game_index(version)["games"][event_id]
+    movements = run_query("event_line_movements", f"""
+        select captured_at, sportsbook, market_type, line, price, outcome, implied_prob
+        from {mart_source("fct_odds_snapshots", season, week_num)}
+        where event_id = ?
+        order by captured_at
+    """, [event_id])
+    summary = run_query("event_game_summary", f"""
+        select sportsbook, market_type, outcome, opening_line, closing_line, total_line_movement,
+               opening_price, closing_price, opening_implied_prob_pct,
+               closing_implied_prob_pct, implied_prob_pct_change, capture_count
+        from {mart_source("fct_game_summary", season, week_num)}
+        where event_id = ?
+        order by sportsbook, outcome
+    """, [event_id])
+    return movements, summary
+
+
+def get_line_movements(event_id, sportsbooks, market_type):
+    movements, _ = get_event_bundle(event_id, db_version())
+    selected = (movements["market_type"] == market_type) & movements["sportsbook"].isin(sportsbooks)
+    return movements.loc[selected].drop(columns="market_type").reset_index(drop=True)
+
+
+def get_game_summary(event_id, sportsbooks, market_type):
+    _, summary = get_event_bundle(event_id, db_version())
+    selected = (summary["market_type"] == market_type) & summary["sportsbook"].isin(sportsbooks)
+    return summary.loc[selected].drop(columns="market_type").reset_index(drop=True)
+
+
+@st.cache_data(max_entries=EVENT_CACHE_SIZE)
+def get_price_scan(event_id, version=None):
+    # Best prices for every market and line of one game, and its arbitrage windows.
+    # Weeks without windows have no fct_arbitrage_windows files, and databases built
+    # before these marts existed have neither.
+    *_, week_num, _, season = get_game_index(version)["games"][event_id]
+    try:
+        best_prices = run_query("event_best_prices", f"""
+            select captured_at, market_type, line_key, outcome, best_price, best_books,
+                   best_total_implied_prob, is_arbitrage
+            from {mart_source("fct_best_prices", season, week_num)}
+            where event_id = ?
+            order by market_type, line_key, captured_at, outcome
+        """, [event_id])
+    except (duckdb.CatalogException, duckdb.BinderException, duckdb.IOException):
+        return None, None
+    try:
+        windows = run_query("event_arbitrage_windows", f"""
+            select opened_at, last_seen_at, market_type, line_key, captures, max_arbitrage_margin,
+                   peak_captured_at, peak_prices
+            from {mart_source("fct_arbitrage_windows", season, week_num)}
+            where event_id = ?
+            order by opened_at
+        """, [event_id])
+    except (duckdb.CatalogException, duckdb.BinderException, duckdb.IOException):
+        windows = None
+    return best_prices, windows
+
+
+@st.cache_data(max_entries=CHART_CACHE_SIZE, show_spinner=False)
+def get_chart_data(event_id, sportsbooks, market_type, outcome, version=None):
+    # Imported here so pandas and numpy stay off the first paint
+    import chart_data
+    movements = get_line_movements(event_id, sportsbooks, market_type)
+    summary = get_game_summary(event_id, sportsbooks, market_type)
+    with telemetry.timer("dashboard.chart_data", memory=True):
+        return chart_data.prepare(movements, summary, list(sportsbooks), market_type, outcome)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Reduces line movement series before they reach Plotly. Captures where nothing moved
+# are dropped first, then long series are thinned to a point budget with
+# Largest-Triangle-Three-Buckets (LTTB), always keeping the forced columns' moves.
+
+MAX_POINTS = 1000
+
+
+def unchanged(values, other):
+    return (values.eq(other) | (values.isna() & other.isna())).all(axis=1)
+
+
+def change_mask(df, columns, group_col, include_run_ends=False):
+    # Expects df sorted by group then time. Keeps the first and last row of every group
+    # and each row whose values differ from the row before it. Line charts drawn with
+    # straight segments also need the last row before each change to stay flat.
+    values = df[columns]
+    groups = df[group_col]
+    keep = ~unchanged(values, values.shift()) | groups.ne(groups.shift()) | groups.ne(groups.shift(-1))
+    if include_run_ends:
+        keep |= ~unchanged(values, values.shift(-1))
+    return keep.to_numpy()
+
+
+def lttb(x, y, max_points):
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    x = x - x[0]
+    every = (n - 2) / (max_points - 2)
+    edges = np.append((np.arange(max_points - 2) * every).astype(int) + 1, n - 1)
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    # Every bucket's mean up front, then each pick only depends on the one before it
+    sizes = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / sizes, y[-1])
+
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_x, next_y = mean_x[i + 1], mean_y[i + 1]
+
+        # Point in this bucket forming the largest triangle with the last pick and the next bucket's mean
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample(df, x_col, y_col, group_col, max_points=MAX_POINTS,
+               change_columns=None, force_columns=None, include_run_ends=False):
+    df = df.sort_values([group_col, x_col], kind="stable")
+    df = df[change_mask(df, change_columns or [y_col], group_col, include_run_ends)]
+    if df.empty:
+        return df
+
+    keep = np.zeros(len(df), dtype=bool)
+    if force_columns:
+        keep |= change_mask(df, force_columns, group_col)
+
+    x = df[x_col].to_numpy().astype("datetime64[ns]").astype("int64").astype(float)
+    y = np.nan_to_num(df[y_col].to_numpy(dtype=float))
+    groups = df[group_col].to_numpy()
+    bounds = np.concatenate([[0], np.flatnonzero(groups[1:] != groups[:-1]) + 1, [len(df)]])
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        keep[start + lttb(x[start:end], y[start:end], max_points)] = True
+
+    return df[keep]
+
+
+def bin_columns(pivot, max_columns):
+    # Groups time columns into equal width bins and keeps each row's last value in the
+    # bin, labelled with the last capture time, rather than skipping columns.
+    if len(pivot.columns) <= max_columns:
+        return pivot
+
+    times = pd.Series(pivot.columns)
+    ns = times.to_numpy().astype("datetime64[ns]").astype("int64")
+    edges = np.linspace(ns[0], ns[-1], max_columns + 1)
+    bins = np.clip(np.searchsorted(edges, ns, side="right") - 1, 0, max_columns - 1)
+
+    binned = pivot.T.groupby(bins).last().T
+    binned.columns = times.groupby(bins).last().to_numpy()
+    return binned
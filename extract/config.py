@@ -4,7 +4,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 odds_api_key = os.getenv("ODDS_API_KEY")
-odds_api_base_url = "https://api.the-odds-api.com/v4"
+odds_api_base_url = os.getenv("ODDS_API_BASE_URL", "https://api.the-odds-api.com/v4")
 
 sport_key = "americanfootball_nfl"
 
@@ -14,4 +14,32 @@ regions = ["us", "us2", "eu"]
 
 odds_format = "american"
 
+# Raw snapshot encoding: "json.gz" (compact, gzipped) or "json" (pretty printed)
+raw_storage_format = "json.gz"
+
+# Seasons the historical extract captures, each must have a row in the dbt season calendar seed
+extract_seasons = [2025]
+season_calendar_path = os.path.join(os.path.dirname(__file__), "..", "transform", "seeds", "season_calendar.csv")
+
+# Extract concurrency and rate limiting
+extract_concurrency = 4
+extract_requests_per_second = 2
+extract_max_retries = 5
+
+# Live polling cadence: (hours until the next kickoff, seconds between polls), first match wins
+live_poll_schedule = [(1, 60), (6, 300), (24, 900), (72, 1800)]
+live_idle_poll_seconds = 3600
+
+# dbt commands the live poller runs: the seeds once at startup, since a fresh database has
+# no season_calendar yet, then an incremental run after each poll. Also the copy of the
+# database the dashboard reads.
+live_dbt_seed_args = ["seed"]
+live_dbt_args = ["run"]
+# Incremental runs append each poll's captures as their own sorted batch, which loosens the
+# marts' event_id ordering over a season. The poller adds --full-refresh this often to restore it.
+live_full_refresh_hours = 24
+live_dashboard_db_path = os.path.join(os.path.dirname(__file__), "..", "data", "nfl_odds_dashboard.duckdb")
+live_metrics_path = os.path.join(os.path.dirname(__file__), "..", "data", "live_metrics.jsonl")
+live_alerts_path = os.path.join(os.path.dirname(__file__), "..", "data", "steam_alerts.jsonl")
+
 duckdb_path = os.path.join(os.path.dirname(__file__), "..", "data", "nfl_odds.duckdb")
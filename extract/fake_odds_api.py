@@ -0,0 +1,110 @@
+import argparse
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for The Odds API, for running the extracts without spending credits.
+# Serves the sample snapshot's games with kickoffs moved into the near future and
+# nudges a few prices and lines on every request. Responses carry an ETag and an
+# unchanged body is answered 304 Not Modified. Point the extracts at it with
+# ODDS_API_BASE_URL=http://127.0.0.1:8000
+
+sample_path = os.path.join(os.path.dirname(__file__), "..", "data", "samples", "sample_nfl_week1_data.json")
+
+state_lock = threading.Lock()
+
+def iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def load_events(kickoff_in_hours):
+    with open(sample_path) as f:
+        events = json.load(f)["data"]
+
+    first_kickoff = min(datetime.strptime(e["commence_time"], "%Y-%m-%dT%H:%M:%SZ") for e in events)
+    shift = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) + timedelta(hours=kickoff_in_hours) - first_kickoff
+    for e in events:
+        kickoff = datetime.strptime(e["commence_time"], "%Y-%m-%dT%H:%M:%SZ") + shift
+        e["commence_time"] = iso(kickoff)
+    return events
+
+def move_odds(events, move_rate):
+    now = iso(datetime.now(timezone.utc))
+    for e in events:
+        for b in e["bookmakers"]:
+            for m in b["markets"]:
+                if random.random() >= move_rate:
+                    continue
+                b["last_update"] = m["last_update"] = now
+                step = random.choice([-5, 5])
+                for o in m["outcomes"]:
+                    o["price"] += step if o is m["outcomes"][0] else -step
+                # Spreads move both sides' points together so they stay inverse
+                if m["key"] == "spreads" and random.random() < 0.3:
+                    point_step = random.choice([-0.5, 0.5])
+                    m["outcomes"][0]["point"] += point_step
+                    m["outcomes"][1]["point"] -= point_step
+
+class FakeOddsHandler(BaseHTTPRequestHandler):
+    events = []
+    credits = 0
+    move_rate = 0.1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path.rstrip("/").split("/")
+        if path[-1] != "odds" or "sports" not in path:
+            self.send_error(404)
+            return
+
+        with state_lock:
+            cls = type(self)
+            move_odds(cls.events, cls.move_rate)
+            events = copy.deepcopy(cls.events)
+            cls.credits -= 1
+            remaining = cls.credits
+
+        if "historical" in path:
+            body = {"timestamp": query.get("date", [iso(datetime.now(timezone.utc))])[0], "data": events}
+        else:
+            body = events
+
+        payload = json.dumps(body).encode()
+        etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+        not_modified = self.headers.get("If-None-Match") == etag
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        self.send_header("x-requests-remaining", str(remaining))
+        self.send_header("x-requests-used", "1")
+        self.send_header("x-requests-last", "1")
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fake Odds API responses from the sample snapshot")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--kickoff-in-hours", type=float, default=2, help="Hours until the first game kicks off")
+    parser.add_argument("--move-rate", type=float, default=0.1, help="Share of markets whose odds move per request")
+    parser.add_argument("--credits", type=int, default=100_000, help="Credits reported as remaining")
+    args = parser.parse_args()
+
+    FakeOddsHandler.events = load_events(args.kickoff_in_hours)
+    FakeOddsHandler.move_rate = args.move_rate
+    FakeOddsHandler.credits = args.credits
+    print(f"Fake Odds API on http://127.0.0.1:{args.port}")
+    ThreadingHTTPServer(("127.0.0.1", args.port), FakeOddsHandler).serve_forever()
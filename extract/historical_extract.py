@@ -1,21 +1,181 @@
+import argparse
+import csv
+import glob
+import gzip
+import hashlib
 import json
 import os
+import random
+import sys
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from datetime import datetime, timedelta
 import requests
-from config import odds_api_key, odds_api_base_url, sport_key, markets, regions, odds_format
+from requests.adapters import HTTPAdapter
+from config import (
+    odds_api_key, odds_api_base_url, sport_key, markets, regions, odds_format,
+    extract_concurrency, extract_requests_per_second, extract_max_retries, raw_storage_format,
+    extract_seasons, season_calendar_path,
+)
 
-raw_data_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import telemetry
 
-#2025-2026 NFL Season
-season_start = datetime(2025, 9, 4)
-season_end = datetime(2026, 2, 9)
+raw_data_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
+raw_parquet_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw_parquet")
 
 # 4X snapshots per day at 8am, 12pm, 4pm, 8pm CT = 14:00, 18:00, 22:00, 02:00 UTC
 capture_hours_utc = [2, 14, 18, 22]
 
+# Rate limited and server side errors are retried, anything else fails straight away
+retry_statuses = {429, 500, 502, 503, 504}
+max_backoff_seconds = 60
+
+# Quota reported by the API on every response, shared across fetch threads
+api_usage = {"remaining": None, "used": None, "last": None}
+api_usage_lock = threading.Lock()
+
+# Bodies of responses that came with an ETag, replayed when the API answers 304 Not Modified.
+# Only requests repeated with the same parameters (the live endpoint) use it, and only the
+# most recently used entries are kept.
+conditional_cache = OrderedDict()
+conditional_cache_size = 8
+conditional_cache_lock = threading.Lock()
+
+class QuotaExhausted(Exception):
+    pass
+
+class SnapshotDeltas:
+    # Remembers the last bookmaker block written in full for each event. Unchanged blocks
+    # in later snapshots are saved as {"key": ..., "ref": <timestamp>}, pointing at the
+    # snapshot file that holds the block, and load_to_duckdb.py resolves them on load.
+    def __init__(self):
+        self.written = {}
+
+    def encode(self, data, timestamp_str):
+        events = []
+        refs = 0
+        for e in data["data"]:
+            bookmakers = []
+            for b in e["bookmakers"]:
+                key = (e["id"], b["key"])
+                digest = hashlib.sha1(json.dumps(b, sort_keys=True).encode()).hexdigest()
+                known = self.written.get(key)
+                if known and known[0] == digest:
+                    bookmakers.append({"key": b["key"], "ref": known[1]})
+                    refs += 1
+                else:
+                    self.written[key] = (digest, timestamp_str)
+                    bookmakers.append(b)
+            events.append({**e, "bookmakers": bookmakers})
+        return {**data, "data": events}, refs > 0
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def make_session(pool_size=extract_concurrency):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def record_usage(response):
+    with api_usage_lock:
+        for key, header in [
+            ("remaining", "x-requests-remaining"),
+            ("used", "x-requests-used"),
+            ("last", "x-requests-last"),
+        ]:
+            value = response.headers.get(header)
+            if value is not None:
+                api_usage[key] = float(value)
+
+def check_quota():
+    with api_usage_lock:
+        remaining, last = api_usage["remaining"], api_usage["last"]
+
+    # Stop before a request the remaining credits can't cover
+    if remaining is not None and remaining < (last or 1):
+        raise QuotaExhausted(f"Only {remaining:.0f} API credits remaining")
+
+def backoff_delay(attempt, response=None):
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+
+    # Full jitter so concurrent threads don't retry in lockstep
+    return random.uniform(0, min(max_backoff_seconds, 2 ** attempt))
+
+def get_with_retries(url, params, session=None, limiter=None, max_retries=0, conditional=False):
+    http = session or requests
+    cache_key = (url, tuple(sorted(params.items())))
+    cached = None
+    if conditional:
+        with conditional_cache_lock:
+            cached = conditional_cache.get(cache_key)
+            if cached:
+                conditional_cache.move_to_end(cache_key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+
+    for attempt in range(max_retries + 1):
+        check_quota()
+        if limiter is not None:
+            limiter.acquire()
+
+        telemetry.count("extract.requests")
+        try:
+            with telemetry.timer("extract.fetch", memory=True):
+                response = http.get(url, params=params, headers=headers, timeout=30)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_retries:
+                raise
+            telemetry.count("extract.retries")
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        record_usage(response)
+        if response.status_code in retry_statuses and attempt < max_retries:
+            telemetry.count("extract.retries")
+            time.sleep(backoff_delay(attempt, response))
+            continue
+
+        if response.status_code == 304 and cached:
+            telemetry.count("extract.not_modified")
+            return cached[1]
+
+        response.raise_for_status()
+        body = response.json()
+        etag = response.headers.get("ETag")
+        if conditional and etag:
+            with conditional_cache_lock:
+                conditional_cache[cache_key] = (etag, body)
+                conditional_cache.move_to_end(cache_key)
+                while len(conditional_cache) > conditional_cache_size:
+                    conditional_cache.popitem(last=False)
+        return body
+
 # Historical odds endpoint documentation can be found here: https://the-odds-api.com/liveapi/guides/v4/#get-historical-odds
-def get_historical_odds(date_iso):
+def get_historical_odds(date_iso, session=None, limiter=None, max_retries=0):
     url = f"{odds_api_base_url}/historical/sports/{sport_key}/odds"
     params = {
         "apiKey": odds_api_key,
@@ -26,10 +186,18 @@ def get_historical_odds(date_iso):
         "date": date_iso,
     }
 
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
+    return get_with_retries(url, params, session, limiter, max_retries)
 
-    return response.json()
+def season_range(season, calendar_path=season_calendar_path):
+    # From the opening game to the day after the Super Bowl, whose evening kickoff is
+    # captured at 02:00 UTC the next day
+    with open(calendar_path) as f:
+        for row in csv.DictReader(f):
+            if int(row["season"]) == season:
+                start = datetime.fromisoformat(row["first_game_date"])
+                end = datetime.fromisoformat(row["last_game_date"]) + timedelta(days=1)
+                return start, end
+    raise ValueError(f"Season {season} is not in {calendar_path}, add it to the calendar first")
 
 def generate_capture_timestamps(start, end):
     timestamps = []
@@ -44,50 +212,117 @@ def generate_capture_timestamps(start, end):
 
     return timestamps
 
-def save_odds(data, timestamp_str):
-    os.makedirs(raw_data_dir, exist_ok=True)
+def snapshot_name(timestamp_str):
     clean_ts = timestamp_str.replace(":", "-").replace("T", "_").replace("Z", "")
-    filename = f"nfl_odds_{clean_ts}.json"
-    filepath = os.path.join(raw_data_dir, filename)
+    return f"nfl_odds_{clean_ts}"
+
+def existing_snapshots(raw_dir=raw_data_dir, parquet_dir=raw_parquet_dir):
+    # Snapshots may be stored as json, json.gz or converted to partitioned Parquet by load/convert_raw.py
+    files = glob.glob(os.path.join(raw_dir, "nfl_odds_*"))
+    files += glob.glob(os.path.join(parquet_dir, "**", "nfl_odds_*.parquet"), recursive=True)
+    return {os.path.basename(f).split(".")[0] for f in files}
 
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2)
+def save_odds(data, timestamp_str, storage_format=raw_storage_format, deltas=None, raw_dir=raw_data_dir):
+    os.makedirs(raw_dir, exist_ok=True)
+    name = snapshot_name(timestamp_str)
+    if deltas is not None:
+        data, is_delta = deltas.encode(data, timestamp_str)
+        if is_delta:
+            name = f"{name}.delta"
+    filepath = os.path.join(raw_dir, f"{name}.{storage_format}")
+    # Written under a hidden name first so an interrupted write is never taken for a snapshot
+    tmp_path = os.path.join(raw_dir, f".{snapshot_name(timestamp_str)}.tmp")
 
+    with telemetry.timer("extract.write"):
+        if storage_format == "json.gz":
+            with gzip.open(tmp_path, "wt") as f:
+                json.dump(data, f, separators=(",", ":"))
+        else:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=2)
+
+    os.replace(tmp_path, filepath)
     return filepath
 
-def odds_extract():
-    all_timestamps = generate_capture_timestamps(season_start, season_end)
+def odds_extract(
+    concurrency=extract_concurrency,
+    requests_per_second=extract_requests_per_second,
+    max_retries=extract_max_retries,
+    seasons=extract_seasons,
+    raw_dir=raw_data_dir,
+):
+    all_timestamps = []
+    for season in seasons:
+        all_timestamps += generate_capture_timestamps(*season_range(season))
     print(f"Total timestamps to extract: {len(all_timestamps)}")
 
-    skipped = 0
+    existing = existing_snapshots(raw_dir)
+    pending = [ts for ts in all_timestamps if snapshot_name(ts) not in existing]
+    skipped = len(all_timestamps) - len(pending)
     extracted = 0
     failed = 0
+    quota_exhausted = False
 
-    for i, timestamp in enumerate(all_timestamps):
-        clean_ts = timestamp.replace(":", "-").replace("T", "_").replace("Z", "")
-        filepath = os.path.join(raw_data_dir, f"nfl_odds_{clean_ts}.json")
-
-        if os.path.exists(filepath):
-            skipped += 1
-            continue
+    session = make_session(concurrency)
+    limiter = TokenBucket(requests_per_second)
+    deltas = SnapshotDeltas()
 
-        print(f"[{i+1}/{len(all_timestamps)}] Fetching {timestamp}")
+    def fetch(timestamp):
+        return get_historical_odds(timestamp, session, limiter, max_retries)
 
-        try:
-            data = get_historical_odds(timestamp)
-        except requests.RequestException as e:
-            print(f"Failed: {e}. Skipping.")
-            failed += 1
-            continue
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Fetched concurrently but saved in capture order, since each delta snapshot
+        # references blocks from the snapshots saved before it. Only two requests per
+        # worker are queued at a time, so few bodies wait behind a slow earlier capture.
+        upcoming = iter(enumerate(pending))
+        queued = deque()
+        while True:
+            while not quota_exhausted and len(queued) < concurrency * 2:
+                i, timestamp = next(upcoming, (None, None))
+                if timestamp is None:
+                    break
+                queued.append((i, timestamp, pool.submit(fetch, timestamp)))
+            if not queued:
+                break
 
-        num_events = len(data.get("data", []))
-        print(f"  Got {num_events} events")
+            i, timestamp, future = queued.popleft()
+            try:
+                data = future.result()
+            except CancelledError:
+                continue
+            except QuotaExhausted as e:
+                if not quota_exhausted:
+                    print(f"Stopping: {e}")
+                    for *_, f in queued:
+                        f.cancel()
+                quota_exhausted = True
+                continue
+            except requests.RequestException as e:
+                print(f"Failed {timestamp} after {max_retries} retries: {e}")
+                failed += 1
+                continue
 
-        save_odds(data, timestamp)
-        extracted += 1
-        time.sleep(1)
+            filepath = save_odds(data, timestamp, deltas=deltas, raw_dir=raw_dir)
+            extracted += 1
+            print(
+                f"[{i+1}/{len(pending)}] {timestamp}: {len(data.get('data', []))} events"
+                f"{' (delta)' if '.delta.' in filepath else ''} "
+                f"({api_usage['remaining'] or 0:.0f} credits remaining)"
+            )
 
-    print(f"Extracted: {extracted}, Skipped: {skipped}, Failed: {failed}")
+    session.close()
+    print(
+        f"Extracted: {extracted}, Skipped: {skipped}, Failed: {failed}, "
+        f"Not attempted: {len(pending) - extracted - failed}"
+    )
 
 if __name__ == "__main__":
-    odds_extract()
+    parser = argparse.ArgumentParser(description="Extract historical NFL odds snapshots")
+    parser.add_argument("--concurrency", type=int, default=extract_concurrency, help="Concurrent requests")
+    parser.add_argument("--rate", type=float, default=extract_requests_per_second, help="Max requests per second")
+    parser.add_argument("--max-retries", type=int, default=extract_max_retries, help="Retries per timestamp")
+    parser.add_argument("--season", type=int, action="append", help=f"Season to extract, e.g. 2024 (repeatable, default {extract_seasons})")
+    args = parser.parse_args()
+
+    telemetry.start()
+    odds_extract(args.concurrency, args.rate, args.max_retries, args.season or extract_seasons)
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+import duckdb
+import requests
+from dbt.cli.main import dbtRunner
+from config import (
+    odds_api_key, odds_api_base_url, sport_key, markets, regions, odds_format, extract_max_retries,
+    extract_requests_per_second, live_poll_schedule, live_idle_poll_seconds, live_dbt_seed_args, live_dbt_args,
+    live_full_refresh_hours, live_dashboard_db_path, live_metrics_path, live_alerts_path, duckdb_path,
+)
+from historical_extract import (
+    QuotaExhausted, SnapshotDeltas, TokenBucket, api_usage, get_with_retries, make_session, raw_data_dir, save_odds,
+)
+from steam_alerts import describe, latest_steam_at, new_steam_moves, record_alerts
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "load"))
+import telemetry
+from load_to_duckdb import create_tables, load_snapshot
+
+transform_dir = os.path.join(os.path.dirname(__file__), "..", "transform")
+
+# Odds endpoint documentation can be found here: https://the-odds-api.com/liveapi/guides/v4/#get-odds
+def get_live_odds(session=None, limiter=None, max_retries=0):
+    url = f"{odds_api_base_url}/sports/{sport_key}/odds"
+    params = {
+        "apiKey": odds_api_key,
+        "regions": ",".join(regions),
+        "markets": ",".join(markets),
+        "oddsFormat": odds_format,
+        "dateFormat": "iso",
+    }
+
+    # Polls repeat the same request, so an unchanged board comes back as a 304
+    return get_with_retries(url, params, session, limiter, max_retries, conditional=True)
+
+def parse_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+def next_poll_seconds(events, now):
+    kickoffs = [parse_time(e["commence_time"]) for e in events]
+    upcoming = [k for k in kickoffs if k > now]
+    if not upcoming:
+        return live_idle_poll_seconds
+
+    hours_to_kickoff = (min(upcoming) - now).total_seconds() / 3600
+    for within_hours, seconds in live_poll_schedule:
+        if hours_to_kickoff <= within_hours:
+            return seconds
+    return live_idle_poll_seconds
+
+def load_poll(snapshot, filepath, db_path):
+    conn = duckdb.connect(db_path)
+    try:
+        create_tables(conn)
+        return load_snapshot(conn, filepath, snapshot)
+    finally:
+        # dbt opens the database next, and DuckDB allows a single writing process
+        conn.close()
+
+def invoke_dbt(runner, args):
+    # transform/profiles.yml reads the database path from NFL_ODDS_DB_PATH, set by live_extract
+    result = runner.invoke(args + ["--project-dir", transform_dir, "--profiles-dir", transform_dir, "--quiet"])
+    if not result.success:
+        print(f"dbt {' '.join(args)} failed: {result.exception or 'see dbt logs'}")
+    return result.success
+
+def refresh_marts(runner, full_refresh=False):
+    if full_refresh:
+        with telemetry.timer("live.dbt_full_refresh"):
+            return invoke_dbt(runner, live_dbt_args + ["--full-refresh"])
+    with telemetry.timer("live.dbt_refresh"):
+        return invoke_dbt(runner, live_dbt_args)
+
+def publish(db_path, dashboard_db_path):
+    # The dashboard holds its database open read-only, which would lock out this process,
+    # so it reads a copy that is swapped in atomically after every refresh. The whole file
+    # is copied, so publishing takes longer as the season's database grows.
+    tmp_path = f"{dashboard_db_path}.tmp"
+    with telemetry.timer("live.publish"):
+        shutil.copyfile(db_path, tmp_path)
+        os.replace(tmp_path, dashboard_db_path)
+
+def record_metrics(metrics, metrics_path):
+    os.makedirs(os.path.dirname(os.path.abspath(metrics_path)), exist_ok=True)
+    with open(metrics_path, "a") as f:
+        f.write(json.dumps(metrics) + "\n")
+
+def poll_once(
+    session, limiter, runner, deltas, db_path, dashboard_db_path, refresh=True, steam_since=None, raw_dir=raw_data_dir,
+    full_refresh=False,
+):
+    started = time.perf_counter()
+    captured = datetime.now(timezone.utc).replace(microsecond=0)
+    timestamp = captured.strftime("%Y-%m-%dT%H:%M:%SZ")
+    metrics = {"captured_at": timestamp}
+
+    events = get_live_odds(session, limiter, extract_max_retries)
+    snapshot = {"timestamp": timestamp, "data": events}
+    # Saved as a delta of the previous poll, loaded from the full snapshot already in memory
+    filepath = save_odds(snapshot, timestamp, deltas=deltas, raw_dir=raw_dir)
+    metrics["poll_seconds"] = round(time.perf_counter() - started, 3)
+    metrics["events"] = len(events)
+
+    step = time.perf_counter()
+    metrics["rows"] = load_poll(snapshot, filepath, db_path)
+    metrics["load_seconds"] = round(time.perf_counter() - step, 3)
+
+    steam = []
+    if refresh:
+        step = time.perf_counter()
+        metrics["refresh_ok"] = refresh_marts(runner, full_refresh)
+        if full_refresh:
+            metrics["full_refresh"] = True
+        metrics["refresh_seconds"] = round(time.perf_counter() - step, 3)
+        if metrics["refresh_ok"]:
+            steam = new_steam_moves(db_path, steam_since)
+            metrics["steam_moves"] = len(steam)
+        if metrics["refresh_ok"] and dashboard_db_path:
+            step = time.perf_counter()
+            publish(db_path, dashboard_db_path)
+            metrics["publish_seconds"] = round(time.perf_counter() - step, 3)
+            # Capture to dashboard: from the capture timestamp until the new data is readable
+            metrics["lag_seconds"] = round((datetime.now(timezone.utc) - captured).total_seconds(), 3)
+
+    metrics["credits_remaining"] = api_usage["remaining"]
+    return events, metrics, steam
+
+def live_extract(
+    db_path=duckdb_path,
+    dashboard_db_path=live_dashboard_db_path,
+    metrics_path=live_metrics_path,
+    alerts_path=live_alerts_path,
+    max_polls=None,
+    refresh=True,
+    raw_dir=raw_data_dir,
+):
+    session = make_session(1)
+    limiter = TokenBucket(extract_requests_per_second)
+    runner = dbtRunner()
+    deltas = SnapshotDeltas()
+    polls = 0
+    next_full_refresh = time.monotonic() + live_full_refresh_hours * 3600
+
+    # Steam moves already in the marts were alerted on by an earlier run
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = duckdb.connect(db_path)
+    steam_since = latest_steam_at(conn)
+    conn.close()
+
+    os.environ["NFL_ODDS_DB_PATH"] = os.path.abspath(db_path)
+    if refresh and not invoke_dbt(runner, live_dbt_seed_args):
+        session.close()
+        return
+
+    while max_polls is None or polls < max_polls:
+        started = time.monotonic()
+        full_refresh = refresh and started >= next_full_refresh
+        try:
+            events, metrics, steam = poll_once(
+                session, limiter, runner, deltas, db_path, dashboard_db_path, refresh, steam_since, raw_dir,
+                full_refresh,
+            )
+            if full_refresh and metrics.get("refresh_ok"):
+                next_full_refresh = started + live_full_refresh_hours * 3600
+        except QuotaExhausted as e:
+            print(f"Stopping: {e}")
+            break
+        except requests.RequestException as e:
+            print(f"Poll failed after {extract_max_retries} retries: {e}")
+            record_metrics({"captured_at": None, "error": str(e)}, metrics_path)
+            events, metrics, steam = [], None, []
+
+        polls += 1
+        if metrics:
+            record_metrics(metrics, metrics_path)
+            lag = f", lag {metrics['lag_seconds']:.1f}s" if "lag_seconds" in metrics else ""
+            print(
+                f"{metrics['captured_at']}: {metrics['events']} events, {metrics['rows']:,} rows"
+                f"{lag} ({api_usage['remaining'] or 0:.0f} credits remaining)"
+            )
+        if steam:
+            record_alerts(steam, alerts_path)
+            for move in steam:
+                print(describe(move))
+            steam_since = steam[-1]["captured_at"]
+
+        # Failed polls retry on the shortest interval instead of waiting out the idle cadence
+        wait = next_poll_seconds(events, datetime.now(timezone.utc)) if metrics else live_poll_schedule[0][1]
+        if max_polls is None or polls < max_polls:
+            time.sleep(max(0, wait - (time.monotonic() - started)))
+
+    session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll live NFL odds into DuckDB and refresh the marts")
+    parser.add_argument("--raw-dir", default=raw_data_dir, help="Directory the polled snapshots are saved to")
+    parser.add_argument("--db-path", default=duckdb_path, help="DuckDB database loaded and transformed by dbt")
+    parser.add_argument("--dashboard-db-path", default=live_dashboard_db_path, help="Copy of the database published for the dashboard")
+    parser.add_argument("--metrics-path", default=live_metrics_path, help="JSON lines file of per-poll metrics")
+    parser.add_argument("--alerts-path", default=live_alerts_path, help="JSON lines file of steam move alerts")
+    parser.add_argument("--max-polls", type=int, help="Stop after this many polls (runs until interrupted by default)")
+    parser.add_argument("--no-refresh", action="store_true", help="Only load raw_odds, skip dbt and publishing")
+    args = parser.parse_args()
+
+    telemetry.start()
+    live_extract(
+        args.db_path, args.dashboard_db_path, args.metrics_path, args.alerts_path, args.max_polls, not args.no_refresh,
+        args.raw_dir,
+    )
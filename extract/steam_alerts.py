@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import duckdb
+from config import duckdb_path, live_alerts_path
+
+# Reads steam moves flagged by the fct_steam_moves mart. The live poller calls
+# new_steam_moves after every dbt refresh and alerts on rows it hasn't seen yet.
+
+steam_sql = """
+    select
+        steam.captured_at,
+        steam.event_id,
+        games.away_team,
+        games.home_team,
+        steam.market_type,
+        steam.outcome,
+        steam.direction,
+        steam.books_moved,
+        steam.books,
+        steam.first_move_at,
+        steam.avg_line_change,
+        steam.avg_price_change,
+        steam.consensus_line
+    from fct_steam_moves steam
+    left join dim_games games on games.event_id = steam.event_id
+    where steam.captured_at > ?::timestamp
+    order by steam.captured_at, steam.books_moved desc
+"""
+
+def latest_steam_at(conn):
+    try:
+        return conn.execute("select max(captured_at) from fct_steam_moves").fetchone()[0]
+    except duckdb.CatalogException:
+        return None
+
+def steam_moves(conn, since=None):
+    cursor = conn.execute(steam_sql, [since or "-infinity"])
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def new_steam_moves(db_path, since):
+    conn = duckdb.connect(db_path)
+    try:
+        return steam_moves(conn, since)
+    finally:
+        conn.close()
+
+def describe(move):
+    arrow = "up" if move["direction"] > 0 else "down"
+    if move["market_type"] == "h2h":
+        change = f"{move['avg_price_change']:+.0f} price"
+    else:
+        change = f"{move['avg_line_change']:+g} line, consensus {move['consensus_line']:g}"
+    return (
+        f"{move['captured_at']:%Y-%m-%d %H:%M} STEAM {move['away_team']} @ {move['home_team']} "
+        f"{move['market_type']} {move['outcome']} {arrow} ({change}): "
+        f"{move['books_moved']} books since {move['first_move_at']:%H:%M} [{', '.join(move['books'])}]"
+    )
+
+def record_alerts(moves, alerts_path):
+    os.makedirs(os.path.dirname(os.path.abspath(alerts_path)), exist_ok=True)
+    with open(alerts_path, "a") as f:
+        for move in moves:
+            f.write(json.dumps(move, default=str) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List steam moves flagged by the fct_steam_moves mart")
+    parser.add_argument("--db-path", default=duckdb_path)
+    parser.add_argument("--since", help="Only moves captured after this time, e.g. 2025-09-07T12:00:00")
+    parser.add_argument("--alerts-path", help=f"Also append the moves as JSON lines, e.g. {live_alerts_path}")
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db_path, read_only=True)
+    moves = steam_moves(conn, args.since)
+    conn.close()
+
+    for move in moves:
+        print(describe(move))
+    print(f"{len(moves)} steam moves")
+    if args.alerts_path:
+        record_alerts(moves, args.alerts_path)
@@ -0,0 +1,127 @@
+import argparse
+import csv
+import functools
+import gzip
+import json
+import os
+from datetime import date, datetime
+import duckdb
+import pyarrow as pa
+from load_to_duckdb import (
+    raw_data, raw_parquet, raw_schema, find_raw_files, is_delta, open_raw, read_odds_batches, snapshot_name,
+)
+
+season_calendar_path = os.path.join(os.path.dirname(__file__), "..", "transform", "seeds", "season_calendar.csv")
+
+@functools.lru_cache(maxsize=None)
+def week_one_starts(calendar_path=season_calendar_path):
+    # Partitions use the same weeks as stg_odds, numbered from the dbt season calendar seed
+    with open(calendar_path) as f:
+        return {int(row["season"]): date.fromisoformat(row["week_one_start"]) for row in csv.DictReader(f)}
+
+def week_one_start(season, calendar_path=season_calendar_path):
+    starts = week_one_starts(calendar_path)
+    if season not in starts:
+        raise ValueError(f"Season {season} is not in {calendar_path}, add it to the calendar first")
+    return starts[season]
+
+def season_week(captured_at):
+    season = captured_at.year if captured_at.month >= 3 else captured_at.year - 1
+    week = (captured_at.date() - week_one_start(season)).days // 7 + 1
+    return season, min(max(week, 1), 22)
+
+def snapshot_time(name):
+    return datetime.strptime(name, "nfl_odds_%Y-%m-%d_%H-%M-%S")
+
+def parquet_path(name, parquet_dir=raw_parquet):
+    season, week = season_week(snapshot_time(name))
+    return os.path.join(parquet_dir, f"season={season}", f"week={week}", f"{name}.parquet")
+
+def to_parquet(conn, filepath, target):
+    batches = read_odds_batches(filepath)
+    table = pa.concat_tables(batches) if batches else raw_schema.empty_table()
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.tmp"
+
+    conn.register("odds_batch", table)
+    conn.execute(f"""
+        COPY (
+            SELECT
+                captured_at::TIMESTAMP AS captured_at,
+                event_id, sport_key,
+                commence_time::TIMESTAMP AS commence_time,
+                home_team, away_team, bookmaker_key, bookmaker_title,
+                bookmaker_last_update::TIMESTAMP AS bookmaker_last_update,
+                market_key, outcome_name, outcome_price, outcome_point
+            FROM odds_batch
+        ) TO '{tmp_path}' (FORMAT PARQUET, COMPRESSION ZSTD)
+    """)
+    conn.unregister("odds_batch")
+    os.replace(tmp_path, target)
+
+def to_json_gz(filepath, target):
+    with open_raw(filepath) as f:
+        data = json.load(f)
+
+    tmp_path = f"{target}.tmp"
+    with gzip.open(tmp_path, "wt") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, target)
+
+def convert_raw(raw_dir=raw_data, parquet_dir=raw_parquet, target_format="parquet", delete_source=False):
+    files = [f for f in find_raw_files(raw_dir, parquet_dir=None) if not f.endswith(f".{target_format}")]
+    if not files:
+        print("No raw files to convert.")
+        return
+
+    conn = duckdb.connect()
+    converted = 0
+    skipped = 0
+    bytes_before = 0
+    bytes_after = 0
+    done = []
+
+    for filepath in files:
+        name = snapshot_name(filepath)
+        if target_format == "parquet":
+            target = parquet_path(name, parquet_dir)
+        else:
+            # Delta snapshots keep their references, so they stay marked as deltas
+            target = os.path.join(raw_dir, f"{name}{'.delta' if is_delta(filepath) else ''}.json.gz")
+
+        if os.path.exists(target):
+            skipped += 1
+        else:
+            if target_format == "parquet":
+                to_parquet(conn, filepath, target)
+            else:
+                to_json_gz(filepath, target)
+            converted += 1
+            bytes_before += os.path.getsize(filepath)
+            bytes_after += os.path.getsize(target)
+
+        if os.path.exists(target):
+            done.append(filepath)
+
+    conn.close()
+
+    # Sources are removed only once everything is converted, since delta snapshots
+    # resolve their references from the other files in the directory
+    if delete_source:
+        for filepath in done:
+            os.remove(filepath)
+
+    print(f"Converted: {converted}, Already converted: {skipped}")
+    if converted:
+        print(f"Size: {bytes_before / 2**20:,.1f} MB -> {bytes_after / 2**20:,.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert raw JSON snapshots to compressed storage")
+    parser.add_argument("--raw-dir", default=raw_data, help="Directory containing nfl_odds_*.json(.gz) files")
+    parser.add_argument("--parquet-dir", default=raw_parquet, help="Root of the season/week partitioned Parquet output")
+    parser.add_argument("--to", dest="target_format", choices=["parquet", "json.gz"], default="parquet")
+    parser.add_argument("--delete-source", action="store_true", help="Remove each source file once converted")
+    args = parser.parse_args()
+
+    convert_raw(args.raw_dir, args.parquet_dir, args.target_format, args.delete_source)
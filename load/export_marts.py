@@ -0,0 +1,130 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+import duckdb
+
+# Exports the marts the dashboard reads as Parquet, partitioned by season and week:
+#
+#   data/marts/dim_games/season=2025/data_0.parquet
+#   data/marts/fct_odds_snapshots/season=2025/week=3/data_0.parquet
+#
+# The dashboard (DASHBOARD_PARTITIONS_DIR=data/marts) then reads only the week of the
+# game being viewed, so adding seasons doesn't slow down its queries. Each season is
+# rewritten whole and swapped in, dim_games last, so a running dashboard never sees a
+# half written season.
+#
+# manifest.json lists every file with its size and sha256, so a dashboard reading the
+# export from a static host (DASHBOARD_PARTITIONS_URL) can fetch and verify only the
+# files it needs. Upload the whole directory, manifest last.
+
+duckdb_path = os.path.join(os.path.dirname(__file__), "..", "data", "nfl_odds.duckdb")
+export_dir = os.path.join(os.path.dirname(__file__), "..", "data", "marts")
+
+# Game level marts, partitioned by the season and week of each row's game
+export_tables = ["fct_odds_snapshots", "fct_game_summary", "fct_best_prices", "fct_arbitrage_windows"]
+
+def export_sql(table):
+    if table == "dim_games":
+        return "SELECT * FROM dim_games WHERE season IN (SELECT unnest(?)) ORDER BY game_start_time"
+    # Sorted by event so row group statistics skip other games within a week
+    return f"""
+        SELECT marts.*, games.season, games.nfl_week AS week
+        FROM {table} marts
+        JOIN dim_games games USING (event_id)
+        WHERE games.season IN (SELECT unnest(?))
+        ORDER BY marts.event_id
+    """
+
+def replace_season(tmp_table_dir, table_dir, season):
+    source = os.path.join(tmp_table_dir, f"season={season}")
+    target = os.path.join(table_dir, f"season={season}")
+    old = f"{target}.old"
+    os.makedirs(table_dir, exist_ok=True)
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(target):
+        os.replace(target, old)
+    if os.path.exists(source):
+        os.replace(source, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def write_manifest(out_dir, seasons):
+    # Files of the seasons just exported are hashed again, other entries are carried over
+    path = os.path.join(out_dir, "manifest.json")
+    previous = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)["files"]
+
+    files = {}
+    for table in sorted(os.listdir(out_dir)):
+        table_dir = os.path.join(out_dir, table)
+        if not os.path.isdir(table_dir) or table.startswith("."):
+            continue
+        for root, dirs, names in os.walk(table_dir):
+            dirs[:] = sorted(d for d in dirs if not d.endswith(".old"))
+            for name in sorted(names):
+                if not name.endswith(".parquet"):
+                    continue
+                filepath = os.path.join(root, name)
+                key = os.path.relpath(filepath, out_dir).replace(os.sep, "/")
+                if key in previous and not any(f"/season={season}/" in f"/{key}" for season in seasons):
+                    files[key] = previous[key]
+                else:
+                    files[key] = {"size": os.path.getsize(filepath), "sha256": sha256_file(filepath)}
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "files": files}, f, indent=1)
+    os.replace(tmp_path, path)
+    return files
+
+def export_marts(db_path=duckdb_path, out_dir=export_dir, seasons=None, tables=export_tables):
+    conn = duckdb.connect(db_path, read_only=True)
+    available = [season for (season,) in conn.execute("SELECT DISTINCT season FROM dim_games ORDER BY 1").fetchall()]
+    seasons = [season for season in seasons if season in available] if seasons else available
+    if not seasons:
+        print("No seasons to export. Run dbt build first.")
+        conn.close()
+        return
+
+    tmp_dir = os.path.join(out_dir, ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        for table in [*tables, "dim_games"]:
+            partition_by = "season" if table == "dim_games" else "season, week"
+            tmp_table_dir = os.path.join(tmp_dir, table)
+            conn.execute(
+                f"COPY ({export_sql(table)}) TO '{tmp_table_dir}' "
+                f"(FORMAT PARQUET, COMPRESSION ZSTD, PARTITION_BY ({partition_by}))",
+                [seasons],
+            )
+            for season in seasons:
+                replace_season(tmp_table_dir, os.path.join(out_dir, table), season)
+            print(f"  {table}: {', '.join(str(s) for s in seasons)}")
+    finally:
+        conn.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    files = write_manifest(out_dir, seasons)
+    print(f"Exported {len(seasons)} season(s) to {out_dir}, {len(files)} files in manifest.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the dashboard marts as season/week partitioned Parquet")
+    parser.add_argument("--db-path", default=duckdb_path, help="DuckDB database built by dbt")
+    parser.add_argument("--out-dir", default=export_dir, help="Root of the partitioned output")
+    parser.add_argument("--season", type=int, action="append", help="Season to export, e.g. 2025 (repeatable, default all)")
+    args = parser.parse_args()
+
+    export_marts(args.db_path, args.out_dir, args.season)
@@ -1,18 +1,88 @@
+import argparse
+import functools
+import gzip
+import hashlib
 import json
 import os
 import glob
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import telemetry
+from telemetry import current_rss_mb, peak_rss_mb
 
 raw_data = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
+raw_parquet = os.path.join(os.path.dirname(__file__), "..", "data", "raw_parquet")
 duckdb_path = os.path.join(os.path.dirname(__file__), "..", "data", "nfl_odds.duckdb")
 
+# Parsing is most of a load now that new files skip the per-file DELETE (11.2s of 19.7s
+# on 300 files), so files are parsed across one worker per core by default
+default_workers = os.cpu_count() or 1
+default_batch_size = 50_000
+
+# Team names, bookmakers, markets and timestamps repeat on almost every row, so
+# string columns are dictionary encoded to hold each distinct value once per batch
+dict_string = pa.dictionary(pa.int32(), pa.string())
+
+raw_schema = pa.schema([
+    ("captured_at", dict_string),
+    ("event_id", dict_string),
+    ("sport_key", dict_string),
+    ("commence_time", dict_string),
+    ("home_team", dict_string),
+    ("away_team", dict_string),
+    ("bookmaker_key", dict_string),
+    ("bookmaker_title", dict_string),
+    ("bookmaker_last_update", dict_string),
+    ("market_key", dict_string),
+    ("outcome_name", dict_string),
+    ("outcome_price", pa.float64()),
+    ("outcome_point", pa.float64()),
+])
+raw_columns = ", ".join(raw_schema.names)
+
+raw_patterns = ["nfl_odds_*.json", "nfl_odds_*.json.gz"]
+
+# When a snapshot exists in more than one format the first match here is loaded
+format_preference = [".parquet", ".json.gz", ".json"]
+
+def snapshot_name(filepath):
+    return os.path.basename(filepath).split(".")[0]
+
+def format_rank(filepath):
+    return next(i for i, ext in enumerate(format_preference) if filepath.endswith(ext))
+
+def find_raw_files(raw_dir=raw_data, parquet_dir=raw_parquet):
+    files = [f for pattern in raw_patterns for f in glob.glob(os.path.join(raw_dir, pattern))]
+    if parquet_dir:
+        files += glob.glob(os.path.join(parquet_dir, "**", "nfl_odds_*.parquet"), recursive=True)
+
+    chosen = {}
+    for f in files:
+        name = snapshot_name(f)
+        if name not in chosen or format_rank(f) < format_rank(chosen[name]):
+            chosen[name] = f
+    return [chosen[name] for name in sorted(chosen)]
+
+def open_raw(filepath):
+    if filepath.endswith(".gz"):
+        return gzip.open(filepath, "rt")
+    return open(filepath)
+
 def flatten_odds_file(filepath):
-    with open(filepath) as f:
+    with open_raw(filepath) as f:
         data = json.load(f)
 
-    ts = data["timestamp"]
     rows = []
-    for e in data["data"]:
+    for ts, e in events_from_snapshot(filepath, data):
         for b in e["bookmakers"]:
             for m in b["markets"]:
                 for o in m["outcomes"]:
@@ -24,10 +94,138 @@ def flatten_odds_file(filepath):
                     ))
     return rows
 
-def load_all_odds():
-    os.makedirs(os.path.dirname(duckdb_path), exist_ok=True)
-    conn = duckdb.connect(duckdb_path)
+def is_delta(filepath):
+    return ".delta." in os.path.basename(filepath)
+
+def ref_snapshot_name(timestamp_str):
+    clean_ts = timestamp_str.replace(":", "-").replace("T", "_").replace("Z", "")
+    return f"nfl_odds_{clean_ts}"
+
+def blocks_from_parquet(filepath):
+    blocks = {}
+    for row in pq.read_table(filepath).to_pylist():
+        key = (row["event_id"], row["bookmaker_key"])
+        if key not in blocks:
+            blocks[key] = {
+                "key": row["bookmaker_key"],
+                "title": row["bookmaker_title"],
+                "last_update": row["bookmaker_last_update"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "markets": {},
+            }
+        market = blocks[key]["markets"].setdefault(row["market_key"], {"key": row["market_key"], "outcomes": []})
+        outcome = {"name": row["outcome_name"], "price": row["outcome_price"]}
+        if row["outcome_point"] is not None:
+            outcome["point"] = row["outcome_point"]
+        market["outcomes"].append(outcome)
+
+    for block in blocks.values():
+        block["markets"] = list(block["markets"].values())
+    return blocks
+
+@functools.lru_cache(maxsize=8)
+def snapshot_blocks(name, raw_dir, parquet_dir=raw_parquet):
+    # Full bookmaker blocks of a snapshot, looked up by delta files referencing it. The
+    # snapshot may since have been recompressed or converted to Parquet.
+    json_files = [f for f in glob.glob(os.path.join(raw_dir, f"{name}.*")) if f.endswith((".json", ".json.gz"))]
+    if json_files:
+        with open_raw(json_files[0]) as f:
+            data = json.load(f)
+        return {(e["id"], b["key"]): b for e in data["data"] for b in e["bookmakers"] if "ref" not in b}
+
+    parquet_files = glob.glob(os.path.join(parquet_dir, "**", f"{name}.parquet"), recursive=True)
+    if parquet_files:
+        return blocks_from_parquet(parquet_files[0])
+
+    raise FileNotFoundError(f"Snapshot {name} referenced by a delta file is not in {raw_dir} or {parquet_dir}")
+
+def resolve_refs(e, raw_dir):
+    bookmakers = []
+    for b in e["bookmakers"]:
+        if "ref" in b:
+            b = snapshot_blocks(ref_snapshot_name(b["ref"]), raw_dir)[(e["id"], b["key"])]
+        bookmakers.append(b)
+    return {**e, "bookmakers": bookmakers}
+
+def iter_events(filepath):
+    with telemetry.timer("load.parse"), open_raw(filepath) as f:
+        data = json.load(f)
+    return events_from_snapshot(filepath, data)
+
+def events_from_snapshot(filepath, data):
+    ts = data["timestamp"]
+    for e in data["data"]:
+        if is_delta(filepath):
+            e = resolve_refs(e, os.path.dirname(filepath))
+        yield ts, e
+
+def empty_columns():
+    return {name: [] for name in raw_schema.names}
 
+def iter_odds_batches(filepath, batch_size=default_batch_size):
+    if filepath.endswith(".parquet"):
+        # Converted snapshots are already flat, just stream their row groups
+        for batch in telemetry.timed_iter("load.parquet_read", pq.ParquetFile(filepath).iter_batches(batch_size)):
+            yield pa.Table.from_batches([batch])
+        return
+
+    yield from telemetry.timed_iter("load.flatten", event_batches(iter_events(filepath), batch_size))
+
+def event_batches(events, batch_size=default_batch_size):
+    columns = empty_columns()
+
+    # Batches are cut on event boundaries, so a batch can run over batch_size by one event
+    for ts, e in events:
+        names = columns["outcome_name"]
+        start = len(names)
+        for b in e["bookmakers"]:
+            for m in b["markets"]:
+                outcomes = m["outcomes"]
+                n = len(outcomes)
+                columns["bookmaker_key"] += [b["key"]] * n
+                columns["bookmaker_title"] += [b["title"]] * n
+                columns["bookmaker_last_update"] += [b["last_update"]] * n
+                columns["market_key"] += [m["key"]] * n
+                for o in outcomes:
+                    names.append(o["name"])
+                    columns["outcome_price"].append(o["price"])
+                    columns["outcome_point"].append(o.get("point"))
+
+        n = len(names) - start
+        columns["captured_at"] += [ts] * n
+        columns["event_id"] += [e["id"]] * n
+        columns["sport_key"] += [e["sport_key"]] * n
+        columns["commence_time"] += [e["commence_time"]] * n
+        columns["home_team"] += [e["home_team"]] * n
+        columns["away_team"] += [e["away_team"]] * n
+
+        if len(names) >= batch_size:
+            yield pa.Table.from_pydict(columns, schema=raw_schema)
+            columns = empty_columns()
+
+    if columns["outcome_name"]:
+        yield pa.Table.from_pydict(columns, schema=raw_schema)
+
+def read_odds_batches(filepath, batch_size=default_batch_size):
+    return list(iter_odds_batches(filepath, batch_size))
+
+def insert_batch(conn, table, source_file):
+    with telemetry.timer("load.insert"):
+        conn.register("odds_batch", table)
+        conn.execute(
+            f"INSERT INTO raw_odds ({raw_columns}, source_file) SELECT {raw_columns}, ? FROM odds_batch",
+            [source_file],
+        )
+        conn.unregister("odds_batch")
+    telemetry.count("load.rows", table.num_rows)
+
+def hash_file(filepath):
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def create_tables(conn):
     conn.execute("""
         CREATE TABLE IF NOT EXISTS raw_odds (
             captured_at          TIMESTAMP,
@@ -43,36 +241,423 @@ def load_all_odds():
             outcome_name         VARCHAR,
             outcome_price        DOUBLE,
             outcome_point        DOUBLE,
+            loaded_at            TIMESTAMP DEFAULT current_timestamp,
+            source_file          VARCHAR
+        )
+    """)
+    # Databases loaded before the manifest existed have no source_file column
+    conn.execute("ALTER TABLE raw_odds ADD COLUMN IF NOT EXISTS source_file VARCHAR")
+
+    # Manifest of ingested raw files, used to only load new or changed snapshots
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS raw_files (
+            file_name            VARCHAR PRIMARY KEY,
+            file_size            BIGINT,
+            file_mtime           DOUBLE,
+            content_hash         VARCHAR,
+            row_count            BIGINT,
             loaded_at            TIMESTAMP DEFAULT current_timestamp
         )
     """)
 
-    existing = conn.execute("SELECT COUNT(*) FROM raw_odds").fetchone()[0]
-    if existing > 0:
-        print(f"Already loaded ({existing:,} rows). Skipping.")
-        conn.close()
-        return
+def plan_files(conn, files):
+    manifest = {
+        name: (size, mtime, content_hash)
+        for name, size, mtime, content_hash in conn.execute(
+            "SELECT file_name, file_size, file_mtime, content_hash FROM raw_files"
+        ).fetchall()
+    }
+
+    loaded_snapshots = {snapshot_name(name) for name in manifest}
+
+    to_load = []
+    unchanged = 0
+    for filepath in files:
+        name = os.path.basename(filepath)
+        stat = os.stat(filepath)
+        known = manifest.get(name)
+
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+            unchanged += 1
+            continue
+
+        content_hash = hash_file(filepath)
+        if known and known[2] == content_hash:
+            # Touched but identical, only refresh the stat info in the manifest
+            conn.execute(
+                "UPDATE raw_files SET file_size = ?, file_mtime = ? WHERE file_name = ?",
+                [stat.st_size, stat.st_mtime, name],
+            )
+            unchanged += 1
+            continue
+
+        to_load.append((filepath, stat.st_size, stat.st_mtime, content_hash, snapshot_name(name) in loaded_snapshots))
+
+    return to_load, unchanged
 
-    files = sorted(glob.glob(os.path.join(raw_data, "nfl_odds_*.json")))
+def check_memory(max_rss_mb):
+    if max_rss_mb and current_rss_mb() > max_rss_mb:
+        raise MemoryError(
+            f"Loader RSS {current_rss_mb():,.0f} MB exceeded the {max_rss_mb:,} MB cap. "
+            "Lower --batch-size or --workers and rerun, files already loaded are kept."
+        )
+
+def write_file(conn, name, batches, file_size, file_mtime, content_hash, is_changed, max_rss_mb=None):
+    with telemetry.timer("load.file"):
+        row_count = write_batches(conn, name, batches, file_size, file_mtime, content_hash, is_changed, max_rss_mb)
+    telemetry.count("load.files")
+    telemetry.record_memory("load")
+    return row_count
+
+def write_batches(conn, name, batches, file_size, file_mtime, content_hash, is_changed, max_rss_mb=None):
+    # Replace the file's rows and manifest entry in one transaction so a failed
+    # load never leaves a snapshot half written
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        if is_changed:
+            # Rows are replaced per snapshot, whichever format they were loaded from.
+            # Scans the whole table, so new snapshots skip it.
+            conn.execute("DELETE FROM raw_odds WHERE split_part(source_file, '.', 1) = ?", [snapshot_name(name)])
+            conn.execute(
+                "DELETE FROM raw_files WHERE split_part(file_name, '.', 1) = ? AND file_name != ?",
+                [snapshot_name(name), name],
+            )
+        row_count = 0
+        for table in batches:
+            insert_batch(conn, table, name)
+            row_count += table.num_rows
+            check_memory(max_rss_mb)
+        conn.execute(
+            """INSERT OR REPLACE INTO raw_files
+                (file_name, file_size, file_mtime, content_hash, row_count, loaded_at)
+            VALUES (?, ?, ?, ?, ?, current_timestamp)""",
+            [name, file_size, file_mtime, content_hash, row_count],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    return row_count
+
+def load_snapshot(conn, filepath, data, batch_size=default_batch_size):
+    # Loads a snapshot that is already in memory, recording the file it was saved to in
+    # the manifest so later runs of this script treat it as loaded
+    stat = os.stat(filepath)
+    name = os.path.basename(filepath)
+    is_changed = conn.execute(
+        "SELECT count(*) > 0 FROM raw_files WHERE split_part(file_name, '.', 1) = ?", [snapshot_name(name)]
+    ).fetchone()[0]
+    events = ((data["timestamp"], e) for e in data["data"])
+    return write_file(
+        conn, name, event_batches(events, batch_size), stat.st_size, stat.st_mtime, hash_file(filepath), is_changed,
+    )
+
+def delete_legacy_rows(conn):
+    # Rows loaded before the manifest existed have no source_file. Once their snapshot is
+    # loaded again they are matched on its capture timestamp, once per load.
+    if conn.execute("SELECT count(*) FROM raw_odds WHERE source_file IS NULL").fetchone()[0]:
+        conn.execute("""
+            DELETE FROM raw_odds
+            WHERE source_file IS NULL
+              AND captured_at IN (SELECT DISTINCT captured_at FROM raw_odds WHERE source_file IS NOT NULL)
+        """)
+
+def load_files(conn, to_load, workers=1, batch_size=default_batch_size, max_rss_mb=None):
+    total_rows = 0
+
+    def write(i, entry, batches):
+        nonlocal total_rows
+        filepath, file_size, file_mtime, content_hash, is_changed = entry
+        total_rows += write_file(
+            conn, os.path.basename(filepath), batches, file_size, file_mtime, content_hash, is_changed, max_rss_mb
+        )
+        if (i + 1) % 50 == 0:
+            print(f"  [{i+1}/{len(to_load)}] files loaded")
+
+    if workers <= 1 or len(to_load) <= 1:
+        # Stream file -> event -> batch straight into DuckDB
+        for i, entry in enumerate(to_load):
+            write(i, entry, iter_odds_batches(entry[0], batch_size))
+        return total_rows
+
+    # Workers parse and flatten files while a single writer thread inserts the
+    # batches in file order. Both the in-flight futures and the writer queue are
+    # bounded so only a few files worth of batches are held in memory at once.
+    max_pending = workers * 2
+    batches = queue.Queue(maxsize=max_pending)
+    errors = []
+
+    def writer():
+        while True:
+            item = batches.get()
+            if item is None:
+                return
+            if errors:
+                continue
+            try:
+                write(*item)
+            except Exception as e:
+                errors.append(e)
+
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for i, entry in enumerate(to_load):
+                pending.append((i, entry, pool.submit(read_odds_batches, entry[0], batch_size)))
+                if len(pending) >= max_pending:
+                    i, entry, future = pending.popleft()
+                    with telemetry.timer("load.wait_for_parse"):
+                        parsed = future.result()
+                    batches.put((i, entry, parsed))
+                if errors:
+                    break
+            while pending and not errors:
+                i, entry, future = pending.popleft()
+                with telemetry.timer("load.wait_for_parse"):
+                    parsed = future.result()
+                batches.put((i, entry, parsed))
+            for _, _, future in pending:
+                future.cancel()
+    finally:
+        batches.put(None)
+        writer_thread.join()
+
+    if errors:
+        raise errors[0]
+    return total_rows
+
+# Nested snapshot layout, declared up front so DuckDB doesn't have to sample files to infer it
+outcome_json_type = "STRUCT(name VARCHAR, price DOUBLE, point DOUBLE)"
+market_json_type = f"STRUCT(key VARCHAR, outcomes {outcome_json_type}[])"
+bookmaker_json_type = f"STRUCT(key VARCHAR, title VARCHAR, last_update VARCHAR, markets {market_json_type}[])"
+event_json_type = (
+    "STRUCT(id VARCHAR, sport_key VARCHAR, commence_time VARCHAR, home_team VARCHAR, "
+    f"away_team VARCHAR, bookmakers {bookmaker_json_type}[])"
+)
+snapshot_json_columns = {"timestamp": "VARCHAR", "data": f"{event_json_type}[]"}
+
+def insert_files_sql(files):
+    if files[0].endswith(".parquet"):
+        return f"""
+            INSERT INTO raw_odds ({raw_columns}, source_file)
+            SELECT {raw_columns}, parse_filename(filename)
+            FROM read_parquet(?, filename = true)
+        """
+
+    # Unnest data -> bookmakers -> markets -> outcomes one level at a time. Chained
+    # select-list unnests are much faster than lateral joins over the same lists.
+    return f"""
+        INSERT INTO raw_odds ({raw_columns}, source_file)
+        WITH events AS (
+            SELECT timestamp AS captured_at, filename, unnest(data) AS e
+            FROM read_json(?, columns = {snapshot_json_columns}, filename = true, format = 'auto')
+        ),
+        bookmakers AS (
+            SELECT
+                captured_at, filename, e.id AS event_id, e.sport_key, e.commence_time,
+                e.home_team, e.away_team, unnest(e.bookmakers) AS b
+            FROM events
+        ),
+        markets AS (
+            SELECT
+                * EXCLUDE (b), b.key AS bookmaker_key, b.title AS bookmaker_title,
+                b.last_update AS bookmaker_last_update, unnest(b.markets) AS m
+            FROM bookmakers
+        ),
+        outcomes AS (
+            SELECT * EXCLUDE (m), m.key AS market_key, unnest(m.outcomes) AS o
+            FROM markets
+        )
+        SELECT
+            captured_at, event_id, sport_key, commence_time, home_team, away_team,
+            bookmaker_key, bookmaker_title, bookmaker_last_update, market_key,
+            o.name, o.price, o.point, parse_filename(filename)
+        FROM outcomes
+    """
+
+def load_files_duckdb(conn, to_load, chunk_size=100):
+    total_rows = 0
+
+    # DuckDB scans and unnests each chunk of files in parallel itself, Python only
+    # hands over the file list. Each chunk is replaced in a single transaction.
+    for start in range(0, len(to_load), chunk_size):
+        chunk = to_load[start:start + chunk_size]
+        names = [os.path.basename(filepath) for filepath, *_ in chunk]
+        changed = [snapshot_name(os.path.basename(filepath)) for filepath, *_, is_changed in chunk if is_changed]
+
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            if changed:
+                conn.execute(
+                    "DELETE FROM raw_odds WHERE split_part(source_file, '.', 1) IN (SELECT unnest(?))",
+                    [changed],
+                )
+                conn.execute(
+                    """DELETE FROM raw_files
+                    WHERE split_part(file_name, '.', 1) IN (SELECT unnest(?))
+                      AND file_name NOT IN (SELECT unnest(?))""",
+                    [changed, names],
+                )
+            for is_parquet in (False, True):
+                files = [filepath for filepath, *_ in chunk if filepath.endswith(".parquet") == is_parquet]
+                if files:
+                    with telemetry.timer("load.duckdb_scan", files=len(files)):
+                        conn.execute(insert_files_sql(files), [files])
+
+            row_counts = dict(conn.execute(
+                "SELECT source_file, count(*) FROM raw_odds WHERE source_file IN (SELECT unnest(?)) GROUP BY 1",
+                [names],
+            ).fetchall())
+            conn.executemany(
+                """INSERT OR REPLACE INTO raw_files
+                    (file_name, file_size, file_mtime, content_hash, row_count, loaded_at)
+                VALUES (?, ?, ?, ?, ?, current_timestamp)""",
+                [
+                    [name, file_size, file_mtime, content_hash, row_counts.get(name, 0)]
+                    for name, (_, file_size, file_mtime, content_hash, _) in zip(names, chunk)
+                ],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        total_rows += sum(row_counts.values())
+        print(f"  [{start + len(chunk)}/{len(to_load)}] files loaded")
+
+    return total_rows
+
+def load_files_native(conn, to_load, workers=1, batch_size=default_batch_size, max_rss_mb=None):
+    # read_json only handles full snapshots. Delta snapshots reference bookmaker blocks in other
+    # files, possibly since converted to Parquet, which only the Python path resolves.
+    total_rows = load_files_duckdb(conn, [entry for entry in to_load if not is_delta(entry[0])])
+    total_rows += load_files(conn, [entry for entry in to_load if is_delta(entry[0])], workers, batch_size, max_rss_mb)
+    return total_rows
+
+def benchmark(raw_dir=raw_data, workers=default_workers, batch_size=default_batch_size):
+    # A single file can be passed instead of a directory, e.g. the sample snapshot in data/samples
+    files = [raw_dir] if os.path.isfile(raw_dir) else find_raw_files(raw_dir, parquet_dir=None)
     if not files:
         print("No odds files found. Run the extraction first.")
-        conn.close()
         return
 
+    # Previous ingest path: python tuples for every row pushed through executemany
+    conn = duckdb.connect()
+    create_tables(conn)
+    start = time.perf_counter()
     rows = [r for f in files for r in flatten_odds_file(f)]
     conn.executemany(
-        """INSERT INTO raw_odds (
-            captured_at, event_id, sport_key, commence_time,
-            home_team, away_team, bookmaker_key, bookmaker_title,
-            bookmaker_last_update, market_key, outcome_name,
-            outcome_price, outcome_point
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        f"INSERT INTO raw_odds ({raw_columns}) VALUES ({', '.join(['?'] * len(raw_schema))})",
         rows,
     )
-
+    executemany_secs = time.perf_counter() - start
     conn.close()
-    print(f"Loaded {len(rows):,} rows from {len(files)} files into {duckdb_path}")
+
+    print(f"Benchmarked {len(files)} files from {raw_dir}")
+    print(f"  executemany: {len(rows):,} rows in {executemany_secs:.2f}s ({len(rows) / executemany_secs:,.0f} rows/sec)")
+
+    engines = [
+        ("columnar", lambda conn, to_load: load_files(conn, to_load, 1, batch_size)),
+        (f"parallel ({workers} workers)", lambda conn, to_load: load_files(conn, to_load, workers, batch_size)),
+        ("duckdb read_json", lambda conn, to_load: load_files_native(conn, to_load, 1, batch_size)),
+    ]
+    results = {}
+    for label, load in engines:
+        conn = duckdb.connect()
+        create_tables(conn)
+        to_load, _ = plan_files(conn, files)
+        start = time.perf_counter()
+        loaded = load(conn, to_load)
+        secs = time.perf_counter() - start
+        results[label] = (
+            conn.execute(f"SELECT {raw_columns}, source_file FROM raw_odds").arrow(),
+            conn.execute(f"SELECT {raw_columns}, source_file FROM raw_odds ORDER BY ALL").arrow(),
+        )
+        conn.close()
+        print(f"  {label}: {loaded:,} rows in {secs:.2f}s ({loaded / secs:,.0f} rows/sec)")
+
+    serial, parallel, native = results.values()
+    # The process pool must match the serial path row for row. DuckDB scans files in
+    # parallel and doesn't promise the same insertion order, so it is compared as a set.
+    print(f"  parallel output identical to serial: {serial[0].equals(parallel[0])}")
+    print(f"  duckdb output identical to serial: {serial[1].equals(native[1])}")
+    deltas = sum(is_delta(f) for f in files)
+    print(f"  duckdb read_json loaded {len(files) - deltas} of {len(files)} files, {deltas} delta files fell back to Python")
+
+def load_all_odds(
+    raw_dir=raw_data,
+    db_path=duckdb_path,
+    full_refresh=False,
+    workers=default_workers,
+    batch_size=default_batch_size,
+    max_rss_mb=None,
+    parquet_dir=raw_parquet,
+    engine="python",
+):
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = duckdb.connect(db_path)
+    if max_rss_mb:
+        # DuckDB's buffer pool shares the process with the parsed batches, give it half the cap
+        conn.execute(f"SET memory_limit = '{max(max_rss_mb // 2, 64)}MB'")
+
+    if full_refresh:
+        conn.execute("DROP TABLE IF EXISTS raw_odds")
+        conn.execute("DROP TABLE IF EXISTS raw_files")
+
+    create_tables(conn)
+
+    files = find_raw_files(raw_dir, parquet_dir)
+    if not files:
+        print("No odds files found. Run the extraction first.")
+        conn.close()
+        return
+
+    to_load, unchanged = plan_files(conn, files)
+    if not to_load:
+        print(f"All {unchanged} files already loaded. Nothing to do.")
+        conn.close()
+        return
+
+    changed = sum(is_changed for *_, is_changed in to_load)
+    try:
+        if engine == "duckdb":
+            deltas = sum(is_delta(entry[0]) for entry in to_load)
+            if deltas:
+                print(f"{deltas} of {len(to_load)} files are delta snapshots, loading them with the Python path")
+            total_rows = load_files_native(conn, to_load, workers, batch_size, max_rss_mb)
+        else:
+            total_rows = load_files(conn, to_load, workers, batch_size, max_rss_mb)
+        delete_legacy_rows(conn)
+    finally:
+        conn.close()
+        print(f"Peak memory: loader {peak_rss_mb():,.0f} MB, parse workers {peak_rss_mb('children'):,.0f} MB")
+    print(
+        f"Loaded {total_rows:,} rows from {len(to_load)} files "
+        f"({len(to_load) - changed} new, {changed} changed, {unchanged} unchanged) into {db_path}"
+    )
 
 
 if __name__ == "__main__":
-    load_all_odds()
+    parser = argparse.ArgumentParser(description="Load raw odds snapshots into DuckDB")
+    parser.add_argument("--raw-dir", default=raw_data, help="Directory containing nfl_odds_*.json(.gz) files")
+    parser.add_argument("--parquet-dir", default=raw_parquet, help="Partitioned Parquet snapshots from convert_raw.py")
+    parser.add_argument("--db-path", default=duckdb_path, help="DuckDB database file")
+    parser.add_argument("--full-refresh", action="store_true", help="Drop raw_odds and reload every file")
+    parser.add_argument("--benchmark", action="store_true", help="Compare ingest paths in memory and print rows/sec")
+    parser.add_argument("--engine", choices=["python", "duckdb"], default="python", help="Flatten snapshots in Python or with DuckDB's read_json (full snapshots only, delta snapshots always use Python)")
+    parser.add_argument("--workers", type=int, default=default_workers, help="Processes used to parse raw files (1 = serial)")
+    parser.add_argument("--batch-size", type=int, default=default_batch_size, help="Rows per insert batch")
+    parser.add_argument("--max-rss-mb", type=int, help="Abort the load if loader memory goes over this many MB")
+    args = parser.parse_args()
+
+    telemetry.start()
+    if args.benchmark:
+        benchmark(args.raw_dir, args.workers, args.batch_size)
+    else:
+        load_all_odds(
+            args.raw_dir, args.db_path, args.full_refresh, args.workers, args.batch_size, args.max_rss_mb,
+            args.parquet_dir, args.engine,
+        )
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized odds conversions and no-vig (fair) probabilities. Every function takes
+# whole columns (lists, NumPy arrays or pandas Series) and returns NumPy arrays.
+# De-vig methods take a groups column (or DataFrame of key columns) marking which
+# outcomes belong to the same market, e.g. one group per event/sportsbook/market/capture.
+
+DEVIG_METHODS = ["multiplicative", "additive", "power", "shin"]
+
+# Bisection steps for the power and Shin solvers, enough for double precision
+SOLVER_ITERATIONS = 60
+
+
+def american_to_decimal(american):
+    american = np.asarray(american, dtype=float)
+    return np.where(american > 0, 1 + american / 100, 1 + 100 / np.abs(american))
+
+
+def decimal_to_american(decimal):
+    decimal = np.asarray(decimal, dtype=float)
+    return np.where(decimal >= 2, (decimal - 1) * 100, -100 / (decimal - 1))
+
+
+def decimal_to_probability(decimal):
+    return 1 / np.asarray(decimal, dtype=float)
+
+
+def probability_to_decimal(probability):
+    return 1 / np.asarray(probability, dtype=float)
+
+
+def american_to_probability(american):
+    # Same as the implied_probability dbt macro, without its rounding
+    return decimal_to_probability(american_to_decimal(american))
+
+
+def probability_to_american(probability):
+    return decimal_to_american(probability_to_decimal(probability))
+
+
+def group_index(groups, n):
+    if groups is None:
+        return np.zeros(n, dtype=int), 1
+    if isinstance(groups, pd.DataFrame):
+        index = groups.groupby(list(groups.columns), sort=False, dropna=False).ngroup().to_numpy()
+        return index, index.max() + 1 if n else 0
+    if not isinstance(groups, (pd.Series, pd.Index, np.ndarray)):
+        groups = np.asarray(groups)
+    index, uniques = pd.factorize(groups)
+    return index, len(uniques)
+
+
+def group_sum(values, index, n_groups):
+    return np.bincount(index, weights=values, minlength=n_groups)
+
+
+def overround(probabilities, groups=None):
+    # Book margin of each row's market: implied probabilities summed over the group, minus 1
+    probabilities = np.asarray(probabilities, dtype=float)
+    index, n_groups = group_index(groups, len(probabilities))
+    return group_sum(probabilities, index, n_groups)[index] - 1
+
+
+def bisect(f, low, high, n_groups):
+    # Vectorized bisection for one root per group, f must be decreasing in x
+    low = np.full(n_groups, low, dtype=float)
+    high = np.full(n_groups, high, dtype=float)
+    for _ in range(SOLVER_ITERATIONS):
+        mid = (low + high) / 2
+        too_high = f(mid) > 0
+        low = np.where(too_high, mid, low)
+        high = np.where(too_high, high, mid)
+    return (low + high) / 2
+
+
+def devig(probabilities, groups=None, method="multiplicative"):
+    probabilities = np.asarray(probabilities, dtype=float)
+    index, n_groups = group_index(groups, len(probabilities))
+    booksum = group_sum(probabilities, index, n_groups)
+
+    if method == "multiplicative":
+        return probabilities / booksum[index]
+
+    if method == "additive":
+        counts = np.bincount(index, minlength=n_groups)
+        return probabilities - ((booksum - 1) / counts)[index]
+
+    if method == "power":
+        # Fair p = q^k with k chosen so each market sums to 1, shading longshots more
+        def excess(k):
+            return group_sum(probabilities ** k[index], index, n_groups) - 1
+        k = bisect(excess, 0, 20, n_groups)
+        return probabilities ** k[index]
+
+    if method == "shin":
+        # Shin (1993): z is the share of insider money the book prices against
+        def fair(z):
+            z_rows = z[index]
+            b = booksum[index]
+            return (np.sqrt(z_rows ** 2 + 4 * (1 - z_rows) * probabilities ** 2 / b) - z_rows) / (2 * (1 - z_rows))
+
+        def excess(z):
+            return group_sum(fair(z), index, n_groups) - 1
+        z = bisect(excess, 0, 0.99, n_groups)
+        # Markets priced at or under 100% have no Shin solution, those are scaled instead
+        return np.where(booksum[index] > 1, fair(z), probabilities / booksum[index])
+
+    raise ValueError(f"Unknown de-vig method {method!r}, expected one of {DEVIG_METHODS}")
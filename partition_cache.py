@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+import telemetry
+
+# Local cache of the season/week partitions written by load/export_marts.py, fetched
+# from wherever the export is hosted (DASHBOARD_PARTITIONS_URL). The manifest and the
+# small dim_games files are fetched at startup and each week's files when a game in it
+# is first opened. Interrupted downloads resume with HTTP Range requests, and every
+# file is checked against the sha256 in the manifest before it is used.
+
+MANIFEST_NAME = "manifest.json"
+
+CHUNK_SIZE = 1 << 20
+MAX_ATTEMPTS = 4
+TIMEOUT_SECONDS = 30
+
+_locks = defaultdict(threading.Lock)
+_verified = set()
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def url_join(base_url, path):
+    return f"{base_url.rstrip('/')}/{urllib.request.pathname2url(path).lstrip('/')}"
+
+
+def download(url, path, size=None, sha256=None):
+    # Written to path + ".part" and resumed from its length on the next attempt, or the
+    # next run, if the connection drops. A server that ignores Range restarts the file.
+    part = f"{path}.part"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    error = None
+
+    for attempt in range(MAX_ATTEMPTS):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if size is None or offset < size:
+            request = urllib.request.Request(url, headers={"Range": f"bytes={offset}-"} if offset else {})
+            try:
+                with telemetry.timer("dashboard.fetch", memory=True), urllib.request.urlopen(request, timeout=TIMEOUT_SECONDS) as response:
+                    if response.status != 206:
+                        offset = 0
+                    received = 0
+                    with open(part, "ab" if offset else "wb") as f:
+                        for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                            f.write(chunk)
+                            received += len(chunk)
+                            telemetry.count("dashboard.fetch_bytes", len(chunk))
+                    # A connection closed early can end the body without raising
+                    expected = response.headers.get("Content-Length")
+                    if expected is not None and received < int(expected):
+                        raise IOError(f"{url} ended after {offset + received:,} bytes")
+            except (urllib.error.URLError, OSError) as e:
+                # Includes connections dropped mid body, which are resumed on the next attempt
+                error = e
+                telemetry.count("dashboard.fetch_retries")
+                time.sleep(min(2 ** attempt, 10) / 4)
+                continue
+
+        if size is not None and os.path.getsize(part) < size:
+            error = IOError(f"{url} ended after {os.path.getsize(part):,} of {size:,} bytes")
+            continue
+        if (size is not None and os.path.getsize(part) != size) or (sha256 and sha256_file(part) != sha256):
+            # Corrupt or stale partial download, start over
+            os.remove(part)
+            error = IOError(f"{url} failed its checksum")
+            continue
+
+        os.replace(part, path)
+        return path
+
+    raise IOError(f"Could not download {url} after {MAX_ATTEMPTS} attempts: {error}")
+
+
+def fetch_manifest(base_url, cache_dir):
+    # Refetched on every call, falling back to the cached copy when the host is unreachable
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if os.path.exists(f"{path}.part"):
+        os.remove(f"{path}.part")
+    try:
+        download(url_join(base_url, MANIFEST_NAME), path)
+    except IOError:
+        if not os.path.exists(path):
+            raise
+    with open(path) as f:
+        return json.load(f)
+
+
+def fetch_files(base_url, cache_dir, manifest, prefix):
+    # Every file under a partition, e.g. fct_odds_snapshots/season=2025/week=3/, fetched
+    # unless the cached copy already matches the manifest
+    paths = []
+    for name, entry in sorted(manifest["files"].items()):
+        if not name.startswith(prefix):
+            continue
+        path = os.path.join(cache_dir, *name.split("/"))
+        with _locks[path]:
+            key = (path, entry["sha256"])
+            if key not in _verified:
+                cached = (
+                    os.path.exists(path)
+                    and os.path.getsize(path) == entry["size"]
+                    and sha256_file(path) == entry["sha256"]
+                )
+                if not cached:
+                    download(url_join(base_url, name), path, entry["size"], entry["sha256"])
+                _verified.add(key)
+        paths.append(path)
+    return paths
@@ -0,0 +1,312 @@
+import atexit
+import cProfile
+import functools
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import pstats
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    PyinstrumentProfiler = None
+
+# Shared instrumentation for the extract, loader and dashboard. Stages are timed with
+# timer() (or timed_iter() for generators), alongside counters and gauges, and can be
+# written to a JSON lines log, served as Prometheus text, and profiled. Everything is
+# off unless configured through the environment:
+#
+#   TELEMETRY_LOG=data/telemetry.jsonl   one line per timed stage, plus a summary at exit
+#   TELEMETRY_PORT=9108                  Prometheus text at http://127.0.0.1:9108/metrics
+#   TELEMETRY_PROFILE=load.flatten,dashboard.figure   stage prefixes to profile, or "all"
+#   TELEMETRY_PROFILER=pyinstrument      instead of cProfile, if pyinstrument is installed
+#   TELEMETRY_PROFILE_DIR=data/profiles  where .prof / .speedscope.json files are written
+#
+# Stages timed in loader worker processes only reach the JSON lines log. Profiles are
+# written when each process exits.
+
+LOG_PATH = os.getenv("TELEMETRY_LOG")
+PORT = os.getenv("TELEMETRY_PORT")
+PROFILE_STAGES = [s.strip() for s in os.getenv("TELEMETRY_PROFILE", "").split(",") if s.strip()]
+PROFILER = os.getenv("TELEMETRY_PROFILER", "cprofile")
+PROFILE_DIR = os.getenv("TELEMETRY_PROFILE_DIR", os.path.join(os.path.dirname(__file__), "data", "profiles"))
+
+# Most recent durations per stage, kept for p50/p95 reporting
+WINDOW = 1000
+
+_lock = threading.Lock()
+_stages = defaultdict(lambda: {"count": 0, "sum": 0.0, "max": 0.0, "recent": deque(maxlen=WINDOW)})
+_counters = defaultdict(float)
+_gauges = {}
+_profilers = {}
+_profilers_pid = None
+_profiling = threading.local()
+_log = None
+_server = None
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb(who="self"):
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    return usage.ru_maxrss / (2**20 if os.uname().sysname == "Darwin" else 2**10)
+
+
+def write_log(record):
+    global _log
+    if not LOG_PATH:
+        return
+    line = json.dumps({"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), "pid": os.getpid(), **record}, default=str)
+    with _lock:
+        if _log is None or _log[0] != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(LOG_PATH)), exist_ok=True)
+            _log = (os.getpid(), open(LOG_PATH, "a", buffering=1))
+        # Line buffered and appended, so worker processes can share the file
+        _log[1].write(line + "\n")
+
+
+def record(stage, seconds, **labels):
+    with _lock:
+        stats = _stages[stage]
+        stats["count"] += 1
+        stats["sum"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["recent"].append(seconds)
+    write_log({"stage": stage, "seconds": round(seconds, 6), **labels})
+
+
+def count(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def record_memory(stage):
+    gauge(f"{stage}.rss_mb", round(current_rss_mb(), 1))
+    gauge("process.peak_rss_mb", round(peak_rss_mb(), 1))
+
+
+def should_profile(stage):
+    return any(p == "all" or stage == p or stage.startswith(p + ".") for p in PROFILE_STAGES)
+
+
+def profile_path(stage, extension):
+    return os.path.join(PROFILE_DIR, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', stage)}.{os.getpid()}.{extension}")
+
+
+def use_pyinstrument():
+    return PROFILER == "pyinstrument" and PyinstrumentProfiler is not None
+
+
+def thread_profiler(stage):
+    # Profilers can't be shared between threads, so each stage gets one per thread
+    global _profilers_pid
+    with _lock:
+        if _profilers_pid != os.getpid():
+            # First profile in this process, or a forked worker holding its parent's profilers
+            _profilers.clear()
+            _profilers_pid = os.getpid()
+            atexit.register(write_profiles)
+            if multiprocessing.parent_process() is not None:
+                # Pool workers exit without running atexit, but do run multiprocessing's finalizers
+                multiprocessing.util.Finalize(None, write_profiles, exitpriority=10)
+        key = (stage, threading.get_ident())
+        if key not in _profilers:
+            _profilers[key] = PyinstrumentProfiler() if use_pyinstrument() else cProfile.Profile()
+        return _profilers[key]
+
+
+def write_profiles():
+    # One cProfile file per stage with every thread's calls merged, or one speedscope
+    # file per stage and thread
+    with _lock:
+        if _profilers_pid != os.getpid() or not _profilers:
+            return
+        by_stage = defaultdict(list)
+        for (stage, _), profiler in _profilers.items():
+            by_stage[stage].append(profiler)
+        _profilers.clear()
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    for stage, profilers in by_stage.items():
+        if use_pyinstrument():
+            for i, profiler in enumerate(profilers):
+                with open(profile_path(stage if i == 0 else f"{stage}.{i}", "speedscope.json"), "w") as f:
+                    f.write(profiler.output(renderer=SpeedscopeRenderer()))
+        else:
+            pstats.Stats(*profilers).dump_stats(profile_path(stage, "prof"))
+
+
+@contextmanager
+def profiled(stage):
+    # Each stage accumulates one profile per thread over every run, written out when the
+    # process exits. Nested stages are covered by the outer one.
+    if getattr(_profiling, "active", False):
+        yield
+        return
+
+    _profiling.active = True
+    profiler = thread_profiler(stage)
+    if use_pyinstrument():
+        profiler.start()
+    else:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if use_pyinstrument():
+            profiler.stop()
+        else:
+            profiler.disable()
+        _profiling.active = False
+
+
+@contextmanager
+def timer(stage, memory=False, **labels):
+    # memory=True also records the process RSS once the stage is done
+    with profiled(stage) if should_profile(stage) else nullcontext():
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record(stage, time.perf_counter() - start, **labels)
+            if memory:
+                record_memory(stage)
+
+
+def timed(stage):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_iter(stage, iterable, **labels):
+    # Times only the work done inside the generator, not the consumer's work between
+    # items, and records it once the generator is exhausted
+    iterator = iter(iterable)
+    seconds = 0.0
+    items = 0
+    while True:
+        with profiled(stage) if should_profile(stage) else nullcontext():
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                seconds += time.perf_counter() - start
+                break
+            seconds += time.perf_counter() - start
+        items += 1
+        yield item
+    record(stage, seconds, items=items, **labels)
+
+
+def summary(prefix=""):
+    with _lock:
+        stages = {name: (s["count"], s["sum"], s["max"], list(s["recent"])) for name, s in _stages.items() if name.startswith(prefix)}
+
+    rows = []
+    for name, (calls, total, longest, recent) in sorted(stages.items()):
+        recent = sorted(recent)
+        rows.append({
+            "stage": name[len(prefix):],
+            "calls": calls,
+            "total_s": round(total, 3),
+            "p50_ms": round(recent[len(recent) // 2] * 1000, 1),
+            "p95_ms": round(recent[min(int(len(recent) * 0.95), len(recent) - 1)] * 1000, 1),
+            "max_ms": round(longest * 1000, 1),
+        })
+    return rows
+
+
+def prometheus_text():
+    with _lock:
+        stages = {name: (s["count"], s["sum"], sorted(s["recent"])) for name, s in _stages.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+
+    lines = ["# TYPE nfl_odds_stage_seconds summary"]
+    for name, (calls, total, recent) in sorted(stages.items()):
+        for q in (0.5, 0.95):
+            lines.append(f'nfl_odds_stage_seconds{{stage="{name}",quantile="{q}"}} {recent[min(int(len(recent) * q), len(recent) - 1)]:.6f}')
+        lines.append(f'nfl_odds_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+        lines.append(f'nfl_odds_stage_seconds_count{{stage="{name}"}} {calls}')
+    lines.append("# TYPE nfl_odds_events_total counter")
+    lines += [f'nfl_odds_events_total{{name="{name}"}} {value:g}' for name, value in sorted(counters.items())]
+    lines.append("# TYPE nfl_odds_gauge gauge")
+    lines += [f'nfl_odds_gauge{{name="{name}"}} {value:g}' for name, value in sorted(gauges.items())]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        payload = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def flush():
+    record_memory("process")
+    if LOG_PATH:
+        with _lock:
+            counters = dict(_counters)
+            gauges = dict(_gauges)
+        write_log({"summary": summary(), "counters": counters, "gauges": gauges})
+
+
+def start():
+    # Called once by each entry point. Serves /metrics if TELEMETRY_PORT is set and
+    # writes a summary line to the log when the process exits.
+    global _server
+    if _server is not None:
+        return
+    _server = False
+    if LOG_PATH:
+        atexit.register(flush)
+    if PORT:
+        try:
+            _server = ThreadingHTTPServer(("127.0.0.1", int(PORT)), MetricsHandler)
+        except OSError as e:
+            print(f"Telemetry: can't serve metrics on port {PORT}: {e}")
+            return
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        print(f"Telemetry: metrics on http://127.0.0.1:{PORT}/metrics")
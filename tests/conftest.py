@@ -0,0 +1,89 @@
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+
+root = os.path.join(os.path.dirname(__file__), "..")
+for path in [root, os.path.join(root, "extract"), os.path.join(root, "load")]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+sample_path = os.path.join(root, "data", "samples", "sample_nfl_week1_data.json")
+
+def load_sample():
+    with open(sample_path) as f:
+        return json.load(f)
+
+def next_capture(snapshot, timestamp):
+    # The same games a capture later, with one price moved so the delta carries a full block
+    data = copy.deepcopy(snapshot)
+    data["timestamp"] = timestamp
+    data["data"][0]["bookmakers"][0]["markets"][0]["outcomes"][0]["price"] += 5
+    return data
+
+@pytest.fixture
+def sample_captures():
+    first = load_sample()
+    return [first, next_capture(first, "2025-09-07T18:55:38Z")]
+
+@pytest.fixture(autouse=True)
+def reset_api_state():
+    from historical_extract import api_usage, conditional_cache
+    api_usage.update(remaining=None, used=None, last=None)
+    conditional_cache.clear()
+    yield
+    conditional_cache.clear()
+
+@pytest.fixture
+def fake_api():
+    # fake_odds_api.py on a free port, with its own copy of the handler state
+    from fake_odds_api import FakeOddsHandler, load_events
+
+    handler = type("Handler", (FakeOddsHandler,), {"events": load_events(2), "move_rate": 0, "credits": 1000})
+    yield from serve(handler)
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Answers each historical date from a script of (status, headers, delay seconds) replies,
+    # then with an empty snapshot. Every reply reports the remaining credits.
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        date = parse_qs(urlparse(self.path).query).get("date", [""])[0]
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(date)
+            script = cls.script.get(date)
+            status, headers, delay = script.pop(0) if script else (200, {}, cls.delays.get(date, 0))
+            cls.credits -= 1
+            remaining = cls.credits
+
+        if delay:
+            time.sleep(delay)
+        payload = json.dumps({"timestamp": date, "data": []}).encode()
+        self.send_response(status)
+        for name, value in {"x-requests-remaining": remaining, "x-requests-last": 1, **headers}.items():
+            self.send_header(name, str(value))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+@pytest.fixture
+def stub_api():
+    handler = type("Handler", (StubHandler,), {
+        "lock": threading.Lock(), "requests": [], "script": {}, "delays": {}, "credits": 1000,
+    })
+    yield from serve(handler)
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{server.server_port}/v4"
+    server.shutdown()
+    server.server_close()
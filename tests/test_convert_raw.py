@@ -0,0 +1,20 @@
+from datetime import date, datetime
+import pytest
+from convert_raw import parquet_path, season_week, week_one_start
+
+def test_week_one_comes_from_the_season_calendar(tmp_path):
+    calendar = tmp_path / "season_calendar.csv"
+    calendar.write_text("season,week_one_start,first_game_date,last_game_date\n2025,2025-09-10,2025-09-11,2026-02-08\n")
+    assert week_one_start(2025, str(calendar)) == date(2025, 9, 10)
+    with pytest.raises(ValueError, match="Season 2024"):
+        week_one_start(2024, str(calendar))
+
+def test_season_week():
+    # The seed starts 2025's week 1 on Wednesday September 3rd
+    assert season_week(datetime(2025, 9, 9, 22)) == (2025, 1)
+    assert season_week(datetime(2025, 9, 10, 2)) == (2025, 2)
+    # January captures belong to the previous year's season
+    assert season_week(datetime(2026, 1, 20, 14)) == (2025, 20)
+    assert parquet_path("nfl_odds_2025-09-07_14-00-00", "raw_parquet").split("/")[-3:] == [
+        "season=2025", "week=1", "nfl_odds_2025-09-07_14-00-00.parquet",
+    ]
@@ -0,0 +1,118 @@
+import os
+from datetime import datetime
+import pytest
+import requests
+import historical_extract
+from historical_extract import (
+    conditional_cache, generate_capture_timestamps, get_with_retries, make_session, odds_extract, snapshot_name,
+)
+
+def live_params():
+    return {"apiKey": "test", "regions": "us", "markets": "h2h", "oddsFormat": "american", "dateFormat": "iso"}
+
+def recording_session(statuses):
+    session = make_session(1)
+    session.hooks["response"].append(lambda response, *args, **kwargs: statuses.append(response.status_code))
+    return session
+
+def test_not_modified_returns_cached_body(fake_api):
+    handler, base_url = fake_api
+    url = f"{base_url}/sports/americanfootball_nfl/odds"
+    statuses = []
+    session = recording_session(statuses)
+
+    first = get_with_retries(url, live_params(), session, conditional=True)
+    second = get_with_retries(url, live_params(), session, conditional=True)
+    assert statuses == [200, 304]
+    assert second == first
+    assert len(second) == len(handler.events)
+
+    # A changed board is fetched in full again
+    handler.move_rate = 1
+    third = get_with_retries(url, live_params(), session, conditional=True)
+    assert statuses[-1] == 200
+    assert third != first
+
+def test_historical_requests_skip_the_conditional_cache(fake_api):
+    _, base_url = fake_api
+    url = f"{base_url}/historical/sports/americanfootball_nfl/odds"
+    statuses = []
+    session = recording_session(statuses)
+
+    for date in ["2025-09-07T14:00:00Z", "2025-09-07T14:00:00Z"]:
+        get_with_retries(url, {**live_params(), "date": date}, session)
+    assert statuses == [200, 200]
+    assert not conditional_cache
+
+def test_conditional_cache_is_bounded(fake_api, monkeypatch):
+    _, base_url = fake_api
+    monkeypatch.setattr(historical_extract, "conditional_cache_size", 2)
+    session = make_session(1)
+    for market in ["h2h", "spreads", "totals"]:
+        get_with_retries(f"{base_url}/sports/americanfootball_nfl/odds", {**live_params(), "markets": market}, session, conditional=True)
+    assert [dict(params)["markets"] for _, params in conditional_cache] == ["spreads", "totals"]
+
+def historical_url(base_url):
+    return f"{base_url}/historical/sports/americanfootball_nfl/odds"
+
+def test_retries_rate_limits_and_server_errors(stub_api, monkeypatch):
+    handler, base_url = stub_api
+    handler.script["2025-09-07T14:00:00Z"] = [(429, {"Retry-After": "7"}, 0), (503, {"Retry-After": "2"}, 0)]
+    waits = []
+    monkeypatch.setattr(historical_extract.time, "sleep", waits.append)
+
+    body = get_with_retries(historical_url(base_url), {**live_params(), "date": "2025-09-07T14:00:00Z"}, max_retries=2)
+    assert body["timestamp"] == "2025-09-07T14:00:00Z"
+    assert len(handler.requests) == 3
+    assert waits == [7.0, 2.0]
+
+def test_gives_up_after_max_retries(stub_api, monkeypatch):
+    handler, base_url = stub_api
+    handler.script["2025-09-07T14:00:00Z"] = [(500, {}, 0)] * 3
+    monkeypatch.setattr(historical_extract.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(requests.HTTPError):
+        get_with_retries(historical_url(base_url), {**live_params(), "date": "2025-09-07T14:00:00Z"}, max_retries=1)
+    assert len(handler.requests) == 2
+
+def extract_two_days(base_url, raw_dir, monkeypatch, concurrency, fetched=()):
+    # The eight captures of September 7th and 8th, written to raw_dir. Returns each saved
+    # timestamp with the number of fetches started by the time it was saved.
+    monkeypatch.setattr(historical_extract, "odds_api_base_url", base_url)
+    monkeypatch.setattr(historical_extract, "season_range", lambda season: (datetime(2025, 9, 7), datetime(2025, 9, 8)))
+    saved = []
+    save_odds = historical_extract.save_odds
+    def save(data, timestamp, **kwargs):
+        saved.append((timestamp, len(fetched)))
+        return save_odds(data, timestamp, **kwargs)
+    monkeypatch.setattr(historical_extract, "save_odds", save)
+    odds_extract(concurrency, requests_per_second=1000, max_retries=0, seasons=[2025], raw_dir=str(raw_dir))
+    return saved
+
+def test_stops_when_quota_is_exhausted(stub_api, tmp_path, monkeypatch, capsys):
+    handler, base_url = stub_api
+    handler.credits = 3
+
+    saved = extract_two_days(base_url, tmp_path, monkeypatch, concurrency=1)
+    assert len(handler.requests) == 3
+    assert [timestamp for timestamp, _ in saved] == handler.requests
+    assert len(os.listdir(tmp_path)) == 3
+    out = capsys.readouterr().out
+    assert "Stopping: Only 0 API credits remaining" in out
+    assert "Extracted: 3, Skipped: 0, Failed: 0, Not attempted: 5" in out
+
+def test_saves_in_capture_order_under_concurrency(stub_api, tmp_path, monkeypatch):
+    handler, base_url = stub_api
+    # The first capture answers slowest, so every later one finishes before it
+    timestamps = generate_capture_timestamps(datetime(2025, 9, 7), datetime(2025, 9, 8))
+    handler.delays = {timestamps[0]: 0.5}
+    fetched = []
+    get_historical_odds = historical_extract.get_historical_odds
+    monkeypatch.setattr(historical_extract, "get_historical_odds", lambda *args: fetched.append(args[0]) or get_historical_odds(*args))
+
+    saved = extract_two_days(base_url, tmp_path, monkeypatch, concurrency=2, fetched=fetched)
+    assert [timestamp for timestamp, _ in saved] == timestamps
+    assert sorted(handler.requests) == timestamps
+    assert sorted(os.listdir(tmp_path)) == [f"{snapshot_name(ts)}.json.gz" for ts in timestamps]
+    # Only two requests per worker are queued behind the capture being saved
+    assert saved[0][1] == 4
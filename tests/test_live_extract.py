@@ -0,0 +1,36 @@
+import json
+import os
+import duckdb
+import pytest
+import live_extract
+
+transform_dir = os.path.join(os.path.dirname(__file__), "..", "transform")
+
+@pytest.mark.skipif(
+    not os.path.isdir(os.path.join(transform_dir, "dbt_packages")), reason="run dbt deps in transform/ first"
+)
+def test_polls_load_refresh_and_publish(fake_api, tmp_path, monkeypatch):
+    _, base_url = fake_api
+    monkeypatch.setattr(live_extract, "odds_api_base_url", base_url)
+    # Poll again a second after the previous poll instead of waiting for the kickoff cadence
+    monkeypatch.setattr(live_extract, "live_poll_schedule", [(72, 1)])
+    monkeypatch.setenv("NFL_ODDS_DB_PATH", "unset")
+    db_path, dashboard_db_path, metrics_path = tmp_path / "odds.duckdb", tmp_path / "dashboard.duckdb", tmp_path / "metrics.jsonl"
+
+    # A fresh database, so the poller seeds season_calendar before its first dbt run
+    live_extract.live_extract(
+        str(db_path), str(dashboard_db_path), str(metrics_path), str(tmp_path / "alerts.jsonl"),
+        max_polls=2, raw_dir=str(tmp_path / "raw"),
+    )
+
+    with open(metrics_path) as f:
+        metrics = [json.loads(line) for line in f]
+    assert len(metrics) == 2
+    assert all(m["refresh_ok"] and m["rows"] > 0 and m["lag_seconds"] >= 0 for m in metrics)
+    assert len(os.listdir(tmp_path / "raw")) == 2
+
+    conn = duckdb.connect(str(dashboard_db_path), read_only=True)
+    assert conn.execute("select count(distinct captured_at), count(*) from raw_odds").fetchone() == (2, sum(m["rows"] for m in metrics))
+    assert conn.execute("select count(distinct captured_at) from fct_odds_snapshots").fetchone()[0] == 2
+    assert conn.execute("select count(*) from dim_games").fetchone()[0] > 0
+    conn.close()
@@ -0,0 +1,170 @@
+import os
+import duckdb
+import pytest
+import load_to_duckdb
+from conftest import next_capture
+from convert_raw import convert_raw
+from historical_extract import SnapshotDeltas, save_odds
+from load_to_duckdb import benchmark, flatten_odds_file, is_delta, load_all_odds, raw_columns
+
+def write_captures(captures, raw_dir, deltas=None):
+    return [save_odds(data, data["timestamp"], deltas=deltas, raw_dir=str(raw_dir)) for data in captures]
+
+def loaded_rows(raw_dir, db_path, **kwargs):
+    load_all_odds(str(raw_dir), str(db_path), **{"parquet_dir": None, "workers": 1, **kwargs})
+    conn = duckdb.connect(str(db_path))
+    rows = conn.execute(f"SELECT {raw_columns} FROM raw_odds ORDER BY ALL").fetchall()
+    conn.close()
+    return rows
+
+def manifest(db_path):
+    conn = duckdb.connect(str(db_path))
+    rows = conn.execute("SELECT file_name, row_count, loaded_at FROM raw_files ORDER BY file_name").fetchall()
+    conn.close()
+    return rows
+
+def rewrite_capture(data, raw_dir):
+    # Same snapshot name with a moved price, and a newer mtime in case the size didn't change
+    filepath = write_captures([next_capture(data, data["timestamp"])], raw_dir)[0]
+    stat = os.stat(filepath)
+    os.utime(filepath, (stat.st_atime, stat.st_mtime + 10))
+    return filepath
+
+def test_delta_snapshots_load_like_full_snapshots(sample_captures, tmp_path):
+    full_files = write_captures(sample_captures, tmp_path / "full")
+    delta_files = write_captures(sample_captures, tmp_path / "delta", SnapshotDeltas())
+    assert [is_delta(f) for f in delta_files] == [False, True]
+
+    expected = loaded_rows(tmp_path / "full", tmp_path / "full.duckdb")
+    assert len(expected) == 2 * len(flatten_odds_file(full_files[0]))
+    assert loaded_rows(tmp_path / "delta", tmp_path / "delta.duckdb") == expected
+
+def test_flatten_resolves_delta_refs(sample_captures, tmp_path):
+    full_files = write_captures(sample_captures, tmp_path / "full")
+    delta_files = write_captures(sample_captures, tmp_path / "delta", SnapshotDeltas())
+    assert flatten_odds_file(delta_files[1]) == flatten_odds_file(full_files[1])
+
+def test_benchmark_runs_on_delta_snapshots(sample_captures, tmp_path, capsys):
+    files = write_captures(sample_captures, tmp_path, SnapshotDeltas())
+    benchmark(str(tmp_path), workers=2)
+    out = capsys.readouterr().out
+    deltas = sum(is_delta(f) for f in files)
+    assert deltas
+    assert "parallel output identical to serial: True" in out
+    assert "duckdb output identical to serial: True" in out
+    assert f"duckdb read_json loaded {len(files) - deltas} of {len(files)} files, {deltas} delta files fell back to Python" in out
+
+def test_parallel_load_matches_serial(sample_captures, tmp_path):
+    # More files than workers, so batches from several processes interleave at the writer
+    captures = [next_capture(sample_captures[0], f"2025-09-07T{hour:02d}:00:00Z") for hour in range(6)]
+    write_captures(captures, tmp_path / "raw")
+    load_all_odds(str(tmp_path / "raw"), str(tmp_path / "serial.duckdb"), parquet_dir=None, workers=1, batch_size=100)
+    load_all_odds(str(tmp_path / "raw"), str(tmp_path / "parallel.duckdb"), parquet_dir=None, workers=3, batch_size=100)
+
+    tables = []
+    for name in ["serial", "parallel"]:
+        conn = duckdb.connect(str(tmp_path / f"{name}.duckdb"))
+        tables.append(conn.execute(f"SELECT {raw_columns}, source_file FROM raw_odds").arrow())
+        conn.close()
+    assert tables[0].num_rows == 6 * len(flatten_odds_file(write_captures(captures[:1], tmp_path / "one")[0]))
+    assert tables[0].equals(tables[1])
+
+def test_duckdb_engine_matches_python_flattener(sample_captures, tmp_path):
+    # The sample snapshot as pretty printed JSON, then a delta capture, which falls back to the Python path
+    deltas = SnapshotDeltas()
+    files = [
+        save_odds(data, data["timestamp"], storage_format, deltas, str(tmp_path / "raw"))
+        for data, storage_format in zip(sample_captures, ["json", "json.gz"])
+    ]
+    assert [is_delta(f) for f in files] == [False, True]
+
+    tables = []
+    for engine in ["python", "duckdb"]:
+        load_all_odds(str(tmp_path / "raw"), str(tmp_path / f"{engine}.duckdb"), parquet_dir=None, workers=1, engine=engine)
+        conn = duckdb.connect(str(tmp_path / f"{engine}.duckdb"))
+        tables.append(conn.execute(f"SELECT {raw_columns}, source_file FROM raw_odds ORDER BY ALL").fetchall())
+        conn.close()
+    assert len(tables[0]) == sum(len(flatten_odds_file(f)) for f in files)
+    assert tables[1] == tables[0]
+
+def test_unchanged_files_are_skipped(sample_captures, tmp_path, capsys):
+    files = write_captures(sample_captures, tmp_path / "raw")
+    rows = loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb")
+    loaded = manifest(tmp_path / "odds.duckdb")
+
+    # Touched but identical content is skipped too, and keeps its loaded_at for the dbt watermark
+    os.utime(files[0])
+    capsys.readouterr()
+    assert loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb") == rows
+    assert "All 2 files already loaded" in capsys.readouterr().out
+    assert manifest(tmp_path / "odds.duckdb") == loaded
+
+def test_changed_file_is_replaced_in_one_transaction(sample_captures, tmp_path, monkeypatch):
+    write_captures(sample_captures, tmp_path / "raw")
+    rows = loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb", batch_size=100)
+    loaded = manifest(tmp_path / "odds.duckdb")
+    rewrite_capture(sample_captures[0], tmp_path / "raw")
+    write_captures([sample_captures[1]], tmp_path / "expected")
+    rewrite_capture(sample_captures[0], tmp_path / "expected")
+    expected = loaded_rows(tmp_path / "expected", tmp_path / "expected.duckdb")
+    assert expected != rows
+
+    # A load that fails after the first batch leaves the previous rows and manifest entry
+    insert_batch = load_to_duckdb.insert_batch
+    calls = []
+    def failing_insert(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        insert_batch(*args)
+    monkeypatch.setattr(load_to_duckdb, "insert_batch", failing_insert)
+    with pytest.raises(RuntimeError):
+        loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb", batch_size=100)
+    monkeypatch.setattr(load_to_duckdb, "insert_batch", insert_batch)
+    assert loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb", batch_size=100) == expected
+
+    conn = duckdb.connect(str(tmp_path / "odds.duckdb"))
+    assert conn.execute("SELECT count(*) FROM raw_odds").fetchone()[0] == len(rows)
+    conn.close()
+    reloaded = manifest(tmp_path / "odds.duckdb")
+    assert reloaded[1] == loaded[1] and reloaded[0][2] > loaded[0][2]
+
+def test_full_refresh_reloads_only_the_files_on_disk(sample_captures, tmp_path):
+    files = write_captures(sample_captures, tmp_path / "raw")
+    loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb")
+    os.remove(files[1])
+
+    rows = loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb", full_refresh=True)
+    assert rows == loaded_rows(tmp_path / "raw", tmp_path / "fresh.duckdb")
+    assert len(rows) == len(flatten_odds_file(files[0]))
+    assert [name for name, *_ in manifest(tmp_path / "odds.duckdb")] == [os.path.basename(files[0])]
+
+def test_rows_loaded_before_the_manifest_are_replaced(sample_captures, tmp_path):
+    files = write_captures(sample_captures, tmp_path / "raw")
+    expected = loaded_rows(tmp_path / "raw", tmp_path / "expected.duckdb")
+
+    # A database from before the manifest: no source_file, and no raw_files entries
+    conn = duckdb.connect(str(tmp_path / "odds.duckdb"))
+    load_to_duckdb.create_tables(conn)
+    conn.executemany(
+        f"INSERT INTO raw_odds ({raw_columns}) VALUES ({', '.join(['?'] * len(load_to_duckdb.raw_schema))})",
+        [row for f in files for row in flatten_odds_file(f)],
+    )
+    conn.close()
+    assert loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb") == expected
+
+@pytest.mark.parametrize("engine", ["python", "duckdb"])
+def test_parquet_partitions_load_next_to_json(sample_captures, tmp_path, engine):
+    captures = [*sample_captures, next_capture(sample_captures[1], "2025-09-07T20:00:00Z")]
+    write_captures(captures, tmp_path / "expected")
+    expected = loaded_rows(tmp_path / "expected", tmp_path / "expected.duckdb")
+
+    # Two snapshots loaded from JSON are converted, then a third arrives as JSON
+    write_captures(captures[:2], tmp_path / "raw")
+    loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb", engine=engine)
+    convert_raw(str(tmp_path / "raw"), str(tmp_path / "parquet"), delete_source=True)
+    write_captures(captures[2:], tmp_path / "raw")
+
+    rows = loaded_rows(tmp_path / "raw", tmp_path / "odds.duckdb", parquet_dir=str(tmp_path / "parquet"), engine=engine)
+    assert rows == expected
+    assert [name.split(".", 1)[1] for name, *_ in manifest(tmp_path / "odds.duckdb")] == ["parquet", "parquet", "json.gz"]
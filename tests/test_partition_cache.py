@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+import pytest
+import partition_cache
+
+blob = bytes(range(256)) * 4096
+
+class RangeHandler(BaseHTTPRequestHandler):
+    # Serves files with Range support. The first `truncate` responses close the connection
+    # halfway through the body.
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        name = unquote(self.path.lstrip("/"))
+        if name not in cls.files:
+            self.send_error(404)
+            return
+        body = cls.files[name]
+        cls.ranges.append(self.headers.get("Range"))
+
+        offset = int(self.headers["Range"].split("=")[1].rstrip("-")) if self.headers.get("Range") else 0
+        self.send_response(206 if offset else 200)
+        self.send_header("Content-Length", str(len(body) - offset))
+        self.end_headers()
+        if cls.truncate > 0:
+            cls.truncate -= 1
+            self.wfile.write(body[offset:offset + (len(body) - offset) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body[offset:])
+
+@pytest.fixture
+def file_server():
+    handler = type("Handler", (RangeHandler,), {"files": {}, "ranges": [], "truncate": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield handler, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+def test_truncated_download_resumes_with_range(file_server, tmp_path):
+    handler, base_url = file_server
+    handler.files["blob.bin"] = blob
+    handler.truncate = 1
+
+    path = partition_cache.download(f"{base_url}/blob.bin", str(tmp_path / "blob.bin"), len(blob), hashlib.sha256(blob).hexdigest())
+    assert handler.ranges == [None, f"bytes={len(blob) // 2}-"]
+    with open(path, "rb") as f:
+        assert f.read() == blob
+    assert not os.path.exists(f"{path}.part")
+
+def test_corrupt_partial_download_starts_over(file_server, tmp_path):
+    handler, base_url = file_server
+    handler.files["blob.bin"] = blob
+    path = tmp_path / "blob.bin"
+    # Left behind by an earlier run, with the right length but the wrong bytes
+    (tmp_path / "blob.bin.part").write_bytes(b"\0" * len(blob))
+
+    partition_cache.download(f"{base_url}/blob.bin", str(path), len(blob), hashlib.sha256(blob).hexdigest())
+    assert handler.ranges == [None]
+    assert path.read_bytes() == blob
+
+def test_corrupt_cached_file_is_downloaded_again(file_server, tmp_path):
+    handler, base_url = file_server
+    name = "fct_odds_snapshots/season=2025/week=1/part.parquet"
+    handler.files[name] = blob
+    handler.files["manifest.json"] = json.dumps(
+        {"files": {name: {"size": len(blob), "sha256": hashlib.sha256(blob).hexdigest()}}}
+    ).encode()
+    cached = tmp_path / name
+    cached.parent.mkdir(parents=True)
+    cached.write_bytes(blob[:-1] + b"\0")
+
+    manifest = partition_cache.fetch_manifest(base_url, str(tmp_path))
+    paths = partition_cache.fetch_files(base_url, str(tmp_path), manifest, "fct_odds_snapshots/season=2025/week=1/")
+    assert paths == [str(cached)]
+    assert cached.read_bytes() == blob
+    assert handler.ranges == [None, None]
+
+    # Verified once per process, so the next lookup doesn't refetch or rehash it
+    partition_cache.fetch_files(base_url, str(tmp_path), manifest, "fct_odds_snapshots/")
+    assert len(handler.ranges) == 2
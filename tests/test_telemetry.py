@@ -0,0 +1,49 @@
+import os
+import pstats
+import threading
+import pytest
+import telemetry
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+def test_profiles_are_per_thread_and_written_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry, "PROFILE_STAGES", ["test"])
+    monkeypatch.setattr(telemetry, "PROFILER", "cprofile")
+    monkeypatch.setattr(telemetry, "PROFILE_DIR", str(tmp_path))
+    barrier = threading.Barrier(2)
+
+    def run():
+        # Both threads are inside the stage at the same time
+        with telemetry.timer("test.stage"):
+            barrier.wait()
+            busy(10_000)
+            barrier.wait()
+        assert list(telemetry.timed_iter("test.items", range(3))) == [0, 1, 2]
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Nothing is written until the process exits
+    assert os.listdir(tmp_path) == []
+    telemetry.write_profiles()
+    assert sorted(os.listdir(tmp_path)) == [f"test.items.{os.getpid()}.prof", f"test.stage.{os.getpid()}.prof"]
+
+    stats = pstats.Stats(str(tmp_path / f"test.stage.{os.getpid()}.prof")).stats
+    assert sum(calls for (_, _, name), (calls, *_) in stats.items() if name == "busy") == 2
+
+def test_timer_records_stage_and_memory_when_the_block_raises(tmp_path, monkeypatch):
+    # Streamlit ends a rerun by raising out of the script, e.g. st.stop()
+    monkeypatch.setattr(telemetry, "PROFILE_STAGES", ["test"])
+    monkeypatch.setattr(telemetry, "PROFILER", "cprofile")
+    monkeypatch.setattr(telemetry, "PROFILE_DIR", str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with telemetry.timer("test.figure", memory=True):
+            busy(1000)
+            raise RuntimeError
+    assert [row["stage"] for row in telemetry.summary("test.figure")] == [""]
+    assert telemetry._gauges["test.figure.rss_mb"] > 0
+    assert not telemetry._profiling.active
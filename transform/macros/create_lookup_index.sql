@@ -0,0 +1,19 @@
+-- Optional ART index for dashboard point lookups, enabled with --vars '{mart_indexes: true}'.
+-- Zone maps on the sorted marts already prune most row groups, so this is off by default.
+{% macro lookup_index_name(columns) %}
+    {{- this.identifier }}_{{ columns | join('_') }}_idx
+{%- endmacro %}
+
+{% macro create_lookup_index(columns) %}
+    {% if var('mart_indexes', false) %}
+    create index if not exists {{ lookup_index_name(columns) }} on {{ this }} ({{ columns | join(', ') }})
+    {% endif %}
+{% endmacro %}
+
+-- DuckDB can't rename a table that has indexes, which a full refresh does, so the index
+-- is dropped first. Also drops it once the var is turned off.
+{% macro drop_lookup_index(columns) %}
+    {% if should_full_refresh() or not var('mart_indexes', false) %}
+    drop index if exists {{ this.schema }}.{{ lookup_index_name(columns) }}
+    {% endif %}
+{% endmacro %}
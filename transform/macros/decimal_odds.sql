@@ -0,0 +1,6 @@
+{% macro decimal_odds(column_name) %}
+    case
+        when {{ column_name }} < 0 then 1 + 100.0 / abs({{ column_name }})
+        when {{ column_name }} > 0 then 1 + {{ column_name }} / 100.0
+    end
+{% endmacro %}
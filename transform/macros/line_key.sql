@@ -0,0 +1,7 @@
+{% macro line_key(market_type, outcome, home_team, line) %}
+    case
+        when {{ market_type }} = 'spreads' then case when {{ outcome }} = {{ home_team }} then {{ line }} else -{{ line }} end
+        when {{ market_type }} = 'totals' then {{ line }}
+        else 0
+    end
+{% endmacro %}
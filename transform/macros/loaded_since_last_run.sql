@@ -0,0 +1,4 @@
+{% macro loaded_since_last_run(loaded_at='loaded_at') %}
+    {# Watermarked on load time rather than capture time, so backfilled and reloaded older captures are picked up too #}
+    {{ loaded_at }} > (select coalesce(max(loaded_at), '-infinity'::timestamp) from {{ this }})
+{% endmacro %}
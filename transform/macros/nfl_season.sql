@@ -0,0 +1,7 @@
+{% macro nfl_season(date_column) %}
+    {# Seasons run September to February, so January and February games belong to the previous year's season #}
+    case
+        when month({{ date_column }}) >= 3 then year({{ date_column }})
+        else year({{ date_column }}) - 1
+    end
+{% endmacro %}
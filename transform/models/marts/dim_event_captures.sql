@@ -0,0 +1,22 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['event_id', 'captured_at'],
+        incremental_strategy='delete+insert',
+        on_schema_change='fail'
+    )
+}}
+
+-- Every pre-match capture of each game. fct_odds_snapshots expands the intervals in
+-- fct_odds_intervals against this list to get back to snapshot grain.
+select
+    event_id,
+    captured_at,
+    max(loaded_at) as loaded_at
+from {{ ref('stg_odds') }}
+{% if is_incremental() %}
+-- Captures loaded since the last run, including backfilled and reloaded older ones
+where {{ loaded_since_last_run() }}
+{% endif %}
+group by event_id, captured_at
+order by event_id, captured_at
@@ -0,0 +1,21 @@
+-- One row per game for the dashboard sidebar. Built from fct_game_summary, which is
+-- already one row per game/sportsbook/market/outcome, so it never scans the snapshots.
+select
+    event_id,
+    home_team,
+    away_team,
+    max(game_start_time) as game_start_time,
+    {{ nfl_season('max(game_start_time)') }} as season,
+    max(nfl_week) as nfl_week,
+    case
+        when max(nfl_week) <= 18 then 'Week ' || max(nfl_week)
+        when max(nfl_week) = 19 then 'Wild Card'
+        when max(nfl_week) = 20 then 'Divisional'
+        when max(nfl_week) = 21 then 'Conference Championships'
+        else 'Super Bowl'
+    end as week_label,
+    list(distinct market_type order by market_type) as markets,
+    list(distinct sportsbook order by sportsbook) as sportsbooks,
+    max(last_captured_at) as last_captured_at
+from {{ ref('fct_game_summary') }}
+group by event_id, home_team, away_team
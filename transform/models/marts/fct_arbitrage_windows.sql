@@ -0,0 +1,65 @@
+-- Runs of consecutive captures of a game where the best prices on the two sides of a
+-- market imply less than 100% in total, from fct_best_prices. A window closes at the
+-- first capture of the game where the market is no longer an arbitrage or isn't quoted.
+with markets as (
+    select
+        event_id,
+        nfl_week,
+        market_type,
+        line_key,
+        captured_at,
+        any_value(best_total_implied_prob) as best_total_implied_prob,
+        any_value(is_arbitrage) as is_arbitrage
+    from {{ ref('fct_best_prices') }}
+    group by all
+),
+
+numbered as (
+    select
+        *,
+        dense_rank() over (partition by event_id order by captured_at) as capture_number
+    from markets
+),
+
+arbitrage as (
+    select
+        *,
+        -- Consecutive captures share the same difference
+        capture_number - row_number() over (
+            partition by event_id, market_type, line_key
+            order by captured_at
+        ) as window_id
+    from numbered
+    where is_arbitrage
+),
+
+windows as (
+    select
+        min(captured_at) as opened_at,
+        max(captured_at) as last_seen_at,
+        any_value(nfl_week) as nfl_week,
+        event_id,
+        market_type,
+        line_key,
+        count(*) as captures,
+        round(1 - min(best_total_implied_prob), 4) as max_arbitrage_margin,
+        arg_min(captured_at, best_total_implied_prob) as peak_captured_at
+    from arbitrage
+    group by event_id, market_type, line_key, window_id
+)
+
+-- Both sides' prices only for each window's peak capture
+select
+    windows.*,
+    list(
+        {'outcome': best.outcome, 'price': best.best_price, 'books': best.best_books}
+        order by best.outcome
+    ) as peak_prices
+from windows
+join {{ ref('fct_best_prices') }} best
+    on best.event_id = windows.event_id
+   and best.market_type = windows.market_type
+   and best.line_key = windows.line_key
+   and best.captured_at = windows.peak_captured_at
+group by all
+order by windows.event_id, windows.market_type, windows.opened_at
@@ -0,0 +1,80 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['event_id', 'captured_at'],
+        incremental_strategy='delete+insert',
+        on_schema_change='fail'
+    )
+}}
+
+-- Best price across every sportsbook for each side of a market at each capture. Sides
+-- are paired on line_key: spreads from the home team's side (home -3 with away +3),
+-- totals on the total, h2h on 0. Like the consensus, a capture only needs its own rows,
+-- so this is one group-wise max per capture and incremental runs rebuild only the
+-- captures loaded since the last run, backfilled and reloaded older ones included.
+with odds as (
+    select
+        captured_at,
+        nfl_week,
+        event_id,
+        sportsbook,
+        market_type,
+        outcome,
+        price,
+        {{ decimal_odds('price') }} as decimal_odds,
+        {{ line_key('market_type', 'outcome', 'home_team', 'line') }} as line_key,
+        loaded_at
+    from {{ ref('fct_odds_snapshots') }}
+    where price is not null
+    {% if is_incremental() %}
+      and {{ loaded_since_last_run() }}
+    {% endif %}
+),
+
+best_prices as (
+    select
+        captured_at,
+        nfl_week,
+        event_id,
+        market_type,
+        line_key,
+        outcome,
+        count(*) as book_count,
+        max(decimal_odds) as best_decimal_odds,
+        arg_max(price, decimal_odds) as best_price,
+        list_sort([
+            quote.sportsbook
+            for quote in list({'sportsbook': sportsbook, 'decimal_odds': decimal_odds})
+            if quote.decimal_odds = max(decimal_odds)
+        ]) as best_books,
+        max(loaded_at) as loaded_at
+    from odds
+    group by all
+),
+
+markets as (
+    select
+        *,
+        count(*) over market as sides,
+        sum(1 / best_decimal_odds) over market as best_total_implied_prob
+    from best_prices
+    window market as (partition by event_id, market_type, line_key, captured_at)
+)
+
+select
+    captured_at,
+    nfl_week,
+    event_id,
+    market_type,
+    line_key,
+    outcome,
+    book_count,
+    best_price,
+    round(best_decimal_odds, 4) as best_decimal_odds,
+    best_books,
+    round(1 / best_decimal_odds, 4) as best_implied_prob,
+    round(best_total_implied_prob, 4) as best_total_implied_prob,
+    sides = 2 and best_total_implied_prob < 1 as is_arbitrage,
+    loaded_at
+from markets
+order by event_id, market_type, line_key, captured_at, outcome
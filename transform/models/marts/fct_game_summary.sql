@@ -1,32 +1,64 @@
-with odds_with_open_close as (
-    select
-        *,
-        first_value(line) over (
-            partition by event_id, sportsbook, market_type, outcome
-            order by captured_at
-        ) as opening_line,
-        last_value(line) over (
-            partition by event_id, sportsbook, market_type, outcome
-            order by captured_at
-            rows between unbounded preceding and unbounded following
-        ) as closing_line,
-        first_value(price) over (
-            partition by event_id, sportsbook, market_type, outcome
-            order by captured_at
-        ) as opening_price,
-        last_value(price) over (
-            partition by event_id, sportsbook, market_type, outcome
-            order by captured_at
-            rows between unbounded preceding and unbounded following
-        ) as closing_price
+{{
+    config(
+        materialized='incremental',
+        unique_key='event_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='fail',
+        pre_hook="{{ drop_lookup_index(['event_id']) }}",
+        post_hook="{{ create_lookup_index(['event_id']) }}"
+    )
+}}
+
+with odds as (
+    select *
     from {{ ref('stg_odds') }}
+    {% if is_incremental() %}
+    -- Rebuild only the games with rows loaded since the last run, which includes
+    -- backfilled and reloaded older captures
+    where event_id in (
+        select distinct event_id
+        from {{ ref('stg_odds') }}
+        where {{ loaded_since_last_run() }}
+    )
+    {% endif %}
+),
+
+-- Opening and closing values come from a single aggregation pass. The _null variants
+-- keep a null line at the first/last capture, matching first_value/last_value.
+open_close as (
+    select
+        event_id,
+        home_team,
+        away_team,
+        max(game_start_time) as game_start_time,
+        nfl_week,
+        sportsbook,
+        market_type,
+        outcome,
+        arg_min_null(line, captured_at) as opening_line,
+        arg_max_null(line, captured_at) as closing_line,
+        arg_min_null(price, captured_at) as opening_price,
+        arg_max_null(price, captured_at) as closing_price,
+        count(*) as capture_count,
+        min(captured_at) as first_captured_at,
+        max(captured_at) as last_captured_at,
+        max(loaded_at) as loaded_at
+    from odds
+    group by
+        event_id,
+        home_team,
+        away_team,
+        nfl_week,
+        sportsbook,
+        market_type,
+        outcome
 )
 
 select
     event_id,
     home_team,
     away_team,
-    max(game_start_time) as game_start_time,
+    game_start_time,
     nfl_week,
     sportsbook,
     market_type,
@@ -39,19 +71,10 @@ select
     {{ implied_probability('opening_price') }} as opening_implied_prob_pct,
     {{ implied_probability('closing_price') }} as closing_implied_prob_pct,
     round({{ implied_probability('closing_price') }} - {{ implied_probability('opening_price') }}, 4) as implied_prob_pct_change,
-    count(*) as capture_count,
-    min(captured_at) as first_captured_at,
-    max(captured_at) as last_captured_at
-from odds_with_open_close
-group by
-    event_id,
-    home_team,
-    away_team,
-    nfl_week,
-    sportsbook,
-    market_type,
-    outcome,
-    opening_line,
-    closing_line,
-    opening_price,
-    closing_price
+    capture_count,
+    first_captured_at,
+    last_captured_at,
+    loaded_at
+from open_close
+-- Written in lookup order so min/max zone maps prune row groups for per-game queries
+order by event_id, market_type, sportsbook, outcome
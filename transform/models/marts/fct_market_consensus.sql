@@ -0,0 +1,68 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['event_id', 'captured_at'],
+        incremental_strategy='delete+insert',
+        on_schema_change='fail'
+    )
+}}
+
+-- Each capture holds every operator's current price, so the consensus for a capture
+-- only needs that capture's rows. Incremental runs rebuild the captures loaded since
+-- the last run, backfilled and reloaded older ones included.
+with odds as (
+    select
+        captured_at,
+        nfl_week,
+        event_id,
+        sportsbook,
+        market_type,
+        outcome,
+        line,
+        price,
+        implied_prob,
+        loaded_at
+    from {{ ref('fct_odds_snapshots') }}
+    {% if is_incremental() %}
+    where {{ loaded_since_last_run() }}
+    {% endif %}
+),
+
+consensus as (
+    select
+        *,
+        count(*) over capture as book_count,
+        median(line) over capture as consensus_line,
+        median(implied_prob) over capture as consensus_implied_prob,
+        {% if var('consensus_reference_book') %}
+        max(case when sportsbook = '{{ var("consensus_reference_book") }}' then line end) over capture as reference_line,
+        max(case when sportsbook = '{{ var("consensus_reference_book") }}' then implied_prob end) over capture as reference_implied_prob
+        {% else %}
+        null::double as reference_line,
+        null::double as reference_implied_prob
+        {% endif %}
+    from odds
+    window capture as (partition by event_id, market_type, outcome, captured_at)
+)
+
+select
+    captured_at,
+    nfl_week,
+    event_id,
+    sportsbook,
+    market_type,
+    outcome,
+    line,
+    price,
+    implied_prob,
+    book_count,
+    consensus_line,
+    line - consensus_line as line_vs_consensus,
+    round(consensus_implied_prob, 4) as consensus_implied_prob,
+    round(implied_prob - consensus_implied_prob, 4) as implied_prob_vs_consensus,
+    reference_line,
+    line - reference_line as line_vs_reference,
+    round(implied_prob - reference_implied_prob, 4) as implied_prob_vs_reference,
+    loaded_at
+from consensus
+order by event_id, market_type, sportsbook, captured_at
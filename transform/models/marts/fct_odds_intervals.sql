@@ -0,0 +1,126 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='event_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='fail',
+        pre_hook="{{ drop_lookup_index(['event_id']) }}",
+        post_hook="{{ create_lookup_index(['event_id']) }}"
+    )
+}}
+
+with odds as (
+    select
+        captured_at,
+        game_start_time,
+        nfl_week,
+        event_id,
+        home_team,
+        away_team,
+        sportsbook,
+        market_type,
+        outcome,
+        line,
+        price,
+        loaded_at,
+        dense_rank() over (partition by event_id order by captured_at) as capture_seq
+    from {{ ref('stg_odds') }}
+    {% if is_incremental() %}
+    -- Rebuild only the games with rows loaded since the last run, which includes
+    -- backfilled and reloaded older captures
+    where event_id in (
+        select distinct event_id
+        from {{ ref('stg_odds') }}
+        where {{ loaded_since_last_run() }}
+    )
+    {% endif %}
+),
+
+-- A new interval starts whenever the line, price or kickoff changes, or the series
+-- was missing from the game's previous capture
+flagged as (
+    select
+        *,
+        lag(line) over series as prev_line,
+        lag(price) over series as prev_price,
+        case
+            when lag(capture_seq) over series = capture_seq - 1
+             and lag(line) over series is not distinct from line
+             and lag(price) over series is not distinct from price
+             and lag(game_start_time) over series = game_start_time
+            then 0
+            else 1
+        end as starts_interval
+    from odds
+    window series as (
+        partition by event_id, sportsbook, market_type, outcome
+        order by captured_at
+    )
+),
+
+numbered as (
+    select
+        *,
+        sum(starts_interval) over (
+            partition by event_id, sportsbook, market_type, outcome
+            order by captured_at
+        ) as interval_id
+    from flagged
+),
+
+intervals as (
+    select
+        event_id,
+        home_team,
+        away_team,
+        game_start_time,
+        nfl_week,
+        sportsbook,
+        market_type,
+        outcome,
+        min(captured_at) as valid_from,
+        max(captured_at) as valid_to,
+        count(*) as capture_count,
+        line,
+        arg_min_null(prev_line, captured_at) as prev_line,
+        price,
+        arg_min_null(prev_price, captured_at) as prev_price,
+        max(loaded_at) as loaded_at
+    from numbered
+    group by
+        event_id,
+        home_team,
+        away_team,
+        game_start_time,
+        nfl_week,
+        sportsbook,
+        market_type,
+        outcome,
+        interval_id,
+        line,
+        price
+)
+
+select
+    event_id,
+    home_team,
+    away_team,
+    game_start_time,
+    nfl_week,
+    sportsbook,
+    market_type,
+    outcome,
+    valid_from,
+    valid_to,
+    capture_count,
+    line,
+    prev_line,
+    line - prev_line as line_change,
+    price,
+    prev_price,
+    price - prev_price as price_change,
+    {{ implied_probability('price') }} as implied_prob,
+    loaded_at
+from intervals
+-- Written in lookup order so min/max zone maps prune row groups for per-game queries
+order by event_id, market_type, sportsbook, valid_from
@@ -0,0 +1,56 @@
+{{ config(materialized='view') }}
+
+-- Snapshot level odds, one row per capture of each game/sportsbook/market/outcome,
+-- expanded from fct_odds_intervals. Only the first capture of an interval can carry a
+-- change; every later one repeats the line and price.
+--
+-- Refs leave out the database name, which DuckDB would keep in the view. The dashboard
+-- attaches a published copy of the file under another name, where it wouldn't resolve.
+with snapshots as (
+    select
+        captures.captured_at,
+        intervals.game_start_time,
+        intervals.nfl_week,
+        intervals.event_id,
+        intervals.home_team,
+        intervals.away_team,
+        intervals.sportsbook,
+        intervals.market_type,
+        intervals.outcome,
+        intervals.line,
+        case
+            when captures.captured_at = intervals.valid_from then intervals.prev_line
+            else intervals.line
+        end as prev_line,
+        intervals.price,
+        case
+            when captures.captured_at = intervals.valid_from then intervals.prev_price
+            else intervals.price
+        end as prev_price,
+        intervals.implied_prob,
+        captures.loaded_at
+    from {{ ref('fct_odds_intervals').include(database=False) }} intervals
+    join {{ ref('dim_event_captures').include(database=False) }} captures
+      on captures.event_id = intervals.event_id
+     and captures.captured_at between intervals.valid_from and intervals.valid_to
+)
+
+select
+    captured_at,
+    game_start_time,
+    nfl_week,
+    event_id,
+    home_team,
+    away_team,
+    sportsbook,
+    market_type,
+    outcome,
+    line,
+    prev_line,
+    line - prev_line as line_change,
+    price,
+    prev_price,
+    price - prev_price as price_change,
+    implied_prob,
+    loaded_at
+from snapshots
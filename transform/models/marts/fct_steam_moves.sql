@@ -0,0 +1,83 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='event_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='fail'
+    )
+}}
+
+-- A steam move is steam_min_books or more operators moving the same game/market/outcome
+-- in the same direction within steam_window_minutes. Spreads and totals move on the
+-- line, moneylines on implied probability.
+with moves as (
+    select
+        captured_at,
+        nfl_week,
+        event_id,
+        sportsbook,
+        market_type,
+        outcome,
+        line,
+        line_change,
+        price_change,
+        case
+            when market_type = 'h2h' then -sign(price_change)
+            else sign(line_change)
+        end as direction,
+        loaded_at
+    from {{ ref('fct_odds_snapshots') }}
+    where case when market_type = 'h2h' then price_change else line_change end != 0
+    {% if is_incremental() %}
+    -- Games with rows loaded since the last run are rebuilt whole: a backfilled capture
+    -- changes the moves after it, and can remove a steam move that was already stored.
+    -- The table stays empty until the first steam move, so an empty table reads everything
+    and event_id in (
+        select event_id
+        from {{ ref('fct_odds_snapshots') }}
+        where {{ loaded_since_last_run() }}
+    )
+    {% endif %}
+),
+
+windowed as (
+    select
+        *,
+        count(distinct sportsbook) over steam_window as books_moved,
+        list(distinct sportsbook) over steam_window as books,
+        min(captured_at) over steam_window as first_move_at
+    from moves
+    window steam_window as (
+        partition by event_id, market_type, outcome, direction
+        order by captured_at
+        range between interval ({{ var('steam_window_minutes') }}) minute preceding and current row
+    )
+)
+
+select
+    windowed.captured_at,
+    windowed.nfl_week,
+    windowed.event_id,
+    windowed.market_type,
+    windowed.outcome,
+    windowed.direction,
+    -- Rows of the same capture are window peers and share one frame
+    any_value(windowed.first_move_at) as first_move_at,
+    any_value(windowed.books_moved) as books_moved,
+    list_sort(any_value(windowed.books)) as books,
+    list_sort(list(windowed.sportsbook)) as books_moved_at_capture,
+    avg(windowed.line_change) as avg_line_change,
+    avg(windowed.price_change) as avg_price_change,
+    any_value(consensus.consensus_line) as consensus_line,
+    any_value(consensus.consensus_implied_prob) as consensus_implied_prob,
+    max(windowed.loaded_at) as loaded_at
+from windowed
+left join {{ ref('fct_market_consensus') }} consensus
+    on consensus.event_id = windowed.event_id
+   and consensus.market_type = windowed.market_type
+   and consensus.outcome = windowed.outcome
+   and consensus.sportsbook = windowed.sportsbook
+   and consensus.captured_at = windowed.captured_at
+where windowed.books_moved >= {{ var('steam_min_books') }}
+group by all
+order by windowed.event_id, windowed.market_type, windowed.captured_at
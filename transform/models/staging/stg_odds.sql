@@ -1,13 +1,19 @@
 with raw_odds as (
     select *
     from {{ source('raw', 'raw_odds') }}
+),
+
+season_calendar as (
+    select season, week_one_start
+    from {{ ref('season_calendar') }}
 )
 
 select
     captured_at,
     commence_time as game_start_time,
+    season_calendar.season,
     least(
-        floor((commence_time::date - date '2025-09-03') / 7) + 1,
+        floor((commence_time::date - season_calendar.week_one_start) / 7) + 1,
         22
     )::int as nfl_week,
     event_id,
@@ -18,8 +24,11 @@ select
     market_key as market_type,
     outcome_name as outcome,
     outcome_price as price,
-    outcome_point as line
+    outcome_point as line,
+    loaded_at
 from raw_odds
+left join season_calendar
+    on season_calendar.season = {{ nfl_season('commence_time') }}
 where captured_at < commence_time
 and market_key != 'h2h_lay' -- lay betting market from EU exchanges, not including in analysis/dashboard
 and event_id != '49e177e39ff23cd0596bae127b04df43' -- Bad data received from API for Commanders @ LA Rams Week 5. This is an error and actually played LA Chargers in Week 5.
\ No newline at end of file
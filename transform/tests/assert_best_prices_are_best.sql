@@ -0,0 +1,42 @@
+-- No sportsbook quotes a side at a better price than fct_best_prices, each listed book
+-- quotes exactly the best price, and arbitrages have both sides' best implied
+-- probabilities adding up to less than 1
+{{ config(tags=['full_scan']) }}
+
+with quotes as (
+    select
+        best.event_id,
+        best.market_type,
+        best.line_key,
+        best.outcome,
+        best.captured_at,
+        best.best_price,
+        best.best_books,
+        movements.sportsbook,
+        movements.price
+    from {{ ref('fct_best_prices') }} best
+    join {{ ref('fct_odds_snapshots') }} movements
+        on movements.event_id = best.event_id
+       and movements.market_type = best.market_type
+       and movements.outcome = best.outcome
+       and movements.captured_at = best.captured_at
+       and {{ line_key('movements.market_type', 'movements.outcome', 'movements.home_team', 'movements.line') }} = best.line_key
+)
+
+select 'better price than best_price' as issue, event_id, market_type, line_key, outcome, captured_at
+from quotes
+where {{ decimal_odds('price') }} > {{ decimal_odds('best_price') }}
+
+union all
+
+select 'best book not at best_price', event_id, market_type, line_key, outcome, captured_at
+from quotes
+where list_contains(best_books, sportsbook) and price != best_price
+
+union all
+
+select 'arbitrage without both sides under 1', event_id, market_type, line_key, null, captured_at
+from {{ ref('fct_best_prices') }}
+where is_arbitrage
+group by event_id, market_type, line_key, captured_at
+having count(*) != 2 or sum(best_implied_prob) >= 1.0001
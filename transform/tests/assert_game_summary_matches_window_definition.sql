@@ -0,0 +1,67 @@
+-- fct_game_summary must match the original definition of open/close as
+-- first_value/last_value windows over each game/sportsbook/market/outcome
+{{ config(tags=['full_scan']) }}
+
+with odds_with_open_close as (
+    select
+        *,
+        first_value(line) over series as opening_line,
+        last_value(line) over series as closing_line,
+        first_value(price) over series as opening_price,
+        last_value(price) over series as closing_price
+    from {{ ref('stg_odds') }}
+    window series as (
+        partition by event_id, sportsbook, market_type, outcome
+        order by captured_at
+        rows between unbounded preceding and unbounded following
+    )
+),
+
+expected as (
+    select
+        event_id,
+        home_team,
+        away_team,
+        max(game_start_time) as game_start_time,
+        nfl_week,
+        sportsbook,
+        market_type,
+        outcome,
+        opening_line,
+        closing_line,
+        opening_price,
+        closing_price,
+        count(*) as capture_count,
+        min(captured_at) as first_captured_at,
+        max(captured_at) as last_captured_at
+    from odds_with_open_close
+    group by all
+),
+
+actual as (
+    select
+        event_id,
+        home_team,
+        away_team,
+        game_start_time,
+        nfl_week,
+        sportsbook,
+        market_type,
+        outcome,
+        opening_line,
+        closing_line,
+        opening_price,
+        closing_price,
+        capture_count,
+        first_captured_at,
+        last_captured_at
+    from {{ ref('fct_game_summary') }}
+)
+
+(select 'missing from fct_game_summary' as issue, * from expected
+ except
+ select 'missing from fct_game_summary', * from actual)
+union all
+(select 'not in window definition' as issue, * from actual
+ except
+ select 'not in window definition', * from expected)
@@ -1,6 +1,6 @@
 -- Implied probability for any single outcome must be between 0 and 1
-select event_id, captured_at, sportsbook, outcome, implied_prob
-from {{ ref('fct_line_movements') }}
+select event_id, valid_from, sportsbook, outcome, implied_prob
+from {{ ref('fct_odds_intervals') }}
 where implied_prob is null
    or implied_prob <= 0
    or implied_prob >= 1
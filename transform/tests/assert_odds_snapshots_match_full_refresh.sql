@@ -0,0 +1,37 @@
+-- Incremental runs of fct_odds_intervals and dim_event_captures must expand to the same
+-- snapshots a full refresh would: one row per stg_odds row, with prev_line/prev_price
+-- matching lag() over the full history
+{{ config(tags=['full_scan']) }}
+
+with full_history as (
+    select
+        event_id,
+        sportsbook,
+        market_type,
+        outcome,
+        captured_at,
+        line,
+        price,
+        lag(line) over (
+            partition by event_id, sportsbook, market_type, outcome
+            order by captured_at
+        ) as prev_line,
+        lag(price) over (
+            partition by event_id, sportsbook, market_type, outcome
+            order by captured_at
+        ) as prev_price
+    from {{ ref('stg_odds') }}
+),
+
+incremental as (
+    select event_id, sportsbook, market_type, outcome, captured_at, line, price, prev_line, prev_price
+    from {{ ref('fct_odds_snapshots') }}
+)
+
+(select 'missing from fct_odds_snapshots' as issue, * from full_history
+ except
+ select 'missing from fct_odds_snapshots', * from incremental)
+union all
+(select 'not in stg_odds history' as issue, * from incremental
+ except
+ select 'not in stg_odds history', * from full_history)
@@ -1,13 +1,13 @@
--- A team should not appear in more than one game per nfl_week
+-- A team should not appear in more than one game per nfl_week of a season
 with team_games as (
-    select home_team as team, nfl_week, event_id
+    select home_team as team, season, nfl_week, event_id
     from {{ ref('stg_odds') }}
     union
-    select away_team as team, nfl_week, event_id
+    select away_team as team, season, nfl_week, event_id
     from {{ ref('stg_odds') }}
 )
 
-select team, nfl_week, count(distinct event_id) as games
+select team, season, nfl_week, count(distinct event_id) as games
 from team_games
-group by team, nfl_week
+group by team, season, nfl_week
 having count(distinct event_id) > 1